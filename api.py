@@ -0,0 +1,134 @@
+"""
+API HTTP de geração de grades, para outros sistemas usarem o gerador sem
+passar pela interface do Streamlit.
+
+    POST   /api/grades        escola em JSON (formato de linha_comando) -> 202 e id da tarefa
+    GET    /api/grades/<id>   estado; com a tarefa concluída, estatísticas e aulas
+    DELETE /api/grades/<id>   cancela a geração
+    GET    /api/saude         ocupação do pool de geração
+
+O POST só valida a escola e enfileira a geração, respondendo na hora. A
+resolução roda no GerenciadorTarefas, em processos próprios limitados ao
+número de núcleos, e o cliente consulta o resultado pelo id. As tarefas
+ficam na memória do processo do servidor: o gunicorn deve rodar com um
+único processo e várias threads (ver gunicorn_config.py).
+"""
+import os
+
+from flask import Flask, jsonify, request, url_for
+
+from linha_comando import (
+    ALGORITMOS_CLI, MARGEM_TEMPO_LIMITE, ErroEscola, carregar_json, gerar_escola, grade_em_dicionario
+)
+from persistencia import TIPOS_CADASTRO
+from tarefas import CONCLUIDA, obter_gerenciador
+
+TEMPO_LIMITE_PADRAO = 60  # segundos de solver quando o cliente não informa
+TEMPO_LIMITE_MAXIMO = 600
+MAX_TAREFAS_ABERTAS = 4 * (os.cpu_count() or 1)  # além disso, novas gerações recebem 503
+
+app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024
+app.json.ensure_ascii = False
+
+
+def _erro(mensagem, status):
+    return jsonify({"erro": mensagem}), status
+
+
+def _parametros(dados):
+    """(algoritmo, tempo_limite, semente, decompor) do corpo da requisição, validados"""
+    algoritmo = dados.get("algoritmo", "simples")
+    if algoritmo not in ALGORITMOS_CLI:
+        raise ErroEscola(f"algoritmo deve ser um de: {', '.join(sorted(ALGORITMOS_CLI))}")
+    # bool é subclasse de int: true/false do JSON não passam por número
+    tempo_limite = dados.get("tempo_limite", TEMPO_LIMITE_PADRAO)
+    if (isinstance(tempo_limite, bool) or not isinstance(tempo_limite, (int, float))
+            or not 0 < tempo_limite <= TEMPO_LIMITE_MAXIMO):
+        raise ErroEscola(f"tempo_limite deve ser um número entre 0 e {TEMPO_LIMITE_MAXIMO}")
+    semente = dados.get("semente")
+    if semente is not None and (isinstance(semente, bool) or not isinstance(semente, int)):
+        raise ErroEscola("semente deve ser um inteiro")
+    decompor = dados.get("decompor", False)
+    if not isinstance(decompor, bool):
+        raise ErroEscola("decompor deve ser true ou false")
+    return ALGORITMOS_CLI[algoritmo], tempo_limite, semente, decompor
+
+
+@app.post("/api/grades")
+def submeter_grade():
+    dados = request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return _erro("Envie a escola como um objeto JSON", 400)
+    gerenciador = obter_gerenciador()
+    if gerenciador.em_aberto() >= MAX_TAREFAS_ABERTAS:
+        resposta, status = _erro("Fila de geração cheia, tente novamente em instantes", 503)
+        resposta.headers["Retry-After"] = "30"
+        return resposta, status
+
+    try:
+        algoritmo, tempo_limite, semente, decompor = _parametros(dados)
+        nome, escola = carregar_json(dados, "escola")
+    except ErroEscola as e:
+        return _erro(str(e), 422)
+
+    id_tarefa = gerenciador.submeter(
+        gerar_escola,
+        args=({tipo: escola[tipo] for tipo in TIPOS_CADASTRO}, algoritmo),
+        kwargs={"tempo_limite": tempo_limite, "semente": semente, "decompor": decompor},
+        info={"escola": nome},
+        limite=tempo_limite + MARGEM_TEMPO_LIMITE
+    )
+    url = url_for("consultar_grade", id_tarefa=id_tarefa)
+    return jsonify({"id": id_tarefa, "estado": "pendente", "url": url}), 202, {"Location": url}
+
+
+@app.get("/api/grades/<id_tarefa>")
+def consultar_grade(id_tarefa):
+    tarefa = obter_gerenciador().status(id_tarefa)
+    if tarefa is None:
+        return _erro("Tarefa desconhecida ou expirada", 404)
+
+    resposta = {
+        "id": tarefa.id,
+        "escola": tarefa.info["escola"],
+        "estado": tarefa.estado,
+        "tempo_decorrido": round(tarefa.tempo_decorrido, 2),
+        "melhor_objetivo": tarefa.melhor_objetivo,
+    }
+    if tarefa.estado == CONCLUIDA:
+        # Montado uma vez só; as consultas seguintes reaproveitam
+        if "grade" not in tarefa.info:
+            aulas, estatisticas = tarefa.resultado
+            tarefa.info["grade"] = grade_em_dicionario(tarefa.info["escola"], aulas, estatisticas)
+            tarefa.resultado = None
+        resposta.update(tarefa.info["grade"])
+    elif tarefa.erro:
+        resposta["erro"] = tarefa.erro.splitlines()[0]
+    return jsonify(resposta)
+
+
+@app.delete("/api/grades/<id_tarefa>")
+def cancelar_grade(id_tarefa):
+    gerenciador = obter_gerenciador()
+    if gerenciador.status(id_tarefa) is None:
+        return _erro("Tarefa desconhecida ou expirada", 404)
+    if not gerenciador.cancelar(id_tarefa):
+        return _erro("Tarefa já finalizada", 409)
+    return jsonify({"id": id_tarefa, "estado": "cancelada"})
+
+
+@app.get("/api/saude")
+def saude():
+    gerenciador = obter_gerenciador()
+    return jsonify({
+        "status": "ok",
+        "processos_geracao": gerenciador.max_processos,
+        "tarefas_em_aberto": gerenciador.em_aberto(),
+        "limite_tarefas_em_aberto": MAX_TAREFAS_ABERTAS,
+    })
+
+
+@app.errorhandler(413)
+def corpo_grande_demais(_):
+    return _erro("Escola grande demais para uma requisição", 413)
@@ -1,21 +1,54 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+import functools
 import pandas as pd
 import database
 from session_state import init_session_state
 from auto_save import salvar_tudo
 from models import Turma, Professor, Disciplina, Sala, DIAS_SEMANA, HORARIOS_EFII, HORARIOS_EM, HORARIOS_REAIS
-from scheduler_ortools import GradeHorariaORTools
-from simple_scheduler import SimpleGradeHoraria
-import io
+from geracao import gerar_aulas, resultado_do_algoritmo, ALGORITMOS, ALGORITMO_ORTOOLS_DICA
+from decomposicao import gerar_aulas_decompostas
+from viabilidade import analisar_viabilidade
+from reparo import reparar_grade
+from validacao import validar_grade
+from qualidade import METRICAS, avaliar_grade
+from turma_unica import gerar_turma
+from grade_index import IndiceGrade, DIAS_ORDENADOS
+from grade_colunar import GradeColunar
+from carga_turmas import IndiceCargas, calcular_carga_maxima
+from disponibilidade import MASCARA_SEMANA, bit_slot, definir_disponibilidade, disponivel, mascara_do_dia, mascara_professor
+import cache_grade
+import exportacao
+import renderizacao
+import importacao
+from persistencia import ATRASO_GRAVACAO, TIPOS_CADASTRO, Persistidor
+from tarefas import obter_gerenciador, PENDENTE, CONCLUIDA, FALHOU
+import time
 import traceback
 
 # Configuração da página
 st.set_page_config(page_title="Escola Timetable", layout="wide")
+inicio_execucao = time.perf_counter()
 st.title("🕒 Gerador Inteligente de Grade Horária - Horários Reais")
 
+def colecoes_cadastro():
+    """Listas de cadastro da sessão, por tipo, no formato do persistidor"""
+    return {tipo: st.session_state[tipo] for tipo in TIPOS_CADASTRO}
+
 # Inicialização
 try:
     init_session_state()
+    # Professores salvos no formato antigo ("seg_3") ganham a máscara de bits
+    for professor in st.session_state.get('professores', []):
+        mascara_professor(professor)
+    # Grade carregada do banco como lista de Aula passa para o formato colunar
+    if isinstance(st.session_state.get('aulas'), list):
+        st.session_state.aulas = GradeColunar(st.session_state.aulas)
+    if 'persistidor' not in st.session_state:
+        # O que init_session_state carregou do banco já está gravado: só o que mudar depois fica pendente
+        st.session_state.persistidor = Persistidor(salvar_tudo)
+        st.session_state.persistidor.conhecer(colecoes_cadastro(), st.session_state.get('aulas'))
+    persistidor = st.session_state.persistidor
     st.success("✅ Sistema inicializado com sucesso!")
 except Exception as e:
     st.error(f"❌ Erro na inicialização: {str(e)}")
@@ -36,12 +69,17 @@ def obter_grupo_seguro(objeto, opcoes=["A", "B", "AMBOS"]):
     except:
         return "A"
 
+def obter_indice_cargas():
+    """Índice turma -> disciplinas/carga, refeito só se as listas mudarem fora dos cadastros"""
+    indice = st.session_state.get('indice_cargas')
+    if indice is None or indice.desatualizado(st.session_state.turmas, st.session_state.disciplinas):
+        indice = IndiceCargas(st.session_state.turmas, st.session_state.disciplinas)
+        st.session_state.indice_cargas = indice
+    return indice
+
 def obter_segmento_turma(turma_nome):
-    """Determina o segmento da turma baseado no nome"""
-    if 'em' in turma_nome.lower():
-        return "EM"
-    else:
-        return "EF_II"
+    """Determina o segmento da turma (cadastrado na turma ou, na falta, pelo nome)"""
+    return obter_indice_cargas().segmento(turma_nome)
 
 def obter_horarios_turma(turma_nome):
     """Retorna os horários disponíveis para a turma"""
@@ -93,53 +131,234 @@ def obter_horario_real(turma_nome, horario):
         else:
             return f"Horário {horario}"
 
-# Função para calcular carga horária máxima por série
-def calcular_carga_maxima(serie):
-    """Calcula a carga horária máxima semanal baseada na série"""
-    if 'em' in serie.lower() or 'medio' in serie.lower() or serie in ['1em', '2em', '3em']:
-        return 35  # Ensino Médio: 35 horas (7 horas por dia × 5 dias)
+ITENS_POR_PAGINA = 20
+
+def listar_entidades(chave, itens, titulo, detalhes):
+    """Lista paginada e pesquisável de entidades; devolve a que está em edição (ou None)
+    
+    Cada entidade vira uma linha somente leitura com um botão de edição; o
+    formulário completo só é montado para a entidade escolhida. Deve ser
+    chamada dentro de um fragmento (@st.fragment).
+    """
+    todos = itens
+    busca = st.text_input("🔍 Buscar por nome", key=f"busca_{chave}")
+    if busca.strip():
+        termo = busca.strip().lower()
+        itens = [item for item in itens if termo in item.nome.lower()]
+    
+    total_paginas = max(1, -(-len(itens) // ITENS_POR_PAGINA))
+    chave_pagina = f"pagina_{chave}"
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = total_paginas
+    pagina = 1
+    if total_paginas > 1:
+        pagina = st.number_input(f"Página (de {total_paginas})", 1, total_paginas, key=chave_pagina)
+    
+    chave_edicao = f"editando_{chave}"
+    editando = st.session_state.get(chave_edicao)
+    inicio = (pagina - 1) * ITENS_POR_PAGINA
+    for item in itens[inicio:inicio + ITENS_POR_PAGINA]:
+        col_titulo, col_detalhes, col_botao = st.columns([3, 5, 1])
+        col_titulo.markdown(titulo(item))
+        col_detalhes.caption(detalhes(item))
+        em_edicao = item.id == editando
+        if col_botao.button("✖️" if em_edicao else "✏️", key=f"editar_{chave}_{item.id}",
+                            help="Fechar edição" if em_edicao else "Editar"):
+            st.session_state[chave_edicao] = None if em_edicao else item.id
+            reexecutar_fragmento()
+    
+    if itens:
+        st.caption(f"{len(itens)} de {len(todos)} itens · página {pagina} de {total_paginas}")
+    elif todos:
+        st.info("🔍 Nenhum item encontrado para a busca.")
+    
+    return next((item for item in todos if item.id == editando), None)
+
+# Nomes das colunas da grade colunar nas tabelas exibidas
+COLUNAS_TABELA_AULAS = {
+    "turma": "Turma", "disciplina": "Disciplina", "professor": "Professor", "sala": "Sala",
+    "dia": "Dia", "horario": "Horário", "grupo": "Grupo"
+}
+
+def obter_indice_grade(aulas):
+    """Retorna o índice da grade, reconstruindo-o apenas quando a grade muda"""
+    indice = st.session_state.get('indice_grade')
+    if indice is None or indice.aulas is not aulas:
+        indice = IndiceGrade(aulas)
+        st.session_state.indice_grade = indice
+    return indice
+
+def salvar_grade():
+    """Grava na hora a grade da sessão, junto com os cadastros pendentes (uma chamada a salvar_tudo)"""
+    persistidor.grade_alterada(st.session_state.aulas)
+    if persistidor.descarregar():
+        return True
+    st.error(f"❌ Erro ao salvar a grade: {persistidor.ultimo_erro}")
+    return False
+
+def validar_grade_publicada():
+    """Confere a grade da sessão contra os cadastros atuais e guarda o relatório"""
+    aulas = st.session_state.get('aulas')
+    if not aulas:
+        st.session_state.validacao_grade = None
+        return None
+    turmas_na_grade = set(a.turma for a in aulas)
+    relatorio = validar_grade(
+        aulas,
+        [t for t in st.session_state.turmas if t.nome in turmas_na_grade],
+        st.session_state.professores,
+        st.session_state.disciplinas
+    )
+    st.session_state.validacao_grade = (aulas, relatorio)
+    return relatorio
+
+def exibir_validacao(relatorio):
+    if relatorio.valida:
+        st.caption(f"✅ Grade validada: {relatorio.aulas} aulas sem conflitos ({relatorio.tempo_ms:.0f} ms)")
+        return
+    resumo = ", ".join(f"{tipo}: {quantidade}" for tipo, quantidade in relatorio.resumo().items())
+    st.error(f"❌ A grade tem {relatorio.contagem()} problema(s): {resumo}")
+    with st.expander("🔎 Problemas encontrados na validação"):
+        st.dataframe(
+            pd.DataFrame(relatorio.problemas[:500], columns=["Problema", "Turma", "Detalhe"]),
+            use_container_width=True, hide_index=True
+        )
+
+def obter_qualidade_grade(aulas):
+    """Métricas de qualidade da grade publicada, recalculadas só quando ela muda"""
+    guardada = st.session_state.get('qualidade_grade')
+    if guardada is None or guardada[0] is not aulas:
+        qualidade = avaliar_grade(
+            aulas, st.session_state.turmas, st.session_state.professores,
+            st.session_state.disciplinas, st.session_state.salas
+        )
+        guardada = st.session_state.qualidade_grade = (aulas, qualidade)
+    return guardada[1]
+
+def aplicar_grade(aulas, metodo, grupo_texto, turma=None):
+    """Publica a grade gerada na sessão e salva no banco (na hora, não em segundo plano)
+    
+    Com `turma`, só as aulas dessa turma são trocadas; as das outras turmas
+    continuam como estavam na grade publicada.
+    """
+    if turma:
+        aulas = [a for a in aulas if a.turma == turma]
+        aulas_outras = [a for a in st.session_state.get('aulas', []) if a.turma != turma]
+        st.session_state.aulas = GradeColunar(aulas_outras + aulas)
     else:
-        return 25  # EF II: 25 horas
+        st.session_state.aulas = GradeColunar(aulas)
+    st.session_state.resultado_grade = {"metodo": metodo, "grupo_texto": grupo_texto}
+    validar_grade_publicada()
+    if salvar_grade():
+        st.success(f"✅ Grade {grupo_texto} gerada com {metodo}! ({len(aulas)} aulas)")
+
+def fixar_aulas(linhas, fixadas):
+    """Das `linhas` da grade publicada, deixa fixas só as `fixadas` e salva"""
+    st.session_state.aulas = st.session_state.aulas.com_fixas(linhas, False).com_fixas(fixadas, True)
+    salvar_grade()
+
+def encerrar_acompanhamento_tarefa():
+    """Esquece a tarefa de geração acompanhada por esta sessão"""
+    st.session_state.pop('tarefa_grade', None)
+    if "tarefa" in st.query_params:
+        del st.query_params["tarefa"]
+
+def registrar_latencia(origem, inicio):
+    """Guarda quanto tempo a execução (página ou fragmento) levou, em ms"""
+    latencias = st.session_state.setdefault('latencias', [])
+    latencias.append((origem, (time.perf_counter() - inicio) * 1000))
+    del latencias[:-50]  # só as últimas 50 interações
+
+def reexecutar_fragmento():
+    """Reexecuta só o fragmento atual; fora de uma reexecução de fragmento, a página toda"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def fragmento_medido(funcao):
+    """st.fragment que registra a latência de cada reexecução do trecho"""
+    @functools.wraps(funcao)
+    def executar():
+        inicio = time.perf_counter()
+        try:
+            funcao()
+        finally:
+            registrar_latencia(funcao.__name__, inicio)
+    return st.fragment(executar)
+
+def acompanhar_tarefa_grade():
+    """Publica o resultado da geração em segundo plano, se já terminou
 
-# Função para converter entre formatos de dias
-def converter_dia_para_semana(dia):
-    """Converte dia do formato completo para abreviado (DIAS_SEMANA)"""
-    if dia == "segunda": return "seg"
-    elif dia == "terca": return "ter"
-    elif dia == "quarta": return "qua"
-    elif dia == "quinta": return "qui"
-    elif dia == "sexta": return "sex"
-    else: return dia
+    Roda em toda execução completa, antes da seção escolhida, para a grade
+    chegar mesmo com o usuário em outra seção. Retorna a tarefa se ainda
+    estiver em andamento.
+    """
+    id_tarefa = st.session_state.get('tarefa_grade') or st.query_params.get("tarefa")
+    if not id_tarefa:
+        return None
+    gerenciador = obter_gerenciador()
+    tarefa = gerenciador.status(id_tarefa)
+    if tarefa is None:
+        # Tarefa expirada ou iniciada em outro processo do servidor
+        encerrar_acompanhamento_tarefa()
+        return None
+    st.session_state.tarefa_grade = id_tarefa
+    if not tarefa.finalizada:
+        return tarefa
+    
+    if tarefa.estado == CONCLUIDA:
+        aulas, metodo, aviso = tarefa.resultado
+        if aviso:
+            st.warning(aviso)
+        if resultado_do_algoritmo(aulas, metodo):
+            cache_grade.guardar(tarefa.info["chave_cache"], aulas, metodo, aviso)
+        aplicar_grade(aulas, metodo, tarefa.info["grupo_texto"], tarefa.info["turma"])
+    elif tarefa.estado == FALHOU:
+        st.error("❌ Erro ao gerar grade")
+        st.code(tarefa.erro)
+    else:
+        st.warning("⛔ Geração cancelada.")
+    gerenciador.descartar(id_tarefa)
+    encerrar_acompanhamento_tarefa()
+    return None
 
-def converter_dia_para_completo(dia):
-    """Converte dia do formato abreviado para completo"""
-    if dia == "seg": return "segunda"
-    elif dia == "ter": return "terca"
-    elif dia == "qua": return "quarta"
-    elif dia == "qui": return "quinta"
-    elif dia == "sex": return "sexta"
-    else: return dia
+@st.fragment(run_every=1)
+def progresso_tarefa_grade():
+    """Estado da geração em andamento, atualizado a cada segundo só neste trecho"""
+    gerenciador = obter_gerenciador()
+    id_tarefa = st.session_state.get('tarefa_grade')
+    tarefa = gerenciador.status(id_tarefa) if id_tarefa else None
+    if tarefa is None or tarefa.finalizada:
+        st.rerun()  # a execução completa publica o resultado
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Estado", "Na fila" if tarefa.estado == PENDENTE else "Resolvendo")
+    with col2:
+        st.metric("Tempo Decorrido", f"{tarefa.tempo_decorrido:.0f}s")
+    with col3:
+        st.metric("Melhor Objetivo", "-" if tarefa.melhor_objetivo is None else tarefa.melhor_objetivo)
+    st.info(f"⏳ Gerando grade para {tarefa.info.get('grupo_texto', '')}... você pode continuar usando o sistema.")
+    
+    if st.button("⛔ Cancelar Geração", key="cancelar_tarefa_grade"):
+        gerenciador.cancelar(id_tarefa)
+        gerenciador.descartar(id_tarefa)
+        encerrar_acompanhamento_tarefa()
+        st.rerun()
 
-def converter_disponibilidade_para_semana(disponibilidade):
-    """Converte conjunto de disponibilidade para formato DIAS_SEMANA"""
-    convertido = []
-    for dia in disponibilidade:
-        dia_convertido = converter_dia_para_semana(dia)
-        if dia_convertido in DIAS_SEMANA:
-            convertido.append(dia_convertido)
-    return convertido
+# Estilo das tabelas de grade, emitido uma vez por página
+st.markdown(renderizacao.ESTILO_GRADES, unsafe_allow_html=True)
 
-def converter_disponibilidade_para_completo(disponibilidade):
-    """Converte conjunto de disponibilidade para formato completo"""
-    convertido = set()
-    for dia in disponibilidade:
-        convertido.add(converter_dia_para_completo(dia))
-    return convertido
+# Menu de seções: só a seção visível é executada (st.tabs executaria todas)
+ABAS = ["🏠 Início", "📚 Disciplinas", "👩‍🏫 Professores", "🎒 Turmas", "🏫 Salas", "🗓️ Gerar Grade", "👨‍🏫 Grade por Professor"]
+aba_ativa = st.radio("Seção", ABAS, horizontal=True, key="aba_ativa", label_visibility="collapsed")
 
-# Menu de abas
-abas = st.tabs(["🏠 Início", "📚 Disciplinas", "👩‍🏫 Professores", "🎒 Turmas", "🏫 Salas", "🗓️ Gerar Grade", "👨‍🏫 Grade por Professor"])
+# Geração em segundo plano: resultado publicado em qualquer seção, progresso num fragmento
+if acompanhar_tarefa_grade() is not None:
+    progresso_tarefa_grade()
 
-with abas[0]:  # ABA INÍCIO
+if aba_ativa == ABAS[0]:  # ABA INÍCIO
     st.header("Dashboard")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -172,53 +391,78 @@ with abas[0]:  # ABA INÍCIO
         st.write(f"Períodos: 7 aulas + intervalo")
     
     # Verificação de carga horária
-    #st.subheader("📈 Verificação de Carga Horária")
-    #for turma in st.session_state.turmas:
-     #   carga_total = 0
-      #  disciplinas_turma = []
-       # grupo_turma = obter_grupo_seguro(turma)
-        #segmento = obter_segmento_turma(turma.nome)
-        
-        # Função para calcular carga horária máxima por série
-    def calcular_carga_maxima(serie):
-    """Calcula a quantidade MÁXIMA de aulas semanais baseada na série"""
-    if 'em' in serie.lower() or 'medio' in serie.lower() or serie in ['1em', '2em', '3em']:
-        return 35  # EM: máximo de 35 aulas por semana (7 aulas × 5 dias)
-    else:
-        return 25  # EF II: máximo de 25 aulas por semana (5 aulas × 5 dias)
-        
+    st.subheader("📈 Verificação de Carga Horária")
+    indice_cargas = obter_indice_cargas()
+    for turma in st.session_state.turmas:
+        carga = indice_cargas.carga(turma)
+        status = "❌" if carga.excedida else "✅"
         
-        
-        
-        # ✅ CORREÇÃO: Verificar disciplinas vinculadas DIRETAMENTE à turma
-        for disc in st.session_state.disciplinas:
-            if turma.nome in disc.turmas and obter_grupo_seguro(disc) == grupo_turma:
-                carga_total += disc.carga_semanal
-                disciplinas_turma.append(f"{disc.nome} ({disc.carga_semanal}h)")
-        
-        carga_maxima = calcular_carga_maxima(turma.serie)
-        status = "✅" if carga_total <= carga_maxima else "❌"
-        
-        st.write(f"**{turma.nome}** [{grupo_turma}] ({segmento}): {carga_total}/{carga_maxima}h {status}")
-        if disciplinas_turma:
-            st.caption(f"Disciplinas: {', '.join(disciplinas_turma)}")
+        st.write(f"**{turma.nome}** [{obter_grupo_seguro(turma)}] ({carga.segmento}): {carga.carga_total}/{carga.carga_maxima}h {status}")
+        if carga.disciplinas:
+            st.caption(f"Disciplinas: {', '.join(f'{d.nome} ({d.carga_semanal}h)' for d in carga.disciplinas)}")
         else:
             st.caption("⚠️ Nenhuma disciplina atribuída para este grupo")
     
     if st.button("💾 Salvar Tudo no Banco"):
         try:
-            if salvar_tudo():
+            if persistidor.descarregar(forcar=True):
                 st.success("✅ Todos os dados salvos!")
             else:
-                st.error("❌ Erro ao salvar dados")
+                st.error(f"❌ Erro ao salvar dados: {persistidor.ultimo_erro}")
         except Exception as e:
             st.error(f"❌ Erro ao salvar: {str(e)}")
+    
+    with st.expander("📥 Importar Planilhas (CSV ou Excel)"):
+        st.write("Um arquivo CSV por cadastro (turmas.csv, disciplinas.csv, professores.csv, salas.csv) "
+                 "ou uma planilha .xlsx com abas de mesmo nome. Colunas:")
+        for tipo, colunas in importacao.COLUNAS_MODELO.items():
+            st.caption(f"**{tipo}:** {colunas}")
+        arquivos = st.file_uploader("Arquivos", type=["csv", "xlsx"], accept_multiple_files=True)
+        if arquivos and st.button("📥 Importar"):
+            try:
+                inicio = time.perf_counter()
+                resultado = importacao.importar(
+                    arquivos, st.session_state.turmas, st.session_state.disciplinas,
+                    st.session_state.professores, st.session_state.salas
+                )
+                if resultado.erros:
+                    st.error(f"❌ {len(resultado.erros)} erro(s) em {resultado.linhas_lidas} linhas; nada foi importado.")
+                    st.dataframe(
+                        pd.DataFrame(resultado.erros[:200], columns=["Arquivo", "Linha", "Erro"]),
+                        use_container_width=True, hide_index=True
+                    )
+                else:
+                    tamanhos = {tipo: len(st.session_state[tipo]) for tipo in resultado.novos}
+                    for tipo, objetos in resultado.novos.items():
+                        st.session_state[tipo].extend(objetos)
+                    # Uma gravação só pelo módulo database; se falhar, a sessão volta como estava
+                    try:
+                        gravado, erro = salvar_tudo(), None
+                    except Exception as e:
+                        gravado, erro = False, str(e)
+                    if not gravado:
+                        for tipo, tamanho in tamanhos.items():
+                            del st.session_state[tipo][tamanho:]
+                        st.error(f"❌ Erro ao salvar a importação no banco{f': {erro}' if erro else ''}; nada foi importado.")
+                    else:
+                        persistidor.conhecer(resultado.novos)
+                        resumo = ", ".join(f"{len(objetos)} {tipo}" for tipo, objetos in resultado.novos.items() if objetos)
+                        st.success(f"✅ Importados em {time.perf_counter() - inicio:.1f}s: {resumo or 'nenhuma linha'}")
+                        # A grade publicada continua valendo com os novos cadastros?
+                        validacao = validar_grade_publicada()
+                        if validacao is not None and not validacao.valida:
+                            st.warning(
+                                f"⚠️ A grade publicada tem {validacao.contagem()} problema(s) com os cadastros importados "
+                                "(veja em Gerar Grade)."
+                            )
+            except ImportError:
+                st.warning("⚠️ Módulo 'openpyxl' não instalado. Para importar Excel, instale: pip install openpyxl")
+            except Exception as e:
+                st.error(f"❌ Erro ao importar: {str(e)}")
 
-with abas[1]:  # ABA DISCIPLINAS
+if aba_ativa == ABAS[1]:  # ABA DISCIPLINAS
     st.header("📚 Disciplinas")
     
-    grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B"], key="filtro_disc")
-    
     with st.expander("➕ Adicionar Nova Disciplina", expanded=False):
         with st.form("add_disc"):
             col1, col2 = st.columns(2)
@@ -241,92 +485,105 @@ with abas[1]:  # ABA DISCIPLINAS
                             nome, carga, tipo, turmas_selecionadas, grupo, cor_fundo, cor_fonte
                         )
                         st.session_state.disciplinas.append(nova_disciplina)
-                        if salvar_tudo():
-                            st.success(f"✅ Disciplina '{nome}' adicionada!")
+                        obter_indice_cargas().disciplina_alterada(nova_disciplina)
+                        persistidor.alterado("disciplinas", nova_disciplina)
+                        st.success(f"✅ Disciplina '{nome}' adicionada!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Erro ao adicionar disciplina: {str(e)}")
                 else:
                     st.error("❌ Preencha todos os campos obrigatórios (*)")
     
-    st.subheader("📋 Lista de Disciplinas")
+    @fragmento_medido
+    def lista_disciplinas():
+        # Busca, filtro, paginação e edição reexecutam só este trecho
+        st.subheader("📋 Lista de Disciplinas")
+        grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B"], key="filtro_disc")
     
-    disciplinas_exibir = st.session_state.disciplinas
-    if grupo_filtro != "Todos":
-        disciplinas_exibir = [d for d in st.session_state.disciplinas if obter_grupo_seguro(d) == grupo_filtro]
+        disciplinas_exibir = st.session_state.disciplinas
+        if grupo_filtro != "Todos":
+            disciplinas_exibir = [d for d in st.session_state.disciplinas if obter_grupo_seguro(d) == grupo_filtro]
     
-    if not disciplinas_exibir:
-        st.info("📝 Nenhuma disciplina cadastrada. Use o formulário acima para adicionar.")
+        if not disciplinas_exibir:
+            st.info("📝 Nenhuma disciplina cadastrada. Use o formulário acima para adicionar.")
     
-    for disc in disciplinas_exibir:
-        with st.expander(f"📖 {disc.nome} [{obter_grupo_seguro(disc)}]", expanded=False):
-            with st.form(f"edit_disc_{disc.id}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    novo_nome = st.text_input("Nome", disc.nome, key=f"nome_{disc.id}")
-                    nova_carga = st.number_input("Carga Semanal", 1, 10, disc.carga_semanal, key=f"carga_{disc.id}")
-                    novo_tipo = st.selectbox(
-                        "Tipo", 
-                        ["pesada", "media", "leve", "pratica"],
-                        index=["pesada", "media", "leve", "pratica"].index(disc.tipo),
-                        key=f"tipo_{disc.id}"
-                    )
-                with col2:
-                    # ✅ MUDANÇA: Editar turmas específicas
-                    turmas_opcoes = [t.nome for t in st.session_state.turmas]
-                    turmas_selecionadas = st.multiselect(
-                        "Turmas", 
-                        turmas_opcoes,
-                        default=disc.turmas,
-                        key=f"turmas_{disc.id}"
-                    )
-                    novo_grupo = st.selectbox(
-                        "Grupo", 
-                        ["A", "B"],
-                        index=0 if obter_grupo_seguro(disc) == "A" else 1,
-                        key=f"grupo_{disc.id}"
-                    )
-                    nova_cor_fundo = st.color_picker("Cor de Fundo", disc.cor_fundo, key=f"cor_fundo_{disc.id}")
-                    nova_cor_fonte = st.color_picker("Cor da Fonte", disc.cor_fonte, key=f"cor_fonte_{disc.id}")
+        disc = listar_entidades(
+            "disc", disciplinas_exibir,
+            lambda d: f"📖 **{d.nome}** [{obter_grupo_seguro(d)}]",
+            lambda d: f"{d.carga_semanal} aulas/semana · {d.tipo} · {len(d.turmas)} turmas"
+        )
+        if disc is not None:
+            with st.expander(f"✏️ Editando: {disc.nome} [{obter_grupo_seguro(disc)}]", expanded=True):
+                with st.form(f"edit_disc_{disc.id}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        novo_nome = st.text_input("Nome", disc.nome, key=f"nome_{disc.id}")
+                        nova_carga = st.number_input("Carga Semanal", 1, 10, disc.carga_semanal, key=f"carga_{disc.id}")
+                        novo_tipo = st.selectbox(
+                            "Tipo", 
+                            ["pesada", "media", "leve", "pratica"],
+                            index=["pesada", "media", "leve", "pratica"].index(disc.tipo),
+                            key=f"tipo_{disc.id}"
+                        )
+                    with col2:
+                        # ✅ MUDANÇA: Editar turmas específicas
+                        turmas_opcoes = [t.nome for t in st.session_state.turmas]
+                        turmas_selecionadas = st.multiselect(
+                            "Turmas", 
+                            turmas_opcoes,
+                            default=disc.turmas,
+                            key=f"turmas_{disc.id}"
+                        )
+                        novo_grupo = st.selectbox(
+                            "Grupo", 
+                            ["A", "B"],
+                            index=0 if obter_grupo_seguro(disc) == "A" else 1,
+                            key=f"grupo_{disc.id}"
+                        )
+                        nova_cor_fundo = st.color_picker("Cor de Fundo", disc.cor_fundo, key=f"cor_fundo_{disc.id}")
+                        nova_cor_fonte = st.color_picker("Cor da Fonte", disc.cor_fonte, key=f"cor_fonte_{disc.id}")
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.form_submit_button("💾 Salvar Alterações"):
-                        if novo_nome and turmas_selecionadas:
-                            try:
-                                disc.nome = novo_nome
-                                disc.carga_semanal = nova_carga
-                                disc.tipo = novo_tipo
-                                disc.turmas = turmas_selecionadas
-                                disc.grupo = novo_grupo
-                                disc.cor_fundo = nova_cor_fundo
-                                disc.cor_fonte = nova_cor_fonte
-                                
-                                if salvar_tudo():
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("💾 Salvar Alterações"):
+                            if novo_nome and turmas_selecionadas:
+                                try:
+                                    disc.nome = novo_nome
+                                    disc.carga_semanal = nova_carga
+                                    disc.tipo = novo_tipo
+                                    disc.turmas = turmas_selecionadas
+                                    disc.grupo = novo_grupo
+                                    disc.cor_fundo = nova_cor_fundo
+                                    disc.cor_fonte = nova_cor_fonte
+                                    obter_indice_cargas().disciplina_alterada(disc)
+                                    persistidor.alterado("disciplinas", disc)
                                     st.success("✅ Disciplina atualizada!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Erro ao atualizar: {str(e)}")
-                        else:
-                            st.error("❌ Preencha todos os campos obrigatórios")
+                                    reexecutar_fragmento()
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao atualizar: {str(e)}")
+                            else:
+                                st.error("❌ Preencha todos os campos obrigatórios")
                 
-                with col2:
-                    if st.form_submit_button("🗑️ Excluir Disciplina", type="secondary"):
-                        try:
-                            st.session_state.disciplinas.remove(disc)
-                            if salvar_tudo():
+                    with col2:
+                        if st.form_submit_button("🗑️ Excluir Disciplina", type="secondary"):
+                            try:
+                                st.session_state.disciplinas.remove(disc)
+                                obter_indice_cargas().disciplina_removida(disc)
+                                persistidor.removido("disciplinas", disc)
                                 st.success("✅ Disciplina excluída!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Erro ao excluir: {str(e)}")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"❌ Erro ao excluir: {str(e)}")
+    
+    lista_disciplinas()
 
-with abas[2]:  # ABA PROFESSORES
+if aba_ativa == ABAS[2]:  # ABA PROFESSORES
     st.header("👩‍🏫 Professores")
     
-    grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B", "AMBOS"], key="filtro_prof")
     disc_nomes = [d.nome for d in st.session_state.disciplinas]
     
-    with st.expander("➕ Adicionar Novo Professor", expanded=False):
+    # Formulário com 40 caixas de horário: só é montado quando aberto
+    if st.toggle("➕ Adicionar Novo Professor", key="mostrar_add_prof"):
         with st.form("add_prof"):
             col1, col2 = st.columns(2)
             with col1:
@@ -337,7 +594,7 @@ with abas[2]:  # ABA PROFESSORES
                 disponibilidade = st.multiselect("Dias Disponíveis*", DIAS_SEMANA, default=DIAS_SEMANA)
                 st.write("**Horários Indisponíveis:**")
                 
-                horarios_indisponiveis = []
+                bits_indisponiveis = 0
                 for dia in DIAS_SEMANA:
                     with st.container():
                         st.write(f"**{dia.upper()}:**")
@@ -347,125 +604,128 @@ with abas[2]:  # ABA PROFESSORES
                         for i, horario in enumerate(horarios_todos):
                             with horarios_cols[i % 4]:
                                 if st.checkbox(f"{horario}º", key=f"add_{dia}_{horario}"):
-                                    horarios_indisponiveis.append(f"{dia}_{horario}")
+                                    bits_indisponiveis |= 1 << bit_slot(dia, horario)
             
             if st.form_submit_button("✅ Adicionar Professor"):
                 if nome and disciplinas and disponibilidade:
                     try:
-                        # Converter para formato completo para compatibilidade
-                        disponibilidade_completa = converter_disponibilidade_para_completo(disponibilidade)
+                        mascara = 0
+                        for dia in disponibilidade:
+                            mascara |= mascara_do_dia(dia)
                         
-                        novo_professor = Professor(
-                            nome, 
-                            disciplinas, 
-                            disponibilidade_completa, 
-                            grupo,
-                            set(horarios_indisponiveis)
-                        )
+                        novo_professor = Professor(nome, disciplinas, set(), grupo, set())
+                        definir_disponibilidade(novo_professor, mascara & ~bits_indisponiveis)
                         st.session_state.professores.append(novo_professor)
-                        if salvar_tudo():
-                            st.success(f"✅ Professor '{nome}' adicionado!")
+                        persistidor.alterado("professores", novo_professor)
+                        st.success(f"✅ Professor '{nome}' adicionado!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Erro ao adicionar professor: {str(e)}")
                 else:
                     st.error("❌ Preencha todos os campos obrigatórios (*)")
     
-    st.subheader("📋 Lista de Professores")
+    @fragmento_medido
+    def lista_professores():
+        # Busca, filtro, paginação e edição reexecutam só este trecho
+        st.subheader("📋 Lista de Professores")
+        grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B", "AMBOS"], key="filtro_prof")
     
-    professores_exibir = st.session_state.professores
-    if grupo_filtro != "Todos":
-        professores_exibir = [p for p in st.session_state.professores if obter_grupo_seguro(p) == grupo_filtro]
+        professores_exibir = st.session_state.professores
+        if grupo_filtro != "Todos":
+            professores_exibir = [p for p in st.session_state.professores if obter_grupo_seguro(p) == grupo_filtro]
     
-    if not professores_exibir:
-        st.info("📝 Nenhum professor cadastrado. Use o formulário acima para adicionar.")
+        if not professores_exibir:
+            st.info("📝 Nenhum professor cadastrado. Use o formulário acima para adicionar.")
     
-    for prof in professores_exibir:
-        with st.expander(f"👨‍🏫 {prof.nome} [{obter_grupo_seguro(prof)}]", expanded=False):
-            disciplinas_validas = [d for d in prof.disciplinas if d in disc_nomes]
+        prof = listar_entidades(
+            "prof", professores_exibir,
+            lambda p: f"👨‍🏫 **{p.nome}** [{obter_grupo_seguro(p)}]",
+            lambda p: f"{', '.join(p.disciplinas) or 'sem disciplinas'} · {bin(mascara_professor(p)).count('1')} horários livres"
+        )
+        if prof is not None:
+            with st.expander(f"✏️ Editando: {prof.nome} [{obter_grupo_seguro(prof)}]", expanded=True):
+                disciplinas_validas = [d for d in prof.disciplinas if d in disc_nomes]
             
-            with st.form(f"edit_prof_{prof.id}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    novo_nome = st.text_input("Nome", prof.nome, key=f"nome_prof_{prof.id}")
-                    novas_disciplinas = st.multiselect(
-                        "Disciplinas", 
-                        disc_nomes, 
-                        default=disciplinas_validas,
-                        key=f"disc_prof_{prof.id}"
-                    )
-                    novo_grupo = st.selectbox(
-                        "Grupo", 
-                        ["A", "B", "AMBOS"],
-                        index=["A", "B", "AMBOS"].index(obter_grupo_seguro(prof)),
-                        key=f"grupo_prof_{prof.id}"
-                    )
-                with col2:
-                    # ✅ CORREÇÃO: Converter disponibilidade para formato DIAS_SEMANA
-                    disponibilidade_convertida = converter_disponibilidade_para_semana(prof.disponibilidade)
+                with st.form(f"edit_prof_{prof.id}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        novo_nome = st.text_input("Nome", prof.nome, key=f"nome_prof_{prof.id}")
+                        novas_disciplinas = st.multiselect(
+                            "Disciplinas", 
+                            disc_nomes, 
+                            default=disciplinas_validas,
+                            key=f"disc_prof_{prof.id}"
+                        )
+                        novo_grupo = st.selectbox(
+                            "Grupo", 
+                            ["A", "B", "AMBOS"],
+                            index=["A", "B", "AMBOS"].index(obter_grupo_seguro(prof)),
+                            key=f"grupo_prof_{prof.id}"
+                        )
+                    with col2:
+                        mascara_atual = mascara_professor(prof)
+                        dias_atuais = [dia for dia in DIAS_SEMANA if mascara_atual & mascara_do_dia(dia)]
                     
-                    nova_disponibilidade = st.multiselect(
-                        "Dias Disponíveis", 
-                        DIAS_SEMANA, 
-                        default=disponibilidade_convertida,
-                        key=f"disp_prof_{prof.id}"
-                    )
+                        nova_disponibilidade = st.multiselect(
+                            "Dias Disponíveis", 
+                            DIAS_SEMANA, 
+                            default=dias_atuais,
+                            key=f"disp_prof_{prof.id}"
+                        )
                     
-                    st.write("**Horários Indisponíveis:**")
-                    novos_horarios_indisponiveis = []
-                    horarios_todos = list(range(1, 9))  # 1-8 para cobrir EM
-                    for dia in DIAS_SEMANA:
-                        with st.container():
-                            st.write(f"**{dia.upper()}:**")
-                            horarios_cols = st.columns(4)
-                            for i, horario in enumerate(horarios_todos):
-                                with horarios_cols[i % 4]:
-                                    checked = f"{dia}_{horario}" in prof.horarios_indisponiveis
-                                    if st.checkbox(
-                                        f"{horario}º", 
-                                        value=checked,
-                                        key=f"edit_{prof.id}_{dia}_{horario}"
-                                    ):
-                                        novos_horarios_indisponiveis.append(f"{dia}_{horario}")
+                        st.write("**Horários Indisponíveis:**")
+                        novos_bits_indisponiveis = 0
+                        horarios_todos = list(range(1, 9))  # 1-8 para cobrir EM
+                        for dia in DIAS_SEMANA:
+                            with st.container():
+                                st.write(f"**{dia.upper()}:**")
+                                horarios_cols = st.columns(4)
+                                for i, horario in enumerate(horarios_todos):
+                                    with horarios_cols[i % 4]:
+                                        checked = dia in dias_atuais and not disponivel(mascara_atual, dia, horario)
+                                        if st.checkbox(
+                                            f"{horario}º", 
+                                            value=checked,
+                                            key=f"edit_{prof.id}_{dia}_{horario}"
+                                        ):
+                                            novos_bits_indisponiveis |= 1 << bit_slot(dia, horario)
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.form_submit_button("💾 Salvar Alterações"):
-                        if novo_nome and novas_disciplinas and nova_disponibilidade:
-                            try:
-                                prof.nome = novo_nome
-                                prof.disciplinas = novas_disciplinas
-                                prof.grupo = novo_grupo
-                                
-                                # Converter de volta para formato completo
-                                disponibilidade_completa = converter_disponibilidade_para_completo(nova_disponibilidade)
-                                
-                                prof.disponibilidade = disponibilidade_completa
-                                prof.horarios_indisponiveis = set(novos_horarios_indisponiveis)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("💾 Salvar Alterações"):
+                            if novo_nome and novas_disciplinas and nova_disponibilidade:
+                                try:
+                                    prof.nome = novo_nome
+                                    prof.disciplinas = novas_disciplinas
+                                    prof.grupo = novo_grupo
                                 
-                                if salvar_tudo():
+                                    nova_mascara = 0
+                                    for dia in nova_disponibilidade:
+                                        nova_mascara |= mascara_do_dia(dia)
+                                    definir_disponibilidade(prof, nova_mascara & ~novos_bits_indisponiveis)
+                                    persistidor.alterado("professores", prof)
                                     st.success("✅ Professor atualizado!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Erro ao atualizar: {str(e)}")
-                        else:
-                            st.error("❌ Preencha todos os campos obrigatórios")
+                                    reexecutar_fragmento()
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao atualizar: {str(e)}")
+                            else:
+                                st.error("❌ Preencha todos os campos obrigatórios")
                 
-                with col2:
-                    if st.form_submit_button("🗑️ Excluir Professor", type="secondary"):
-                        try:
-                            st.session_state.professores.remove(prof)
-                            if salvar_tudo():
+                    with col2:
+                        if st.form_submit_button("🗑️ Excluir Professor", type="secondary"):
+                            try:
+                                st.session_state.professores.remove(prof)
+                                persistidor.removido("professores", prof)
                                 st.success("✅ Professor excluído!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Erro ao excluir: {str(e)}")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"❌ Erro ao excluir: {str(e)}")
+    
+    lista_professores()
 
-with abas[3]:  # ABA TURMAS
+if aba_ativa == ABAS[3]:  # ABA TURMAS
     st.header("🎒 Turmas")
     
-    grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B"], key="filtro_turma")
-    
     with st.expander("➕ Adicionar Nova Turma", expanded=False):
         with st.form("add_turma"):
             col1, col2 = st.columns(2)
@@ -485,90 +745,94 @@ with abas[3]:  # ABA TURMAS
                     try:
                         nova_turma = Turma(nome, serie, "manha", grupo, segmento)
                         st.session_state.turmas.append(nova_turma)
-                        if salvar_tudo():
-                            st.success(f"✅ Turma '{nome}' adicionada!")
+                        obter_indice_cargas().turma_alterada(nova_turma)
+                        persistidor.alterado("turmas", nova_turma)
+                        st.success(f"✅ Turma '{nome}' adicionada!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Erro ao adicionar turma: {str(e)}")
                 else:
                     st.error("❌ Preencha todos os campos obrigatórios (*)")
     
-    st.subheader("📋 Lista de Turmas")
+    @fragmento_medido
+    def lista_turmas():
+        # Busca, filtro, paginação e edição reexecutam só este trecho
+        st.subheader("📋 Lista de Turmas")
+        grupo_filtro = st.selectbox("Filtrar por Grupo", ["Todos", "A", "B"], key="filtro_turma")
     
-    turmas_exibir = st.session_state.turmas
-    if grupo_filtro != "Todos":
-        turmas_exibir = [t for t in st.session_state.turmas if obter_grupo_seguro(t) == grupo_filtro]
+        turmas_exibir = st.session_state.turmas
+        if grupo_filtro != "Todos":
+            turmas_exibir = [t for t in st.session_state.turmas if obter_grupo_seguro(t) == grupo_filtro]
     
-    if not turmas_exibir:
-        st.info("📝 Nenhuma turma cadastrada. Use o formulário acima para adicionar.")
+        if not turmas_exibir:
+            st.info("📝 Nenhuma turma cadastrada. Use o formulário acima para adicionar.")
     
-    for turma in turmas_exibir:
-        with st.expander(f"🎒 {turma.nome} [{obter_grupo_seguro(turma)}]", expanded=False):
-            with st.form(f"edit_turma_{turma.id}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    novo_nome = st.text_input("Nome", turma.nome, key=f"nome_turma_{turma.id}")
-                    nova_serie = st.text_input("Série", turma.serie, key=f"serie_turma_{turma.id}")
-                with col2:
-                    st.text_input("Turno", "manha", disabled=True, key=f"turno_turma_{turma.id}")
-                    novo_grupo = st.selectbox(
-                        "Grupo", 
-                        ["A", "B"],
-                        index=0 if obter_grupo_seguro(turma) == "A" else 1,
-                        key=f"grupo_turma_{turma.id}"
-                    )
-                
-                # Mostrar informações da turma
-                segmento = obter_segmento_turma(turma.nome)
-                horarios = obter_horarios_turma(turma.nome)
-                st.write(f"**Segmento:** {segmento}")
-                st.write(f"**Horários disponíveis:** {len(horarios)} períodos")
+        turma = listar_entidades(
+            "turma", turmas_exibir,
+            lambda t: f"🎒 **{t.nome}** [{obter_grupo_seguro(t)}]",
+            lambda t: f"Série {t.serie} · {obter_segmento_turma(t.nome)}"
+        )
+        if turma is not None:
+            with st.expander(f"✏️ Editando: {turma.nome} [{obter_grupo_seguro(turma)}]", expanded=True):
+                with st.form(f"edit_turma_{turma.id}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        novo_nome = st.text_input("Nome", turma.nome, key=f"nome_turma_{turma.id}")
+                        nova_serie = st.text_input("Série", turma.serie, key=f"serie_turma_{turma.id}")
+                    with col2:
+                        st.text_input("Turno", "manha", disabled=True, key=f"turno_turma_{turma.id}")
+                        novo_grupo = st.selectbox(
+                            "Grupo", 
+                            ["A", "B"],
+                            index=0 if obter_grupo_seguro(turma) == "A" else 1,
+                            key=f"grupo_turma_{turma.id}"
+                        )
                 
-                grupo_turma = obter_grupo_seguro(turma)
-                carga_atual = 0
-                disciplinas_turma = []
+                    # Mostrar informações da turma
+                    carga = obter_indice_cargas().carga(turma)
+                    horarios = obter_horarios_turma(turma.nome)
+                    st.write(f"**Segmento:** {carga.segmento}")
+                    st.write(f"**Horários disponíveis:** {len(horarios)} períodos")
                 
-                # ✅ CORREÇÃO: Verificar disciplinas vinculadas DIRETAMENTE à turma
-                for disc in st.session_state.disciplinas:
-                    if turma.nome in disc.turmas and obter_grupo_seguro(disc) == grupo_turma:
-                        carga_atual += disc.carga_semanal
-                        disciplinas_turma.append(disc.nome)
+                    grupo_turma = obter_grupo_seguro(turma)
+                    st.write(f"**Carga horária atual:** {carga.carga_total}/{carga.carga_maxima}h")
+                    if carga.disciplinas:
+                        st.caption(f"Disciplinas do Grupo {grupo_turma}: {', '.join(d.nome for d in carga.disciplinas)}")
+                    else:
+                        st.caption("⚠️ Nenhuma disciplina do mesmo grupo atribuída")
                 
-                carga_maxima = calcular_carga_maxima(turma.serie)
-                st.write(f"**Carga horária atual:** {carga_atual}/{carga_maxima}h")
-                if disciplinas_turma:
-                    st.caption(f"Disciplinas do Grupo {grupo_turma}: {', '.join(disciplinas_turma)}")
-                else:
-                    st.caption("⚠️ Nenhuma disciplina do mesmo grupo atribuída")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("💾 Salvar Alterações"):
+                            if novo_nome and nova_serie:
+                                try:
+                                    nome_anterior = turma.nome
+                                    turma.nome = novo_nome
+                                    turma.serie = nova_serie
+                                    turma.grupo = novo_grupo
+                                    obter_indice_cargas().turma_alterada(turma, nome_anterior)
+                                    persistidor.alterado("turmas", turma)
+                                    st.success("✅ Turma atualizada!")
+                                    reexecutar_fragmento()
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao atualizar: {str(e)}")
+                            else:
+                                st.error("❌ Preencha todos os campos obrigatórios")
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.form_submit_button("💾 Salvar Alterações"):
-                        if novo_nome and nova_serie:
+                    with col2:
+                        if st.form_submit_button("🗑️ Excluir Turma", type="secondary"):
                             try:
-                                turma.nome = novo_nome
-                                turma.serie = nova_serie
-                                turma.grupo = novo_grupo
-                                
-                                if salvar_tudo():
-                                    st.success("✅ Turma atualizada!")
+                                st.session_state.turmas.remove(turma)
+                                obter_indice_cargas().turma_removida(turma)
+                                persistidor.removido("turmas", turma)
+                                st.success("✅ Turma excluída!")
                                 st.rerun()
                             except Exception as e:
-                                st.error(f"❌ Erro ao atualizar: {str(e)}")
-                        else:
-                            st.error("❌ Preencha todos os campos obrigatórios")
-                
-                with col2:
-                    if st.form_submit_button("🗑️ Excluir Turma", type="secondary"):
-                        try:
-                            st.session_state.turmas.remove(turma)
-                            if salvar_tudo():
-                                st.success("✅ Turma excluída!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Erro ao excluir: {str(e)}")
+                                st.error(f"❌ Erro ao excluir: {str(e)}")
+    
+    lista_turmas()
 
-with abas[4]:  # ABA SALAS
+if aba_ativa == ABAS[4]:  # ABA SALAS
     st.header("🏫 Salas")
     
     with st.expander("➕ Adicionar Nova Sala", expanded=False):
@@ -585,62 +849,71 @@ with abas[4]:  # ABA SALAS
                     try:
                         nova_sala = Sala(nome, capacidade, tipo)
                         st.session_state.salas.append(nova_sala)
-                        if salvar_tudo():
-                            st.success(f"✅ Sala '{nome}' adicionada!")
+                        persistidor.alterado("salas", nova_sala)
+                        st.success(f"✅ Sala '{nome}' adicionada!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Erro ao adicionar sala: {str(e)}")
                 else:
                     st.error("❌ Preencha todos os campos obrigatórios (*)")
     
-    st.subheader("📋 Lista de Salas")
+    @fragmento_medido
+    def lista_salas():
+        # Busca, filtro, paginação e edição reexecutam só este trecho
+        st.subheader("📋 Lista de Salas")
     
-    if not st.session_state.salas:
-        st.info("📝 Nenhuma sala cadastrada. Use o formulário acima para adicionar.")
+        if not st.session_state.salas:
+            st.info("📝 Nenhuma sala cadastrada. Use o formulário acima para adicionar.")
     
-    for sala in st.session_state.salas:
-        with st.expander(f"🏫 {sala.nome}", expanded=False):
-            with st.form(f"edit_sala_{sala.id}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    novo_nome = st.text_input("Nome", sala.nome, key=f"nome_sala_{sala.id}")
-                    nova_capacidade = st.number_input("Capacidade", 1, 100, sala.capacidade, key=f"cap_sala_{sala.id}")
-                with col2:
-                    novo_tipo = st.selectbox(
-                        "Tipo", 
-                        ["normal", "laboratório", "auditório"],
-                        index=["normal", "laboratório", "auditório"].index(sala.tipo),
-                        key=f"tipo_sala_{sala.id}"
-                    )
+        sala = listar_entidades(
+            "sala", st.session_state.salas,
+            lambda s: f"🏫 **{s.nome}**",
+            lambda s: f"{s.tipo} · {s.capacidade} lugares"
+        )
+        if sala is not None:
+            with st.expander(f"✏️ Editando: {sala.nome}", expanded=True):
+                with st.form(f"edit_sala_{sala.id}"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        novo_nome = st.text_input("Nome", sala.nome, key=f"nome_sala_{sala.id}")
+                        nova_capacidade = st.number_input("Capacidade", 1, 100, sala.capacidade, key=f"cap_sala_{sala.id}")
+                    with col2:
+                        novo_tipo = st.selectbox(
+                            "Tipo", 
+                            ["normal", "laboratório", "auditório"],
+                            index=["normal", "laboratório", "auditório"].index(sala.tipo),
+                            key=f"tipo_sala_{sala.id}"
+                        )
                 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.form_submit_button("💾 Salvar Alterações"):
-                        if novo_nome:
-                            try:
-                                sala.nome = novo_nome
-                                sala.capacidade = nova_capacidade
-                                sala.tipo = novo_tipo
-                                
-                                if salvar_tudo():
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("💾 Salvar Alterações"):
+                            if novo_nome:
+                                try:
+                                    sala.nome = novo_nome
+                                    sala.capacidade = nova_capacidade
+                                    sala.tipo = novo_tipo
+                                    persistidor.alterado("salas", sala)
                                     st.success("✅ Sala atualizada!")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Erro ao atualizar: {str(e)}")
-                        else:
-                            st.error("❌ Preencha todos os campos obrigatórios")
+                                    reexecutar_fragmento()
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao atualizar: {str(e)}")
+                            else:
+                                st.error("❌ Preencha todos os campos obrigatórios")
                 
-                with col2:
-                    if st.form_submit_button("🗑️ Excluir Sala", type="secondary"):
-                        try:
-                            st.session_state.salas.remove(sala)
-                            if salvar_tudo():
+                    with col2:
+                        if st.form_submit_button("🗑️ Excluir Sala", type="secondary"):
+                            try:
+                                st.session_state.salas.remove(sala)
+                                persistidor.removido("salas", sala)
                                 st.success("✅ Sala excluída!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"❌ Erro ao excluir: {str(e)}")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"❌ Erro ao excluir: {str(e)}")
+    
+    lista_salas()
 
-with abas[5]:  # ABA GERAR GRADE
+if aba_ativa == ABAS[5]:  # ABA GERAR GRADE
     st.header("🗓️ Gerar Grade Horária")
     
     st.subheader("🎯 Configurações da Grade")
@@ -661,13 +934,30 @@ with abas[5]:  # ABA GERAR GRADE
             turmas_opcoes = [t.nome for t in st.session_state.turmas]
             if turmas_opcoes:
                 turma_selecionada = st.selectbox("Selecionar Turma", turmas_opcoes)
+                st.caption("🔒 Só essa turma é refeita: as aulas das outras turmas continuam onde estão e ocupam os horários dos professores.")
             else:
                 turma_selecionada = None
+        
+        resolver_decomposto = False
+        if tipo_grade == "Grade Completa - Todas as Turmas":
+            resolver_decomposto = st.checkbox(
+                "⚡ Resolver partes independentes em paralelo",
+                help="Divide as turmas em blocos que não compartilham professores (ex: Grupo A e Grupo B sem professores AMBOS em comum) e resolve cada bloco em um núcleo do servidor."
+            )
     
     with col2:
         tipo_algoritmo = st.selectbox(
             "Algoritmo de Geração",
-            ["Algoritmo Simples (Rápido)", "Google OR-Tools (Otimizado)"]
+            ALGORITMOS
+        )
+        comparar_partida = tipo_algoritmo == ALGORITMO_ORTOOLS_DICA and st.checkbox(
+            "⏱️ Medir também sem a dica",
+            help="Roda o OR-Tools de novo sem partir da grade do algoritmo simples, para mostrar quanto a dica adiantou a primeira solução e a final (leva o dobro do tempo)."
+        )
+        usar_cache = st.checkbox(
+            "♻️ Reutilizar grade já gerada com as mesmas entradas",
+            value=True,
+            help="Se turmas, professores, disciplinas, salas e algoritmo não mudaram, a grade salva é carregada sem resolver de novo."
         )
         
         # ✅ REMOVIDO: Dias EM até 13:10 - AGORA É SEMPRE
@@ -703,23 +993,15 @@ with abas[5]:  # ABA GERAR GRADE
     aulas_por_turma = {}
     problemas_carga = []
     
+    indice_cargas = obter_indice_cargas()
     for turma in turmas_filtradas:
-        aulas_turma = 0
-        grupo_turma = obter_grupo_seguro(turma)
+        # Disciplinas do mesmo grupo da turma: o filtro por grupo da grade não muda a carga
+        carga = indice_cargas.carga(turma)
+        total_aulas += carga.carga_total
+        aulas_por_turma[turma.nome] = carga.carga_total
         
-        # ✅ CORREÇÃO: Contar aulas baseado no vínculo DIRETO turma-disciplina
-        for disc in disciplinas_filtradas:
-            disc_grupo = obter_grupo_seguro(disc)
-            # AGORA: Verifica se a disciplina está vinculada a ESTA turma específica
-            if turma.nome in disc.turmas and disc_grupo == grupo_turma:
-                aulas_turma += disc.carga_semanal
-                total_aulas += disc.carga_semanal
-        
-        aulas_por_turma[turma.nome] = aulas_turma
-        
-        carga_maxima = calcular_carga_maxima(turma.serie)
-        if aulas_turma > carga_maxima:
-            problemas_carga.append(f"{turma.nome} [{grupo_turma}]: {aulas_turma}h > {carga_maxima}h máximo")
+        if carga.excedida:
+            problemas_carga.append(f"{turma.nome} [{obter_grupo_seguro(turma)}]: {carga.carga_total}h > {carga.carga_maxima}h máximo")
     
     # ✅ CAPACIDADE COM HORÁRIOS REAIS
     capacidade_total = 0
@@ -740,15 +1022,44 @@ with abas[5]:  # ABA GERAR GRADE
         for problema in problemas_carga:
             st.write(f"- {problema}")
     
+    if tipo_grade == "Grade por Grupo A":
+        professores_filtrados = [p for p in st.session_state.professores 
+                               if obter_grupo_seguro(p) in ["A", "AMBOS"]]
+    elif tipo_grade == "Grade por Grupo B":
+        professores_filtrados = [p for p in st.session_state.professores 
+                               if obter_grupo_seguro(p) in ["B", "AMBOS"]]
+    else:
+        professores_filtrados = st.session_state.professores
+    
+    # Prova de viabilidade por fluxo máximo (professores × turmas × horários)
+    analise_viabilidade = analisar_viabilidade(
+        turmas_filtradas, professores_filtrados, disciplinas_filtradas, obter_indice_cargas()
+    )
+    st.caption(f"🔎 Análise de viabilidade por fluxo: {analise_viabilidade.tempo_ms:.0f} ms")
+    
     if total_aulas == 0:
         st.error("❌ Nenhuma aula para alocar! Verifique se as disciplinas estão vinculadas às turmas corretas.")
     elif total_aulas > capacidade_total:
         st.error("❌ Capacidade insuficiente! Reduza a carga horária.")
     elif problemas_carga:
         st.error("❌ Corrija os problemas de carga horária antes de gerar a grade!")
+    elif not analise_viabilidade.viavel:
+        st.error("❌ Grade impossível com os dados atuais! Gargalos encontrados:")
+        for gargalo in analise_viabilidade.gargalos:
+            st.write(f"- {gargalo}")
     else:
         st.success("✅ Capacidade suficiente para gerar grade!")
         
+        # Aulas travadas no calendário ficam no lugar e saem da busca
+        nomes_turmas_filtradas = {t.nome for t in turmas_filtradas}
+        grade_publicada = st.session_state.get('aulas')
+        fixas_geracao = [
+            a for a in (grade_publicada.aulas_fixas() if grade_publicada else [])
+            if a.turma in nomes_turmas_filtradas
+        ]
+        if fixas_geracao:
+            st.caption(f"🔒 {len(fixas_geracao)} aula(s) fixa(s) serão mantidas no lugar.")
+        
         if st.button("🚀 Gerar Grade Horária", type="primary", use_container_width=True):
             if not turmas_filtradas:
                 st.error("❌ Nenhuma turma selecionada para gerar grade!")
@@ -756,442 +1067,358 @@ with abas[5]:  # ABA GERAR GRADE
                 st.error("❌ Nenhuma disciplina disponível para as turmas selecionadas!")
             elif problemas_carga:
                 st.error("❌ Corrija os problemas de carga horária antes de gerar!")
+            elif st.session_state.get('tarefa_grade'):
+                st.warning("⏳ Já existe uma geração em andamento. Aguarde ou cancele antes de gerar outra.")
             else:
-                with st.spinner(f"Gerando grade para {grupo_texto}..."):
-                    try:
-                        if tipo_grade == "Grade por Grupo A":
-                            professores_filtrados = [p for p in st.session_state.professores 
-                                                   if obter_grupo_seguro(p) in ["A", "AMBOS"]]
-                        elif tipo_grade == "Grade por Grupo B":
-                            professores_filtrados = [p for p in st.session_state.professores 
-                                                   if obter_grupo_seguro(p) in ["B", "AMBOS"]]
-                        else:
-                            professores_filtrados = st.session_state.professores
-                        
-                        # ✅ REMOVIDO: dias_em_estendido - AGORA É SEMPRE
-                        if tipo_algoritmo == "Google OR-Tools (Otimizado)":
-                            try:
-                                grade = GradeHorariaORTools(
-                                    turmas_filtradas,
-                                    professores_filtrados,
-                                    disciplinas_filtradas,
-                                    dias_em_estendido=DIAS_SEMANA  # ✅ SEMPRE TODOS OS DIAS
-                                )
-                                aulas = grade.resolver()
-                                metodo = "Google OR-Tools"
-                            except Exception as e:
-                                st.warning(f"⚠️ OR-Tools falhou: {str(e)}. Usando algoritmo simples...")
-                                simple_grade = SimpleGradeHoraria(
-                                    turmas=turmas_filtradas,
-                                    professores=professores_filtrados,
-                                    disciplinas=disciplinas_filtradas,
-                                    salas=st.session_state.salas,
-                                    dias_em_estendido=DIAS_SEMANA  # ✅ SEMPRE TODOS OS DIAS
-                                )
-                                aulas = simple_grade.gerar_grade()
-                                metodo = "Algoritmo Simples (fallback)"
-                        else:
-                            simple_grade = SimpleGradeHoraria(
-                                turmas=turmas_filtradas,
-                                professores=professores_filtrados,
-                                disciplinas=disciplinas_filtradas,
-                                salas=st.session_state.salas,
-                                dias_em_estendido=DIAS_SEMANA  # ✅ SEMPRE TODOS OS DIAS
-                            )
-                            aulas = simple_grade.gerar_grade()
-                            metodo = "Algoritmo Simples"
-                        
-                        if tipo_grade == "Grade por Turma Específica" and turma_selecionada:
-                            aulas = [a for a in aulas if a.turma == turma_selecionada]
+                try:
+                    turma_alvo = turma_selecionada if tipo_grade == "Grade por Turma Específica" else None
+                    
+                    funcao_geracao = gerar_aulas_decompostas if resolver_decomposto else gerar_aulas
+                    
+                    # Grades já geradas com as mesmas entradas vêm do cache
+                    chave_cache = cache_grade.chave_entradas(
+                        turmas_filtradas,
+                        professores_filtrados,
+                        disciplinas_filtradas,
+                        st.session_state.salas,
+                        f"{tipo_algoritmo} [decomposto]" if resolver_decomposto else tipo_algoritmo,
+                        fixas=fixas_geracao
+                    )
+                    em_cache = cache_grade.buscar(chave_cache) if usar_cache and not turma_alvo else None
+                    
+                    if turma_alvo:
+                        # Só a turma escolhida; as outras turmas da grade publicada são ocupação fixa
+                        resultado_turma = gerar_turma(
+                            turmas_filtradas[0],
+                            st.session_state.get('aulas'),
+                            professores_filtrados,
+                            disciplinas_filtradas,
+                            st.session_state.salas
+                        )
+                        aplicar_grade(
+                            resultado_turma.aulas,
+                            f"Turma única ({resultado_turma.tempo_ms:.0f} ms)",
+                            grupo_texto,
+                            turma_alvo
+                        )
+                        for disciplina, faltam in resultado_turma.nao_alocadas:
+                            st.warning(f"⚠️ {disciplina}: {faltam} aula(s) sem horário com professor qualificado e sala adequada livres")
+                    elif em_cache:
+                        aulas, metodo, aviso = em_cache
+                        if aviso:
+                            st.warning(aviso)
+                        aplicar_grade(aulas, f"{metodo} (cache)", grupo_texto, turma_alvo)
+                    else:
+                        # Resolver fora do script do Streamlit, em processo separado
+                        id_tarefa = obter_gerenciador().submeter(
+                            funcao_geracao,
+                            args=(
+                                tipo_algoritmo,
+                                list(turmas_filtradas),
+                                list(professores_filtrados),
+                                list(disciplinas_filtradas),
+                                list(st.session_state.salas)
+                            ),
+                            kwargs={"fixas": fixas_geracao, "comparar_partida": comparar_partida},
+                            info={
+                                "chave_cache": chave_cache,
+                                "grupo_texto": grupo_texto,
+                                "turma": turma_alvo
+                            }
+                        )
+                        st.session_state.tarefa_grade = id_tarefa
+                        st.query_params["tarefa"] = id_tarefa
+                        st.rerun()  # o acompanhamento fica no topo da página
                         
-                        st.session_state.aulas = aulas
-                        if salvar_tudo():
-                            st.success(f"✅ Grade {grupo_texto} gerada com {metodo}! ({len(aulas)} aulas)")
+                except Exception as e:
+                    st.error(f"❌ Erro ao gerar grade: {str(e)}")
+                    st.code(traceback.format_exc())
+    
+    # Reparo incremental da grade publicada
+    if st.session_state.get('aulas'):
+        with st.expander("🩹 Reparar Grade Atual (após pequenas edições)", expanded=False):
+            st.caption("Realoca apenas as aulas que passaram a violar alguma regra (indisponibilidade, carga, professor); todas as outras permanecem no mesmo horário.")
+            
+            if st.button("🩹 Reparar Grade", key="reparar_grade"):
+                try:
+                    turmas_na_grade = set(a.turma for a in st.session_state.aulas)
+                    reparo = reparar_grade(
+                        st.session_state.aulas,
+                        [t for t in st.session_state.turmas if t.nome in turmas_na_grade],
+                        st.session_state.professores,
+                        st.session_state.disciplinas
+                    )
+                    
+                    if not reparo.alterou:
+                        st.success(f"✅ A grade atual continua válida ({reparo.tempo_ms:.0f} ms).")
+                    else:
+                        grupo_reparo = st.session_state.get('resultado_grade', {}).get('grupo_texto', "Grade Atual")
+                        st.session_state.aulas = GradeColunar(reparo.aulas)
+                        st.session_state.resultado_grade = {"metodo": "Reparo incremental", "grupo_texto": grupo_reparo}
+                        salvar_grade()
+                        st.success(
+                            f"✅ Grade reparada em {reparo.tempo_ms:.0f} ms: {reparo.violacoes} violações, "
+                            f"{len(reparo.removidas)} aulas retiradas, {len(reparo.adicionadas)} aulas (re)alocadas."
+                        )
                         
-                        if aulas:
-                            # ✅ NOVA VISUALIZAÇÃO: Grade em formato de calendário
-                            st.subheader("📅 Visualização da Grade Horária - Formato Calendário")
-                            
-                            # Criar grades para cada turma
-                            turmas_com_aulas = list(set(a.turma for a in aulas))
-                            
-                            for turma_nome in turmas_com_aulas:
-                                st.write(f"#### 🎒 Grade da Turma: {turma_nome}")
-                                
-                                # Filtrar aulas da turma
-                                aulas_turma = [a for a in aulas if a.turma == turma_nome]
-                                
-                                # Criar matriz da grade
-                                dias_ordenados = ["segunda", "terca", "quarta", "quinta", "sexta"]
-                                segmento = obter_segmento_turma(turma_nome)
-                                horarios_disponiveis = obter_horarios_turma(turma_nome)
-                                
-                                # Criar grade visual
-                                st.markdown("""
-                                <style>
-                                .grade-table {
-                                    width: 100%;
-                                    border-collapse: collapse;
-                                }
-                                .grade-table th, .grade-table td {
-                                    border: 1px solid #ddd;
-                                    padding: 8px;
-                                    text-align: center;
-                                }
-                                .grade-table th {
-                                    background-color: #f2f2f2;
-                                    font-weight: bold;
-                                }
-                                .horario-livre {
-                                    background-color: #f8f9fa;
-                                    color: #6c757d;
-                                }
-                                .horario-aula {
-                                    background-color: #d1ecf1;
-                                    color: #0c5460;
-                                }
-                                .horario-intervalo {
-                                    background-color: #fff3cd;
-                                    color: #856404;
-                                    font-weight: bold;
-                                }
-                                </style>
-                                """, unsafe_allow_html=True)
-                                
-                                # Criar tabela HTML
-                                table_html = """
-                                <table class='grade-table'>
-                                    <tr>
-                                        <th>Horário</th>
-                                        <th>Segunda</th>
-                                        <th>Terça</th>
-                                        <th>Quarta</th>
-                                        <th>Quinta</th>
-                                        <th>Sexta</th>
-                                    </tr>
-                                """
-                                
-                                # Para EF II: mostrar horários 1-6
-                                # Para EM: mostrar horários 1-8
-                                max_horario = 6 if segmento == "EF_II" else 8
-                                
-                                for horario in range(1, max_horario + 1):
-                                    horario_real = obter_horario_real(turma_nome, horario)
-                                    table_html += f"<tr><td><strong>{horario_real}</strong></td>"
-                                    
-                                    for dia in dias_ordenados:
-                                        # Encontrar aula neste horário e dia
-                                        aula_no_slot = next((a for a in aulas_turma if a.dia == dia and a.horario == horario), None)
-                                        
-                                        # Verificar se é horário de intervalo
-                                        if segmento == "EF_II" and horario == 3:  # EF II: intervalo no horário 3
-                                            table_html += "<td class='horario-intervalo'>🕛 INTERVALO</td>"
-                                        elif segmento == "EM" and horario == 4:  # EM: intervalo no horário 4
-                                            table_html += "<td class='horario-intervalo'>🕛 INTERVALO</td>"
-                                        elif aula_no_slot:
-                                            table_html += f"<td class='horario-aula'>{aula_no_slot.disciplina}<br><small>{aula_no_slot.professor}</small></td>"
-                                        else:
-                                            # Verificar se é horário válido para esta turma
-                                            if horario in horarios_disponiveis:
-                                                table_html += "<td class='horario-livre'>LIVRE</td>"
-                                            else:
-                                                table_html += "<td></td>"
-                                    
-                                    table_html += "</tr>"
-                                
-                                table_html += "</table>"
-                                st.markdown(table_html, unsafe_allow_html=True)
-                                
-                                # Informações da turma
-                                st.caption(f"Segmento: {segmento} | Horários: {len(horarios_disponiveis)} períodos")
-                                
-                                # Legenda
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    st.markdown("🟦 **Aula Normal**")
-                                with col2:
-                                    st.markdown("🟨 **Intervalo**")
-                                with col3:
-                                    st.markdown("⬜ **Horário Livre**")
-                                
-                                st.markdown("---")
-                            
-                            # Dataframe original (mantido para compatibilidade)
-                            df_aulas = pd.DataFrame([
-                                {
-                                    "Turma": a.turma,
-                                    "Disciplina": a.disciplina, 
-                                    "Professor": a.professor,
-                                    "Dia": a.dia,
-                                    "Horário": f"{a.horario}º ({obter_horario_real(a.turma, a.horario)})",
-                                    "Sala": a.sala,
-                                    "Grupo": a.grupo
-                                }
-                                for a in aulas
-                            ])
-                            
-                            df_aulas = df_aulas.sort_values(["Turma", "Dia", "Horário"])
-                            st.subheader("📊 Lista Detalhada das Aulas")
-                            st.dataframe(df_aulas, use_container_width=True)
-                            
-                            # Download Excel com tratamento de erro
-                            try:
-                                output = io.BytesIO()
-                                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                    df_aulas.to_excel(writer, sheet_name="Grade_Completa", index=False)
-                                    
-                                    # Adicionar estatísticas
-                                    stats_data = {
-                                        "Estatística": [
-                                            "Total de Aulas", 
-                                            "Professores Utilizados", 
-                                            "Turmas com Aula", 
-                                            "Método",
-                                            "Horário EM"
-                                        ],
-                                        "Valor": [
-                                            len(aulas), 
-                                            len(set(a.professor for a in aulas)), 
-                                            len(set(a.turma for a in aulas)), 
-                                            metodo,
-                                            "07:00 - 13:10 (todos os dias)"
-                                        ]
-                                    }
-                                    stats_df = pd.DataFrame(stats_data)
-                                    stats_df.to_excel(writer, sheet_name="Estatísticas", index=False)
-                                
-                                st.download_button(
-                                    "📥 Baixar Grade em Excel",
-                                    output.getvalue(),
-                                    f"grade_{grupo_texto.replace(' ', '_')}.xlsx",
-                                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                                )
-                            except ImportError:
-                                st.warning("⚠️ Módulo 'openpyxl' não instalado. Para exportar para Excel, instale: pip install openpyxl")
-                                
-                                # Oferecer alternativa CSV
-                                csv = df_aulas.to_csv(index=False)
-                                st.download_button(
-                                    "📥 Baixar Grade em CSV",
-                                    csv,
-                                    f"grade_{grupo_texto.replace(' ', '_')}.csv",
-                                    "text/csv"
-                                )
-                        else:
-                            st.warning("⚠️ Nenhuma aula foi gerada.")
-                            
-                    except Exception as e:
-                        st.error(f"❌ Erro ao gerar grade: {str(e)}")
-                        st.code(traceback.format_exc())
+                        df_diff = pd.DataFrame(
+                            [
+                                {"Alteração": "➖ Retirada", "Turma": a.turma, "Disciplina": a.disciplina,
+                                 "Professor": a.professor, "Dia": a.dia, "Horário": a.horario}
+                                for a in reparo.removidas
+                            ] + [
+                                {"Alteração": "➕ Alocada", "Turma": a.turma, "Disciplina": a.disciplina,
+                                 "Professor": a.professor, "Dia": a.dia, "Horário": a.horario}
+                                for a in reparo.adicionadas
+                            ]
+                        )
+                        st.dataframe(df_diff, use_container_width=True)
+                    
+                    for turma_nome, disciplina_nome, motivo in reparo.nao_alocadas:
+                        st.warning(f"⚠️ {disciplina_nome} ({turma_nome}) não foi alocada: {motivo}")
+                except Exception as e:
+                    st.error(f"❌ Erro ao reparar grade: {str(e)}")
+                    st.code(traceback.format_exc())
+    
+    resultado_grade = st.session_state.get('resultado_grade')
+    if resultado_grade:
+        if st.session_state.get('aulas'):
+            aulas = st.session_state.aulas
+            metodo = resultado_grade["metodo"]
+            
+            # Índice (turma, dia, horário) montado uma vez para esta grade
+            indice_grade = obter_indice_grade(aulas)
+            
+            # Validação refeita só quando a grade publicada muda
+            validacao = st.session_state.get('validacao_grade')
+            exibir_validacao(validacao[1] if validacao and validacao[0] is aulas else validar_grade_publicada())
+            
+            # Mesma pontuação usada pelo portfólio para escolher a grade (menor é melhor)
+            qualidade = obter_qualidade_grade(aulas)
+            st.write("**📈 Qualidade da Grade** (penalidades: quanto menor, melhor)")
+            colunas_qualidade = st.columns(len(METRICAS) + 1)
+            colunas_qualidade[0].metric("Penalidade Total", f"{qualidade.penalidade:.0f}")
+            for coluna, (nome, (rotulo, _)) in zip(colunas_qualidade[1:], METRICAS.items()):
+                if nome == "dias_professor":
+                    coluna.metric("Dias por Professor", f"{qualidade.dias_por_professor:.1f}")
+                else:
+                    coluna.metric(rotulo, qualidade.metricas[nome])
+            
+            # ✅ NOVA VISUALIZAÇÃO: Grade em formato de calendário
+            st.subheader("📅 Visualização da Grade Horária - Formato Calendário")
+            
+            # Criar grades para cada turma
+            versao_grade = aulas.versao()
+            for turma_nome in indice_grade.turmas():
+                st.write(f"#### 🎒 Grade da Turma: {turma_nome}")
+                
+                # Criar matriz da grade
+                segmento = obter_segmento_turma(turma_nome)
+                horarios_disponiveis = obter_horarios_turma(turma_nome)
+                
+                # Tabela montada uma vez por versão da grade (cache compartilhado entre sessões)
+                st.markdown(
+                    renderizacao.html_grade_turma(
+                        versao_grade, indice_grade, turma_nome, segmento, horarios_disponiveis, obter_horario_real
+                    ),
+                    unsafe_allow_html=True
+                )
+                
+                # Informações da turma
+                st.caption(f"Segmento: {segmento} | Horários: {len(horarios_disponiveis)} períodos")
+                
+                # Travar aulas: ficam no mesmo horário quando a grade for gerada de novo
+                linhas_turma = [int(i) for i in aulas.ordenacao(("dia", "horario"), aulas.linhas("turma", turma_nome))]
+                fixadas = [i for i in linhas_turma if aulas.fixas[i]]
+                with st.expander(f"🔒 Aulas fixas de {turma_nome} ({len(fixadas)})"):
+                    escolhidas = st.multiselect(
+                        "Aulas mantidas no lugar ao gerar a grade de novo",
+                        linhas_turma,
+                        default=fixadas,
+                        format_func=lambda i: (
+                            f"{aulas.valor('dia', i).capitalize()} {aulas.horarios[i]}º - "
+                            f"{aulas.valor('disciplina', i)} ({aulas.valor('professor', i)})"
+                        ),
+                        key=f"fixas_{turma_nome}_{versao_grade}"
+                    )
+                    if set(escolhidas) != set(fixadas):
+                        fixar_aulas(linhas_turma, escolhidas)
+                        st.rerun()
+                
+                # Legenda
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.markdown("🟦 **Aula Normal**")
+                with col2:
+                    st.markdown("🟨 **Intervalo**")
+                with col3:
+                    st.markdown("⬜ **Horário Livre**")
+                with col4:
+                    st.markdown("🔒 **Aula Fixa**")
+                
+                st.markdown("---")
+            
+            # Tabela montada direto das colunas da grade, ordenada por turma, dia e horário
+            linhas_ordenadas = aulas.ordenacao()
+            df_aulas = aulas.dataframe(linhas_ordenadas).rename(columns=COLUNAS_TABELA_AULAS)
+            df_aulas["Horário"] = aulas.rotulos_turma_horario(
+                lambda turma, horario: f"{horario}º ({obter_horario_real(turma, horario)})",
+                linhas_ordenadas
+            )
+            df_aulas = df_aulas[["Turma", "Disciplina", "Professor", "Dia", "Horário", "Sala", "Grupo"]]
+            
+            st.subheader("📊 Lista Detalhada das Aulas")
+            st.dataframe(df_aulas, use_container_width=True)
+            
+            # Excel gerado só quando pedido e reaproveitado enquanto a grade não mudar
+            chave_excel = ("grade", aulas.versao(), metodo)
+            excel_grade = exportacao.exportacao_pronta(chave_excel)
+            try:
+                if excel_grade is None and st.button("📄 Preparar Grade em Excel", key="preparar_excel_grade"):
+                    estatisticas = [
+                        ("Total de Aulas", len(aulas)),
+                        ("Professores Utilizados", len(indice_grade.resumos)),
+                        ("Turmas com Aula", len(indice_grade.por_turma)),
+                        ("Método", metodo),
+                        ("Penalidade de Qualidade", round(qualidade.penalidade)),
+                        ("Horário EM", "07:00 - 13:10 (todos os dias)")
+                    ]
+                    excel_grade = exportacao.obter_exportacao(
+                        chave_excel, lambda: exportacao.exportar_grade(df_aulas, estatisticas)
+                    )
+                
+                if excel_grade is not None:
+                    st.download_button(
+                        "📥 Baixar Grade em Excel",
+                        excel_grade,
+                        f"grade_{resultado_grade['grupo_texto'].replace(' ', '_')}.xlsx",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+            except ImportError:
+                st.warning("⚠️ Módulo 'openpyxl' não instalado. Para exportar para Excel, instale: pip install openpyxl")
+                
+                # Oferecer alternativa CSV
+                csv = df_aulas.to_csv(index=False)
+                st.download_button(
+                    "📥 Baixar Grade em CSV",
+                    csv,
+                    f"grade_{resultado_grade['grupo_texto'].replace(' ', '_')}.csv",
+                    "text/csv"
+                )
+        else:
+            st.warning("⚠️ Nenhuma aula foi gerada.")
 
-with abas[6]:  # NOVA ABA: GRADE POR PROFESSOR
+if aba_ativa == ABAS[6]:  # NOVA ABA: GRADE POR PROFESSOR
     st.header("👨‍🏫 Grade Horária por Professor")
     
     if not st.session_state.get('aulas'):
         st.info("ℹ️ Gere uma grade horária primeiro na aba 'Gerar Grade' para visualizar as grades por professor.")
     else:
-        # Filtros
-        col1, col2 = st.columns(2)
-        with col1:
-            professor_selecionado = st.selectbox(
-                "Selecionar Professor",
-                options=list(sorted(set(a.professor for a in st.session_state.aulas))),
-                key="filtro_professor_grade"
-            )
+        indice_grade = obter_indice_grade(st.session_state.aulas)
         
-        with col2:
-            formato_exibicao = st.radio(
-                "Formato de Exibição",
-                ["Visual Semanal", "Lista Detalhada"],
-                horizontal=True
-            )
+        @fragmento_medido
+        def grade_do_professor():
+            # Trocar professor ou formato reexecuta só este trecho
+            # Filtros
+            col1, col2 = st.columns(2)
+            with col1:
+                professor_selecionado = st.selectbox(
+                    "Selecionar Professor",
+                    options=indice_grade.professores(),
+                    key="filtro_professor_grade"
+                )
+        
+            with col2:
+                formato_exibicao = st.radio(
+                    "Formato de Exibição",
+                    ["Visual Semanal", "Lista Detalhada"],
+                    horizontal=True
+                )
         
-        if professor_selecionado:
-            # Filtrar aulas do professor selecionado
-            aulas_professor = [a for a in st.session_state.aulas if a.professor == professor_selecionado]
+            if professor_selecionado:
+                # Aulas e totais do professor selecionado (já agregados no índice da grade)
+                resumo_prof = indice_grade.resumo_professor(professor_selecionado)
+                aulas_professor = resumo_prof.aulas
             
-            if not aulas_professor:
-                st.warning(f"ℹ️ O professor {professor_selecionado} não tem aulas alocadas na grade atual.")
-            else:
-                st.success(f"📊 Professor {professor_selecionado}: {len(aulas_professor)} aulas na semana")
+                if not aulas_professor:
+                    st.warning(f"ℹ️ O professor {professor_selecionado} não tem aulas alocadas na grade atual.")
+                else:
+                    st.success(f"📊 Professor {professor_selecionado}: {len(aulas_professor)} aulas na semana")
                 
-                if formato_exibicao == "Visual Semanal":
-                    # Grade semanal do professor
-                    st.subheader(f"📅 Grade Semanal - Prof. {professor_selecionado}")
-                    
-                    # Criar matriz da grade do professor
-                    dias_ordenados = ["segunda", "terca", "quarta", "quinta", "sexta"]
-                    horarios_ordenados = list(range(1, 9))  # Todos os horários possíveis (1-8 para cobrir EM)
-                    
-                    # Criar grade visual
-                    st.markdown("""
-                    <style>
-                    .grade-professor-table {
-                        width: 100%;
-                        border-collapse: collapse;
-                        font-size: 14px;
-                    }
-                    .grade-professor-table th, .grade-professor-table td {
-                        border: 1px solid #ddd;
-                        padding: 10px;
-                        text-align: center;
-                        vertical-align: top;
-                    }
-                    .grade-professor-table th {
-                        background-color: #4A90E2;
-                        color: white;
-                        font-weight: bold;
-                    }
-                    .horario-prof-livre {
-                        background-color: #f8f9fa;
-                        color: #6c757d;
-                        font-style: italic;
-                    }
-                    .horario-prof-aula {
-                        background-color: #d1ecf1;
-                        color: #0c5460;
-                        border-left: 4px solid #0c5460;
-                    }
-                    .horario-prof-indisponivel {
-                        background-color: #ffe6e6;
-                        color: #dc3545;
-                        font-style: italic;
-                    }
-                    .info-turma {
-                        font-weight: bold;
-                        font-size: 12px;
-                    }
-                    .info-disciplina {
-                        font-size: 11px;
-                    }
-                    .info-sala {
-                        font-size: 10px;
-                        color: #666;
-                    }
-                    </style>
-                    """, unsafe_allow_html=True)
-                    
-                    # Obter informações do professor
-                    professor_info = next((p for p in st.session_state.professores if p.nome == professor_selecionado), None)
-                    
-                    # Criar tabela HTML
-                    table_html = """
-                    <table class='grade-professor-table'>
-                        <tr>
-                            <th>Horário</th>
-                            <th>Segunda</th>
-                            <th>Terça</th>
-                            <th>Quarta</th>
-                            <th>Quinta</th>
-                            <th>Sexta</th>
-                        </tr>
-                    """
-                    
-                    for horario in horarios_ordenados:
-                        horario_texto = "07:00 - 07:50" if horario == 1 else \
-                                       "07:50 - 08:40" if horario == 2 else \
-                                       "08:40 - 09:30" if horario == 3 else \
-                                       "09:30 - 09:50 (Intervalo)" if horario == 4 else \
-                                       "09:50 - 10:40" if horario == 5 else \
-                                       "10:40 - 11:30" if horario == 6 else \
-                                       "11:30 - 12:20" if horario == 7 else \
-                                       "12:20 - 13:10" if horario == 8 else f"Horário {horario}"
-                        
-                        table_html += f"<tr><td><strong>{horario_texto}</strong></td>"
-                        
-                        for dia in dias_ordenados:
-                            # Encontrar aula neste horário e dia para este professor
-                            aula_no_slot = next((a for a in aulas_professor if a.dia == dia and a.horario == horario), None)
-                            
-                            # Verificar se o professor está indisponível neste horário
-                            professor_indisponivel = False
-                            if professor_info and hasattr(professor_info, 'horarios_indisponiveis'):
-                                professor_indisponivel = f"{dia}_{horario}" in professor_info.horarios_indisponiveis
-                            
-                            if professor_indisponivel:
-                                table_html += "<td class='horario-prof-indisponivel'>❌ INDISPONÍVEL</td>"
-                            elif aula_no_slot:
-                                # Formatar informações da aula
-                                table_html += f"""
-                                <td class='horario-prof-aula'>
-                                    <div class='info-turma'>{aula_no_slot.turma}</div>
-                                    <div class='info-disciplina'>{aula_no_slot.disciplina}</div>
-                                    <div class='info-sala'>{aula_no_slot.sala}</div>
-                                </td>
-                                """
-                            else:
-                                table_html += "<td class='horario-prof-livre'>LIVRE</td>"
-                        
-                        table_html += "</tr>"
-                    
-                    table_html += "</table>"
-                    st.markdown(table_html, unsafe_allow_html=True)
+                    if formato_exibicao == "Visual Semanal":
+                        # Grade semanal do professor
+                        st.subheader(f"📅 Grade Semanal - Prof. {professor_selecionado}")
                     
-                    # Estatísticas do professor
-                    st.subheader("📈 Estatísticas do Professor")
+                        # Obter informações do professor
+                        professor_info = next((p for p in st.session_state.professores if p.nome == professor_selecionado), None)
+                        grade_prof = indice_grade.grade_professor(
+                            professor_selecionado,
+                            mascara_professor(professor_info) if professor_info else MASCARA_SEMANA
+                        )
                     
-                    col1, col2, col3, col4 = st.columns(4)
+                        # Grade do professor usa a régua de horários do EM (1-8)
+                        st.markdown(
+                            renderizacao.html_grade_professor(
+                                st.session_state.aulas.versao(), grade_prof, professor_selecionado,
+                                lambda horario: obter_horario_real("EM", horario)
+                            ),
+                            unsafe_allow_html=True
+                        )
                     
-                    with col1:
-                        total_aulas = len(aulas_professor)
-                        st.metric("Total de Aulas", total_aulas)
+                        # Estatísticas do professor
+                        st.subheader("📈 Estatísticas do Professor")
                     
-                    with col2:
-                        turmas_ministradas = len(set(a.turma for a in aulas_professor))
-                        st.metric("Turmas", turmas_ministradas)
+                        col1, col2, col3, col4 = st.columns(4)
                     
-                    with col3:
-                        disciplinas_ministradas = len(set(a.disciplina for a in aulas_professor))
-                        st.metric("Disciplinas", disciplinas_ministradas)
+                        with col1:
+                            st.metric("Total de Aulas", resumo_prof.total_aulas)
                     
-                    with col4:
-                        # Calcular horas semanais
-                        horas_totais = total_aulas * 50 / 60  # 50 minutos por aula
-                        st.metric("Horas/Semana", f"{horas_totais:.1f}h")
+                        with col2:
+                            st.metric("Turmas", len(resumo_prof.turmas))
                     
-                    # Detalhamento por dia
-                    st.subheader("📅 Distribuição por Dia")
-                    dias_distribuicao = {}
-                    for dia in dias_ordenados:
-                        aulas_dia = [a for a in aulas_professor if a.dia == dia]
-                        dias_distribuicao[dia] = len(aulas_dia)
+                        with col3:
+                            st.metric("Disciplinas", len(resumo_prof.disciplinas))
                     
-                    # Gráfico de barras simples
-                    chart_data = {
-                        'Dia': [d.capitalize() for d in dias_ordenados],
-                        'Aulas': [dias_distribuicao[dia] for dia in dias_ordenados]
-                    }
-                    st.bar_chart(chart_data, x='Dia', y='Aulas')
+                        with col4:
+                            # Horas semanais (50 minutos por aula)
+                            st.metric("Horas/Semana", f"{resumo_prof.horas:.1f}h")
                     
-                else:  # Lista Detalhada
-                    st.subheader(f"📋 Lista Detalhada - Prof. {professor_selecionado}")
+                        # Detalhamento por dia
+                        st.subheader("📅 Distribuição por Dia")
                     
-                    # Criar dataframe detalhado
-                    df_detalhado = pd.DataFrame([
-                        {
-                            "Dia": a.dia.capitalize(),
-                            "Horário": f"{a.horario}º ({obter_horario_real(a.turma, a.horario)})",
-                            "Turma": a.turma,
-                            "Disciplina": a.disciplina,
-                            "Sala": a.sala,
-                            "Grupo": a.grupo
+                        # Gráfico de barras simples
+                        chart_data = {
+                            'Dia': [d.capitalize() for d in DIAS_ORDENADOS],
+                            'Aulas': grade_prof.aulas_por_dia()
                         }
-                        for a in aulas_professor
-                    ])
+                        st.bar_chart(chart_data, x='Dia', y='Aulas')
                     
-                    # Ordenar por dia e horário
-                    ordem_dias = {"Segunda": 1, "Terca": 2, "Quarta": 3, "Quinta": 4, "Sexta": 5}
-                    df_detalhado['Ordem'] = df_detalhado['Dia'].map(ordem_dias)
-                    df_detalhado = df_detalhado.sort_values(['Ordem', 'Horário']).drop('Ordem', axis=1)
+                    else:  # Lista Detalhada
+                        st.subheader(f"📋 Lista Detalhada - Prof. {professor_selecionado}")
                     
-                    st.dataframe(df_detalhado, use_container_width=True)
+                        # Criar dataframe detalhado (aulas ordenadas por dia e horário)
+                        grade_colunar = st.session_state.aulas
+                        linhas_prof = grade_colunar.ordenacao(
+                            ("dia", "horario"), grade_colunar.linhas("professor", professor_selecionado)
+                        )
+                        df_detalhado = grade_colunar.dataframe(linhas_prof).rename(columns=COLUNAS_TABELA_AULAS)
+                        df_detalhado["Dia"] = df_detalhado["Dia"].cat.rename_categories(str.capitalize)
+                        df_detalhado["Horário"] = grade_colunar.rotulos_turma_horario(
+                            lambda turma, horario: f"{horario}º ({obter_horario_real(turma, horario)})",
+                            linhas_prof
+                        )
+                        df_detalhado = df_detalhado[["Dia", "Horário", "Turma", "Disciplina", "Sala", "Grupo"]]
+                    
+                        st.dataframe(df_detalhado, use_container_width=True)
+        
+        grade_do_professor()
         
         # Visualização de todos os professores
         st.markdown("---")
         st.subheader("👥 Visão Geral de Todos os Professores")
         
         # Estatísticas gerais
-        professores_com_aulas = list(set(a.professor for a in st.session_state.aulas))
+        professores_com_aulas = indice_grade.professores()
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -1206,20 +1433,16 @@ with abas[6]:  # NOVA ABA: GRADE POR PROFESSOR
         
         resumo_professores = []
         for professor in st.session_state.professores:
-            aulas_prof = [a for a in st.session_state.aulas if a.professor == professor.nome]
-            total_aulas_prof = len(aulas_prof)
-            turmas_prof = len(set(a.turma for a in aulas_prof))
-            disciplinas_prof = len(set(a.disciplina for a in aulas_prof))
-            horas_prof = total_aulas_prof * 50 / 60
+            resumo = indice_grade.resumo_professor(professor.nome)
             
             resumo_professores.append({
                 "Professor": professor.nome,
-                "Aulas": total_aulas_prof,
-                "Horas": f"{horas_prof:.1f}h",
-                "Turmas": turmas_prof,
-                "Disciplinas": disciplinas_prof,
+                "Aulas": resumo.total_aulas,
+                "Horas": f"{resumo.horas:.1f}h",
+                "Turmas": len(resumo.turmas),
+                "Disciplinas": len(resumo.disciplinas),
                 "Grupo": professor.grupo,
-                "Status": "✅ Com Aulas" if total_aulas_prof > 0 else "⚠️ Sem Aulas"
+                "Status": "✅ Com Aulas" if resumo.total_aulas > 0 else "⚠️ Sem Aulas"
             })
         
         df_resumo = pd.DataFrame(resumo_professores)
@@ -1230,41 +1453,34 @@ with abas[6]:  # NOVA ABA: GRADE POR PROFESSOR
         # Download da grade completa dos professores
         st.subheader("📥 Exportar Dados")
         
+        def gerar_excel_professores():
+            # Uma tabela só, ordenada por professor: cada troca de professor abre uma aba
+            grade_colunar = st.session_state.aulas
+            linhas_profs = grade_colunar.ordenacao(("professor", "dia", "horario"))
+            df_profs = grade_colunar.dataframe(linhas_profs).rename(columns=COLUNAS_TABELA_AULAS)
+            df_profs["Dia"] = df_profs["Dia"].cat.rename_categories(str.capitalize)
+            df_profs["Horário"] = grade_colunar.rotulos_turma_horario(lambda turma, horario: f"{horario}º", linhas_profs)
+            df_profs["Período"] = grade_colunar.rotulos_turma_horario(obter_horario_real, linhas_profs)
+            df_profs = df_profs[["Professor", "Dia", "Horário", "Período", "Turma", "Disciplina", "Sala", "Grupo"]]
+            return exportacao.exportar_professores(df_resumo, df_profs)
+        
+        chave_excel_profs = (
+            "professores",
+            st.session_state.aulas.versao(),
+            tuple((p.nome, obter_grupo_seguro(p)) for p in st.session_state.professores)
+        )
+        excel_profs = exportacao.exportacao_pronta(chave_excel_profs)
         try:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                # Sheet com resumo
-                df_resumo.to_excel(writer, sheet_name="Resumo_Professores", index=False)
-                
-                # Sheet com grade detalhada de cada professor
-                for professor in professores_com_aulas:
-                    aulas_prof = [a for a in st.session_state.aulas if a.professor == professor]
-                    df_prof = pd.DataFrame([
-                        {
-                            "Dia": a.dia.capitalize(),
-                            "Horário": f"{a.horario}º",
-                            "Período": obter_horario_real(a.turma, a.horario),
-                            "Turma": a.turma,
-                            "Disciplina": a.disciplina,
-                            "Sala": a.sala,
-                            "Grupo": a.grupo
-                        }
-                        for a in aulas_prof
-                    ])
-                    
-                    # Ordenar
-                    ordem_dias = {"Segunda": 1, "Terca": 2, "Quarta": 3, "Quinta": 4, "Sexta": 5}
-                    df_prof['Ordem'] = df_prof['Dia'].map(ordem_dias)
-                    df_prof = df_prof.sort_values(['Ordem', 'Horário']).drop('Ordem', axis=1)
-                    
-                    df_prof.to_excel(writer, sheet_name=professor[:31], index=False)
+            if excel_profs is None and st.button("📄 Preparar Grade dos Professores em Excel", key="preparar_excel_profs"):
+                excel_profs = exportacao.obter_exportacao(chave_excel_profs, gerar_excel_professores)
             
-            st.download_button(
-                "📥 Baixar Grade Completa dos Professores",
-                output.getvalue(),
-                "grade_professores_completa.xlsx",
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            if excel_profs is not None:
+                st.download_button(
+                    "📥 Baixar Grade Completa dos Professores",
+                    excel_profs,
+                    "grade_professores_completa.xlsx",
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
         except ImportError:
             st.warning("⚠️ Módulo 'openpyxl' não instalado. Para exportar para Excel, instale: pip install openpyxl")
             
@@ -1277,11 +1493,14 @@ with abas[6]:  # NOVA ABA: GRADE POR PROFESSOR
                 "text/csv"
             )
     
+registrar_latencia(f"página: {aba_ativa}", inicio_execucao)
+
 # Sidebar
 st.sidebar.title("⚙️ Configurações")
 if st.sidebar.button("🔄 Resetar Banco de Dados"):
     try:
         database.resetar_banco()
+        persistidor.descartar()  # o que estava pendente não pode regravar a sessão por cima do reset
         st.sidebar.success("✅ Banco resetado! Recarregue a página.")
     except Exception as e:
         st.sidebar.error(f"❌ Erro ao resetar: {str(e)}")
@@ -1293,6 +1512,28 @@ st.sidebar.write(f"**Disciplinas:** {len(st.session_state.disciplinas)}")
 st.sidebar.write(f"**Salas:** {len(st.session_state.salas)}")
 st.sidebar.write(f"**Aulas na Grade:** {len(st.session_state.get('aulas', []))}")
 
+@st.fragment(run_every=ATRASO_GRAVACAO)
+def gravar_alteracoes():
+    """Grava as alterações pendentes há ATRASO_GRAVACAO segundos: uma chamada a salvar_tudo por rajada de edições"""
+    if persistidor.vencido():
+        persistidor.descarregar()
+    if persistidor.ultimo_erro:
+        st.error(f"❌ Alterações ainda não gravadas: {persistidor.ultimo_erro}")
+    elif persistidor.pendente():
+        st.caption("💾 Gravando alterações...")
+
+with st.sidebar:
+    gravar_alteracoes()
+
+with st.sidebar.expander("⏱️ Latência das Interações", expanded=False):
+    por_origem = {}
+    for origem, ms in st.session_state.get('latencias', []):
+        por_origem.setdefault(origem, []).append(ms)
+    for origem, tempos in sorted(por_origem.items()):
+        tempos_ordenados = sorted(tempos)
+        mediana = tempos_ordenados[len(tempos_ordenados) // 2]
+        st.write(f"**{origem}:** última {tempos[-1]:.0f} ms · mediana {mediana:.0f} ms ({len(tempos)}x)")
+
 st.sidebar.write("### 💡 Informações dos Horários:")
 st.sidebar.write("**EF II:** 07:50-12:20")
 st.sidebar.write("- 6 períodos + intervalo")
@@ -1316,4 +1557,4 @@ st.sidebar.write("2º: 08:40-09:30")
 st.sidebar.write("3º: 09:30-09:50 (Intervalo)")
 st.sidebar.write("4º: 09:50-10:40")
 st.sidebar.write("5º: 10:40-11:30")
-st.sidebar.write("6º: 11:30-12:20")
\ No newline at end of file
+st.sidebar.write("6º: 11:30-12:20")
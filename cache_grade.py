@@ -0,0 +1,141 @@
+"""
+Cache persistente de grades geradas, endereçado pelo conteúdo das entradas.
+
+A chave é um hash canônico de tudo que o gerador recebe (turmas,
+professores com a máscara de disponibilidade, disciplinas com carga e grupo, salas,
+algoritmo, semente e aulas fixas). As grades ficam numa tabela do mesmo banco SQLite
+usado pelo módulo `database` (`database.DB_PATH`), com descarte LRU.
+
+Só entram no cache grades que o algoritmo escolhido de fato resolveu: quem
+chama não guarda grades vazias nem as do fallback para o algoritmo simples
+(ver geracao.resultado_do_algoritmo). O aviso da geração é guardado junto e
+volta a aparecer quando a grade sai do cache.
+"""
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+
+from disponibilidade import mascara_professor
+
+LIMITE_CACHE = 50  # grades mantidas antes de descartar as menos usadas
+VERSAO_CHAVE = 4  # incrementar se o formato das entradas mudar
+
+
+def _lista(valores):
+    return sorted(str(v) for v in (valores or ()))
+
+
+def _entradas_canonicas(turmas, professores, disciplinas, salas, algoritmo, semente, fixas):
+    return {
+        "versao": VERSAO_CHAVE,
+        "algoritmo": algoritmo,
+        "semente": semente,
+        "turmas": sorted(
+            [getattr(t, "nome", ""), getattr(t, "serie", ""), getattr(t, "turno", ""),
+             getattr(t, "grupo", ""), getattr(t, "segmento", "")]
+            for t in turmas
+        ),
+        "professores": sorted(
+            [p.nome, _lista(p.disciplinas), mascara_professor(p), getattr(p, "grupo", "")]
+            for p in professores
+        ),
+        "disciplinas": sorted(
+            [d.nome, d.carga_semanal, getattr(d, "tipo", ""), _lista(d.turmas),
+             getattr(d, "grupo", "")]
+            for d in disciplinas
+        ),
+        "salas": sorted(
+            [s.nome, getattr(s, "capacidade", 0), getattr(s, "tipo", "")]
+            for s in salas
+        ),
+        "fixas": sorted(
+            [a.turma, a.disciplina, a.professor, a.dia, a.horario]
+            for a in fixas
+        ),
+    }
+
+
+def chave_entradas(turmas, professores, disciplinas, salas, algoritmo, semente=None, fixas=()):
+    """Hash SHA-256 canônico das entradas do gerador (independe da ordem)"""
+    entradas = _entradas_canonicas(turmas, professores, disciplinas, salas, algoritmo, semente, fixas)
+    texto = json.dumps(entradas, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def caminho_banco():
+    """Arquivo SQLite do módulo `database`, onde o cache é gravado"""
+    import database
+    return database.DB_PATH
+
+
+def _conectar(caminho):
+    conn = sqlite3.connect(caminho, timeout=10)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_grades (
+            chave TEXT PRIMARY KEY,
+            metodo TEXT NOT NULL,
+            aviso TEXT,
+            aulas BLOB NOT NULL,
+            criado_em REAL NOT NULL,
+            usado_em REAL NOT NULL
+        )
+    """)
+    colunas = {linha[1] for linha in conn.execute("PRAGMA table_info(cache_grades)")}
+    if "aviso" not in colunas:  # tabela criada antes de o aviso ser guardado
+        conn.execute("ALTER TABLE cache_grades ADD COLUMN aviso TEXT")
+    return conn
+
+
+def buscar(chave, caminho=None):
+    """Retorna (aulas, metodo, aviso) da grade em cache ou None"""
+    caminho = caminho or caminho_banco()
+    try:
+        with closing(_conectar(caminho)) as conn, conn:
+            linha = conn.execute(
+                "SELECT aulas, metodo, aviso FROM cache_grades WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            conn.execute(
+                "UPDATE cache_grades SET usado_em = ? WHERE chave = ?", (time.time(), chave)
+            )
+        return pickle.loads(linha[0]), linha[1], linha[2]
+    except (sqlite3.Error, pickle.UnpicklingError, AttributeError, ImportError):
+        # Cache ilegível (ex: modelo alterado) não deve impedir a geração
+        return None
+
+
+def guardar(chave, aulas, metodo, aviso=None, caminho=None):
+    """Guarda a grade no cache e descarta as entradas menos usadas recentemente
+
+    Grades vazias não são guardadas. Retorna True se a grade foi gravada.
+    """
+    aulas = list(aulas)
+    if not aulas:
+        return False
+    caminho = caminho or caminho_banco()
+    agora = time.time()
+    try:
+        with closing(_conectar(caminho)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_grades (chave, metodo, aviso, aulas, criado_em, usado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (chave, metodo, aviso, pickle.dumps(aulas), agora, agora)
+            )
+            conn.execute(
+                "DELETE FROM cache_grades WHERE chave NOT IN ("
+                "SELECT chave FROM cache_grades ORDER BY usado_em DESC LIMIT ?)",
+                (LIMITE_CACHE,)
+            )
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def limpar(caminho=None):
+    """Remove todas as grades do cache"""
+    with closing(_conectar(caminho or caminho_banco())) as conn, conn:
+        conn.execute("DELETE FROM cache_grades")
@@ -0,0 +1,117 @@
+"""
+Índice derivado turma -> disciplinas vinculadas e carga horária.
+
+Mantido junto com os cadastros: cada inclusão, edição ou exclusão de
+turma ou disciplina avisa o índice, que atualiza só as turmas afetadas.
+Dashboard, editor de turmas e geração de grade leem a carga daqui em vez
+de cruzar todas as turmas com todas as disciplinas.
+"""
+from viabilidade import segmento_turma
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+def calcular_carga_maxima(serie):
+    """Calcula a quantidade MÁXIMA de aulas semanais baseada na série"""
+    if 'em' in serie.lower() or 'medio' in serie.lower() or serie in ['1em', '2em', '3em']:
+        return 35  # EM: máximo de 35 aulas por semana (7 aulas × 5 dias)
+    else:
+        return 25  # EF II: máximo de 25 aulas por semana (5 aulas × 5 dias)
+
+
+class CargaTurma:
+    """Disciplinas do mesmo grupo vinculadas à turma e a carga resultante"""
+
+    def __init__(self, turma, disciplinas):
+        self.turma = turma
+        self.segmento = segmento_turma(turma)
+        self.disciplinas = disciplinas
+        self.carga_total = sum(d.carga_semanal for d in disciplinas)
+        self.carga_maxima = calcular_carga_maxima(turma.serie)
+
+    @property
+    def excedida(self):
+        return self.carga_total > self.carga_maxima
+
+
+class IndiceCargas:
+    """Vínculos turma -> disciplinas e cargas, atualizados incrementalmente"""
+
+    def __init__(self, turmas, disciplinas):
+        self.turmas = turmas
+        self.disciplinas = disciplinas
+        self._por_nome = {}  # nome da turma -> turma
+        self._vinculos = {}  # nome da turma -> {id(disciplina): disciplina}
+        self._turmas_da_disciplina = {}  # id(disciplina) -> nomes de turma na última sincronização
+        self._cargas = {}  # nome da turma -> CargaTurma
+
+        for turma in turmas:
+            self._por_nome[turma.nome] = turma
+        for disc in disciplinas:
+            self._vincular(disc)
+        self._tamanhos = (len(turmas), len(disciplinas))
+
+    def desatualizado(self, turmas, disciplinas):
+        """Indica se as listas foram trocadas ou alteradas sem avisar o índice"""
+        return (turmas is not self.turmas or disciplinas is not self.disciplinas
+                or (len(turmas), len(disciplinas)) != self._tamanhos)
+
+    def _vincular(self, disc):
+        nomes = set(disc.turmas)
+        for nome in nomes:
+            self._vinculos.setdefault(nome, {})[id(disc)] = disc
+        self._turmas_da_disciplina[id(disc)] = nomes
+        return nomes
+
+    def _desvincular(self, disc):
+        nomes = self._turmas_da_disciplina.pop(id(disc), set())
+        for nome in nomes:
+            self._vinculos.get(nome, {}).pop(id(disc), None)
+        return nomes
+
+    def _invalidar(self, nomes):
+        for nome in nomes:
+            self._cargas.pop(nome, None)
+
+    def carga(self, turma):
+        """CargaTurma da turma (disciplinas do mesmo grupo, total, máximo, segmento)"""
+        carga = self._cargas.get(turma.nome)
+        if carga is None or carga.turma is not turma:
+            grupo_turma = _grupo(turma)
+            disciplinas = [d for d in self._vinculos.get(turma.nome, {}).values() if _grupo(d) == grupo_turma]
+            carga = self._cargas[turma.nome] = CargaTurma(turma, disciplinas)
+        return carga
+
+    def segmento(self, nome_turma):
+        """Segmento da turma pelo nome (usa `turma.segmento` quando cadastrado)"""
+        turma = self._por_nome.get(nome_turma)
+        if turma is not None:
+            return self.carga(turma).segmento
+        return "EM" if "em" in nome_turma.lower() else "EF_II"
+
+    def turma_alterada(self, turma, nome_anterior=None):
+        """Turma incluída ou editada (nome, série, grupo ou segmento)"""
+        if nome_anterior is not None and self._por_nome.get(nome_anterior) is turma:
+            del self._por_nome[nome_anterior]
+            self._invalidar([nome_anterior])
+        self._por_nome[turma.nome] = turma
+        self._invalidar([turma.nome])
+        self._tamanhos = (len(self.turmas), len(self.disciplinas))
+
+    def turma_removida(self, turma):
+        if self._por_nome.get(turma.nome) is turma:
+            del self._por_nome[turma.nome]
+        self._invalidar([turma.nome])
+        self._tamanhos = (len(self.turmas), len(self.disciplinas))
+
+    def disciplina_alterada(self, disc):
+        """Disciplina incluída ou editada (turmas, carga ou grupo)"""
+        self._invalidar(self._desvincular(disc) | self._vincular(disc))
+        self._tamanhos = (len(self.turmas), len(self.disciplinas))
+
+    def disciplina_removida(self, disc):
+        self._invalidar(self._desvincular(disc))
+        self._tamanhos = (len(self.turmas), len(self.disciplinas))
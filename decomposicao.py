@@ -0,0 +1,209 @@
+"""
+Geração decomposta: resolve em paralelo as partes independentes da escola.
+
+Turmas só interagem através dos professores que podem lecionar para
+elas (na prática, os professores "AMBOS" ligam os grupos A e B). O
+problema é dividido em componentes conexos por professor compartilhado,
+cada componente é resolvido em um processo e as aulas são unidas no
+final. As salas são de todas as partes: aulas de partes diferentes na
+mesma sala e horário mudam para outra sala livre do tipo certo. Professor
+com dois horários iguais, ou sala sem alternativa livre, faz as partes
+envolvidas serem resolvidas de novo em conjunto, e a união é conferida
+outra vez depois de cada nova resolução.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fixacao import gerar_com_fixas
+from geracao import ALGORITMO_PORTFOLIO, gerar_aulas, marcar_processo_dedicado
+from ocupacao_salas import conflitos_salas, realocar_salas
+from validacao import CONFLITO_PROFESSOR, CONFLITO_TURMA, validar_grade
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+class _UniaoBusca:
+    def __init__(self, elementos):
+        self.pai = {e: e for e in elementos}
+
+    def achar(self, e):
+        while self.pai[e] != e:
+            self.pai[e] = self.pai[self.pai[e]]
+            e = self.pai[e]
+        return e
+
+    def unir(self, a, b):
+        raiz_a, raiz_b = self.achar(a), self.achar(b)
+        if raiz_a != raiz_b:
+            self.pai[raiz_b] = raiz_a
+
+
+class Componente:
+    """Subproblema independente: turmas, professores e disciplinas ligados"""
+
+    def __init__(self):
+        self.turmas = []
+        self.professores = []
+        self.disciplinas = []
+
+    @property
+    def carga(self):
+        """Total de aulas semanais do componente (estimativa de custo)"""
+        nomes = {t.nome for t in self.turmas}
+        return sum(d.carga_semanal * len(nomes.intersection(d.turmas)) for d in self.disciplinas)
+
+
+def particionar(turmas, professores, disciplinas):
+    """Divide o problema em componentes conexos por professor compartilhado"""
+    turmas_por_nome = {t.nome: t for t in turmas}
+    uniao = _UniaoBusca(turmas_por_nome)
+
+    disciplinas_por_nome = {}
+    for disc in disciplinas:
+        disciplinas_por_nome.setdefault(disc.nome, []).append(disc)
+
+    # Turmas que cada professor pode atender (mesmo grupo ou professor AMBOS)
+    turmas_professor = {}
+    for prof in professores:
+        grupo_prof = _grupo(prof)
+        alcance = set()
+        for nome_disc in prof.disciplinas:
+            for disc in disciplinas_por_nome.get(nome_disc, ()):
+                for nome_turma in disc.turmas:
+                    turma = turmas_por_nome.get(nome_turma)
+                    if turma is not None and grupo_prof in (_grupo(turma), "AMBOS"):
+                        alcance.add(nome_turma)
+        turmas_professor[id(prof)] = alcance
+
+        alcance = list(alcance)
+        for nome_turma in alcance[1:]:
+            uniao.unir(alcance[0], nome_turma)
+
+    componentes = {}
+    for turma in turmas:
+        componentes.setdefault(uniao.achar(turma.nome), Componente()).turmas.append(turma)
+
+    for prof in professores:
+        alcance = turmas_professor[id(prof)]
+        if alcance:
+            componentes[uniao.achar(next(iter(alcance)))].professores.append(prof)
+
+    for disc in disciplinas:
+        raizes = {uniao.achar(n) for n in disc.turmas if n in turmas_por_nome}
+        for raiz in raizes:
+            componentes[raiz].disciplinas.append(disc)
+
+    return list(componentes.values())
+
+
+def agrupar_componentes(componentes, max_partes):
+    """Junta componentes em até `max_partes` subproblemas de carga parecida"""
+    partes = [Componente() for _ in range(min(max_partes, len(componentes)))]
+    for comp in sorted(componentes, key=lambda c: c.carga, reverse=True):
+        parte = min(partes, key=lambda p: p.carga)
+        parte.turmas.extend(comp.turmas)
+        parte.professores.extend(comp.professores)
+        for disc in comp.disciplinas:
+            if disc not in parte.disciplinas:
+                parte.disciplinas.append(disc)
+    return [p for p in partes if p.turmas]
+
+
+def conflitos_professores(aulas):
+    """Lista (professor, dia, horário) alocados mais de uma vez"""
+    vistos = set()
+    conflitos = []
+    for aula in aulas:
+        slot = (aula.professor, aula.dia, aula.horario)
+        if slot in vistos:
+            conflitos.append(slot)
+        else:
+            vistos.add(slot)
+    return conflitos
+
+
+def _partes_em_conflito(resultados):
+    """Índices das partes com aulas em conflito de professor ou de sala na união"""
+    aulas = [a for _, aulas_parte, _, _ in resultados for a in aulas_parte]
+    professores = {prof for prof, _, _ in conflitos_professores(aulas)}
+    slots_sala = set(conflitos_salas(aulas))
+    return [
+        i for i, (_, aulas_parte, _, _) in enumerate(resultados)
+        if any(a.professor in professores or (a.sala, a.dia, a.horario) in slots_sala for a in aulas_parte)
+    ]
+
+
+def gerar_aulas_decompostas(algoritmo, turmas, professores, disciplinas, salas, max_processos=None,
+                            tempo_limite=None, semente=None, fixas=None, comparar_partida=False):
+    """Gera a grade resolvendo os componentes independentes em paralelo
+
+    Mesmos argumentos e retorno de `geracao.gerar_aulas`: (aulas, metodo, aviso). Se a
+    união tiver professor em conflito ou sala ocupada duas vezes sem outra
+    sala livre, as partes envolvidas são resolvidas de novo em conjunto até
+    a união ficar sem conflitos (ou sobrar uma parte só).
+    """
+    if fixas:
+        return gerar_com_fixas(
+            gerar_aulas_decompostas, fixas, algoritmo, turmas, professores, disciplinas, salas,
+            max_processos=max_processos, tempo_limite=tempo_limite, semente=semente,
+            comparar_partida=comparar_partida
+        )
+
+    max_processos = max_processos or os.cpu_count() or 1
+    partes = agrupar_componentes(particionar(turmas, professores, disciplinas), max_processos)
+
+    opcoes = {"comparar_partida": comparar_partida}
+    if len(partes) <= 1:
+        return gerar_aulas(algoritmo, turmas, professores, disciplinas, salas, tempo_limite, semente, **opcoes)
+
+    if algoritmo == ALGORITMO_PORTFOLIO:
+        # Cada parte abre o próprio portfólio: os núcleos são divididos entre as partes
+        # (1 OR-Tools + sementes por parte), em vez de núcleos × núcleos processos
+        opcoes["num_sementes"] = max(1, (os.cpu_count() or 1) // len(partes) - 1)
+
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(partes), mp_context=contexto,
+                             initializer=marcar_processo_dedicado) as executor:
+        futuros = [
+            executor.submit(gerar_aulas, algoritmo, p.turmas, p.professores, p.disciplinas, salas,
+                            tempo_limite, semente, **opcoes)
+            for p in partes
+        ]
+        resultados = [(parte, *futuro.result()) for parte, futuro in zip(partes, futuros)]
+
+    metodos = {metodo for _, _, metodo, _ in resultados}
+    avisos = [aviso for _, _, _, aviso in resultados if aviso]
+    salas_trocadas = 0
+    while True:
+        aulas = [a for _, aulas_parte, _, _ in resultados for a in aulas_parte]
+        salas_trocadas += realocar_salas(aulas, salas, disciplinas)
+        envolvidas = _partes_em_conflito(resultados)
+        if len(envolvidas) < 2:
+            break
+        # Professor fora do alcance calculado, ou sala disputada sem alternativa: resolver junto
+        unidas = agrupar_componentes([resultados[i][0] for i in envolvidas], 1)[0]
+        aulas_unidas, metodo, aviso = gerar_aulas(
+            algoritmo, unidas.turmas, unidas.professores, unidas.disciplinas, salas, tempo_limite, semente,
+            comparar_partida=comparar_partida
+        )
+        resultados = [r for i, r in enumerate(resultados) if i not in envolvidas]
+        resultados.append((unidas, aulas_unidas, metodo, aviso))
+        metodos.add(metodo)
+        avisos.append(f"⚠️ Conflitos entre partes: {len(envolvidas)} partes foram resolvidas novamente em conjunto.")
+        if aviso:
+            avisos.append(aviso)
+
+    if salas_trocadas:
+        avisos.append(f"🏫 {salas_trocadas} aula(s) mudaram de sala para não dividir a sala com outra parte.")
+    validacao = validar_grade(aulas, turmas, professores, disciplinas)
+    restantes = (validacao.contagem(CONFLITO_PROFESSOR) + validacao.contagem(CONFLITO_TURMA)
+                 + len(conflitos_salas(aulas)))
+    if restantes:
+        avisos.append(f"⚠️ A grade unida ainda tem {restantes} conflito(s) de professor, turma ou sala.")
+
+    metodo = f"{' + '.join(sorted(metodos))} (decomposto em {len(partes)} partes)"
+    return aulas, metodo, "\n".join(avisos) or None
@@ -0,0 +1,106 @@
+"""
+Disponibilidade de professores como máscara de bits.
+
+Cada professor tem um inteiro com um bit por (dia, horário): bit
+`dia * 8 + (horario - 1)`, com os dias na ordem canônica segunda..sexta.
+Bit ligado = professor pode dar aula naquele horário.
+
+O formato antigo (dias por extenso ou abreviados em `disponibilidade` e
+strings "seg_3" em `horarios_indisponiveis`) só é lido para migrar
+professores carregados do banco; os campos antigos continuam sendo
+preenchidos a partir da máscara para o banco e os agendadores.
+"""
+
+DIAS_CANONICOS = ["segunda", "terca", "quarta", "quinta", "sexta"]
+ABREVIACOES = ["seg", "ter", "qua", "qui", "sex"]
+NUM_HORARIOS = 8  # 1-8 para cobrir EM
+
+# Aceita tanto o formato completo ("segunda") quanto o abreviado ("seg")
+INDICE_DIA = {dia: i for i, dia in enumerate(DIAS_CANONICOS)}
+INDICE_DIA.update({dia: i for i, dia in enumerate(ABREVIACOES)})
+
+MASCARA_DIA = (1 << NUM_HORARIOS) - 1
+MASCARA_SEMANA = (1 << (len(DIAS_CANONICOS) * NUM_HORARIOS)) - 1
+
+
+def bit_slot(dia, horario):
+    """Posição do bit do slot (dia, horário), ou None se fora da semana"""
+    indice_dia = INDICE_DIA.get(dia)
+    if indice_dia is None or not 1 <= horario <= NUM_HORARIOS:
+        return None
+    return indice_dia * NUM_HORARIOS + (horario - 1)
+
+
+def mascara_do_dia(dia):
+    """Máscara com todos os horários do dia"""
+    return MASCARA_DIA << (INDICE_DIA[dia] * NUM_HORARIOS)
+
+
+def disponivel(mascara, dia, horario):
+    """Indica se a máscara libera o dia/horário"""
+    bit = bit_slot(dia, horario)
+    return bit is not None and bool(mascara >> bit & 1)
+
+
+def dias_da_mascara(mascara):
+    """Dias (formato canônico) com pelo menos um horário livre"""
+    return [dia for i, dia in enumerate(DIAS_CANONICOS) if mascara >> (i * NUM_HORARIOS) & MASCARA_DIA]
+
+
+def mascara_de_slots(slots):
+    """Converte strings "dia_horario" (ex: "seg_3") em máscara de bits"""
+    mascara = 0
+    for slot in slots or ():
+        try:
+            dia, horario = slot.rsplit("_", 1)
+            bit = bit_slot(dia, int(horario))
+        except (AttributeError, ValueError):
+            continue
+        if bit is not None:
+            mascara |= 1 << bit
+    return mascara
+
+
+def migrar_formato_antigo(dias, horarios_indisponiveis):
+    """Máscara equivalente ao par (dias disponíveis, "dia_horario" indisponíveis)"""
+    mascara = 0
+    for dia in dias or ():
+        if dia in INDICE_DIA:
+            mascara |= mascara_do_dia(dia)
+    return mascara & ~mascara_de_slots(horarios_indisponiveis)
+
+
+def mascara_professor(professor):
+    """Máscara de disponibilidade do professor
+
+    Professores ainda no formato antigo são migrados na primeira leitura.
+    """
+    mascara = getattr(professor, "mascara_disponibilidade", None)
+    if mascara is None:
+        mascara = migrar_formato_antigo(
+            getattr(professor, "disponibilidade", ()),
+            getattr(professor, "horarios_indisponiveis", ())
+        )
+        try:
+            professor.mascara_disponibilidade = mascara
+        except AttributeError:
+            pass
+    return mascara
+
+
+def campos_formato_antigo(mascara):
+    """(disponibilidade, horarios_indisponiveis) derivados da máscara"""
+    dias = dias_da_mascara(mascara)
+    indisponiveis = {
+        f"{ABREVIACOES[INDICE_DIA[dia]]}_{horario}"
+        for dia in dias
+        for horario in range(1, NUM_HORARIOS + 1)
+        if not disponivel(mascara, dia, horario)
+    }
+    return set(dias), indisponiveis
+
+
+def definir_disponibilidade(professor, mascara):
+    """Grava a máscara no professor e atualiza os campos do formato antigo"""
+    professor.mascara_disponibilidade = mascara
+    professor.disponibilidade, professor.horarios_indisponiveis = campos_formato_antigo(mascara)
@@ -0,0 +1,105 @@
+"""
+Exportação da grade para Excel sob demanda.
+
+As planilhas são escritas linha a linha com o openpyxl em modo somente
+escrita, sem montar a pasta de trabalho inteira na memória. Os bytes
+prontos ficam num cache em memória compartilhado entre as sessões,
+indexado pela versão da grade (ver GradeColunar.versao), para que
+baixar de novo a mesma grade não gere o arquivo outra vez.
+"""
+import io
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+LIMITE_EXPORTACOES = 8  # arquivos mantidos no cache antes de descartar os mais antigos
+CARACTERES_INVALIDOS_ABA = re.compile(r"[\[\]:*?/\\]")
+
+_cache = OrderedDict()
+_trava = threading.Lock()
+
+
+def exportacao_pronta(chave):
+    """Bytes já gerados para a chave, ou None"""
+    with _trava:
+        dados = _cache.get(chave)
+        if dados is not None:
+            _cache.move_to_end(chave)
+        return dados
+
+
+def obter_exportacao(chave, gerar):
+    """Bytes da exportação da chave, chamando `gerar()` só se não estiverem no cache"""
+    dados = exportacao_pronta(chave)
+    if dados is None:
+        dados = gerar()
+        with _trava:
+            _cache[chave] = dados
+            _cache.move_to_end(chave)
+            while len(_cache) > LIMITE_EXPORTACOES:
+                _cache.popitem(last=False)
+    return dados
+
+
+def _nome_aba(nome):
+    return CARACTERES_INVALIDOS_ABA.sub("_", str(nome))[:31] or "Planilha"
+
+
+def _escrever_linhas(aba, df):
+    """Cabeçalho e linhas do DataFrame, uma por vez (vazios viram célula vazia)"""
+    aba.append(list(df.columns))
+    for linha in df.itertuples(index=False, name=None):
+        aba.append([None if pd.isna(valor) else valor for valor in linha])
+
+
+def _nova_pasta():
+    from openpyxl import Workbook  # ImportError sobe para o app oferecer CSV
+    return Workbook(write_only=True)
+
+
+def _salvar(pasta):
+    saida = io.BytesIO()
+    pasta.save(saida)
+    return saida.getvalue()
+
+
+def exportar_grade(df_aulas, estatisticas):
+    """Pasta com a grade completa e uma aba de estatísticas
+
+    `estatisticas` é uma lista de pares (estatística, valor).
+    """
+    pasta = _nova_pasta()
+    _escrever_linhas(pasta.create_sheet("Grade_Completa"), df_aulas)
+    aba = pasta.create_sheet("Estatísticas")
+    aba.append(["Estatística", "Valor"])
+    for estatistica, valor in estatisticas:
+        aba.append([estatistica, valor])
+    return _salvar(pasta)
+
+
+def exportar_professores(df_resumo, df_professores, coluna_professor="Professor"):
+    """Pasta com o resumo e uma aba por professor
+
+    `df_professores` deve vir ordenado por professor: as abas são
+    escritas numa única passagem, abrindo uma nova a cada troca de
+    professor.
+    """
+    pasta = _nova_pasta()
+    _escrever_linhas(pasta.create_sheet("Resumo_Professores"), df_resumo)
+
+    colunas = [c for c in df_professores.columns if c != coluna_professor]
+    posicao_professor = list(df_professores.columns).index(coluna_professor)
+    posicoes = [i for i, c in enumerate(df_professores.columns) if c != coluna_professor]
+
+    aba = None
+    professor_atual = None
+    for linha in df_professores.itertuples(index=False, name=None):
+        professor = linha[posicao_professor]
+        if aba is None or professor != professor_atual:
+            professor_atual = professor
+            aba = pasta.create_sheet(_nome_aba(professor))
+            aba.append(colunas)
+        aba.append([None if pd.isna(linha[i]) else linha[i] for i in posicoes])
+    return _salvar(pasta)
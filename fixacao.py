@@ -0,0 +1,190 @@
+"""
+Aulas fixas (travadas no calendário) na geração da grade.
+
+Uma aula marcada com `fixa=True` continua no mesmo lugar quando a grade é
+gerada de novo, e sai do espaço de busca dos agendadores antes de chegar
+a eles:
+
+- a carga de cada (turma, disciplina) perde as aulas já fixadas; a parte
+  da disciplina que sobra para uma turma fixada ganha nome próprio;
+- o horário fixado sai da disponibilidade do professor;
+- os horários fixados da turma são ocupados por uma disciplina de
+  bloqueio, dada por um professor de bloqueio disponível só neles. Os
+  agendadores respeitam disponibilidade de professor, então não põem
+  outra aula da turma ali.
+
+Os agendadores resolvem só o restante; as aulas de bloqueio saem, as
+disciplinas voltam ao nome original e as fixas são juntadas às aulas
+geradas. Aula gerada que ainda caia no horário de uma fixa levanta
+ErroFixas; aula na sala de uma fixa muda para outra sala livre.
+"""
+import copy
+
+from disponibilidade import bit_slot, definir_disponibilidade, mascara_professor
+from ocupacao_salas import conflitos_salas, realocar_salas
+
+PREFIXO_BLOQUEIO = "🔒 Fixas "
+
+
+class ErroFixas(Exception):
+    """Grade gerada que não respeitou as aulas fixas"""
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+class ProblemaReduzido:
+    """Entradas dos agendadores sem o que as fixas ocupam, e como desfazer os nomes trocados"""
+
+    def __init__(self):
+        self.turmas = []
+        self.professores = []
+        self.disciplinas = []
+        self.nomes_originais = {}  # nome da parte de disciplina -> nome cadastrado
+        self.bloqueios = set()  # disciplinas de bloqueio
+
+    def restaurar(self, aulas):
+        """Aulas geradas sem as de bloqueio e com o nome cadastrado das disciplinas"""
+        restauradas = []
+        for aula in aulas:
+            if aula.disciplina in self.bloqueios:
+                continue
+            if aula.disciplina in self.nomes_originais:
+                aula.disciplina = self.nomes_originais[aula.disciplina]
+            restauradas.append(aula)
+        return restauradas
+
+
+def reduzir_problema(fixas, turmas, professores, disciplinas):
+    """ProblemaReduzido com (turmas, professores, disciplinas) sem o que as aulas fixas já ocupam
+
+    Objetos afetados são copiados; os originais não mudam. Uma disciplina
+    com aulas fixas em parte das turmas é dividida: uma cópia com o nome
+    original para as turmas sem fixas e uma por turma fixada, com a carga
+    que falta e nome próprio (os professores dela passam a dar as duas).
+    Cada turma com fixas ganha uma disciplina e um professor de bloqueio
+    (ver o início do módulo).
+    """
+    problema = ProblemaReduzido()
+    bloqueados = {}  # turma -> máscara dos horários fixados
+    ocupados = {}  # professor -> máscara dos horários fixados
+    fixadas = {}  # (turma, disciplina) -> aulas fixas
+    for aula in fixas:
+        bit = bit_slot(aula.dia, aula.horario)
+        if bit is None:
+            continue
+        bloqueados[aula.turma] = bloqueados.get(aula.turma, 0) | 1 << bit
+        ocupados[aula.professor] = ocupados.get(aula.professor, 0) | 1 << bit
+        chave = (aula.turma, aula.disciplina)
+        fixadas[chave] = fixadas.get(chave, 0) + 1
+
+    partes = {}  # nome cadastrado -> nomes das partes
+    for disc in disciplinas:
+        com_fixas = [t for t in disc.turmas if (t, disc.nome) in fixadas]
+        if not com_fixas:
+            problema.disciplinas.append(disc)
+            continue
+        sem_fixas = [t for t in disc.turmas if (t, disc.nome) not in fixadas]
+        if sem_fixas:
+            parte = copy.copy(disc)
+            parte.turmas = sem_fixas
+            problema.disciplinas.append(parte)
+        for nome_turma in com_fixas:
+            faltam = disc.carga_semanal - fixadas[(nome_turma, disc.nome)]
+            if faltam > 0:
+                parte = copy.copy(disc)
+                parte.nome = f"{disc.nome} · {nome_turma}"
+                parte.turmas = [nome_turma]
+                parte.carga_semanal = faltam
+                problema.disciplinas.append(parte)
+                problema.nomes_originais[parte.nome] = disc.nome
+                partes.setdefault(disc.nome, []).append(parte.nome)
+
+    for professor in professores:
+        novas = [nome for d in professor.disciplinas for nome in partes.get(d, ())]
+        if professor.nome in ocupados or novas:
+            mascara = mascara_professor(professor) & ~ocupados.get(professor.nome, 0)
+            professor = copy.copy(professor)
+            professor.disciplinas = list(professor.disciplinas) + novas
+            definir_disponibilidade(professor, mascara)
+        problema.professores.append(professor)
+
+    for turma in turmas:
+        problema.turmas.append(turma)
+        mascara = bloqueados.get(turma.nome)
+        if not mascara or not disciplinas or not professores:
+            continue
+        bloqueio = copy.copy(disciplinas[0])
+        bloqueio.nome = f"{PREFIXO_BLOQUEIO}{turma.nome}"
+        bloqueio.carga_semanal = bin(mascara).count("1")
+        bloqueio.tipo = "leve"
+        bloqueio.turmas = [turma.nome]
+        bloqueio.grupo = _grupo(turma)
+        problema.disciplinas.append(bloqueio)
+        problema.bloqueios.add(bloqueio.nome)
+
+        professor = copy.copy(professores[0])
+        professor.nome = bloqueio.nome
+        professor.disciplinas = [bloqueio.nome]
+        professor.grupo = bloqueio.grupo
+        definir_disponibilidade(professor, mascara)
+        problema.professores.append(professor)
+    return problema
+
+
+def completar_com_fixas(aulas, fixas, problema, salas, disciplinas):
+    """Junta as aulas geradas às fixas; retorna (aulas, aviso)
+
+    Levanta ErroFixas se uma aula gerada caiu num horário ocupado por uma
+    fixa (da turma ou do professor), ou numa sala de fixa sem outra livre.
+    """
+    fixas = list(fixas)
+    aulas = problema.restaurar(aulas)
+    ocupados = set()
+    for aula in fixas:
+        ocupados.add(("turma", aula.turma, aula.dia, aula.horario))
+        ocupados.add(("professor", aula.professor, aula.dia, aula.horario))
+    colisoes = [
+        a for a in aulas
+        if ("turma", a.turma, a.dia, a.horario) in ocupados or ("professor", a.professor, a.dia, a.horario) in ocupados
+    ]
+    if colisoes:
+        exemplo = colisoes[0]
+        raise ErroFixas(
+            f"{len(colisoes)} aula(s) gerada(s) em horário de aula fixa (ex: {exemplo.disciplina} "
+            f"da {exemplo.turma}, {exemplo.dia} {exemplo.horario}º horário): o agendador não respeitou o bloqueio"
+        )
+
+    # As fixas vêm primeiro: nunca mudam de sala
+    todas = fixas + aulas
+    trocadas = realocar_salas(todas, salas, disciplinas)
+    salas_fixas = {(a.sala, a.dia, a.horario) for a in fixas if a.sala}
+    disputadas = salas_fixas.intersection(conflitos_salas(todas))
+    if disputadas:
+        sala, dia, horario = min(disputadas, key=lambda slot: (slot[0], bit_slot(*slot[1:])))
+        raise ErroFixas(f"Sem sala livre para aulas geradas no lugar de fixas (ex: {sala}, {dia} {horario}º horário)")
+
+    aviso = f"🔒 {len(fixas)} aula(s) fixa(s) mantida(s) no lugar."
+    if trocadas:
+        aviso += f" {trocadas} aula(s) gerada(s) mudaram de sala para não usar a sala de uma fixa."
+    return todas, aviso
+
+
+def gerar_com_fixas(funcao, fixas, algoritmo, turmas, professores, disciplinas, salas, **opcoes):
+    """Roda `funcao` (gerar_aulas ou gerar_aulas_decompostas) só no que as fixas não ocupam
+
+    Mesmo retorno de `geracao.gerar_aulas`: (aulas, metodo, aviso).
+    """
+    nomes_turmas = {t.nome for t in turmas}
+    fixas = [a for a in fixas if a.turma in nomes_turmas]
+    if not fixas:
+        return funcao(algoritmo, turmas, professores, disciplinas, salas, **opcoes)
+
+    problema = reduzir_problema(fixas, turmas, professores, disciplinas)
+    aulas, metodo, aviso = funcao(
+        algoritmo, problema.turmas, problema.professores, problema.disciplinas, salas, **opcoes
+    )
+    aulas, aviso_fixas = completar_com_fixas(aulas, fixas, problema, salas, disciplinas)
+    return aulas, metodo, "\n".join(a for a in (aviso, aviso_fixas) if a)
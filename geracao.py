@@ -0,0 +1,278 @@
+"""
+Execução dos algoritmos de geração de grade horária.
+
+Isolado do app Streamlit para poder ser chamado de qualquer lugar
+(cache, tarefas em segundo plano, linha de comando).
+"""
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from disponibilidade import definir_disponibilidade, mascara_professor
+from fixacao import gerar_com_fixas
+from models import DIAS_SEMANA
+from scheduler_ortools import GradeHorariaORTools
+from simple_scheduler import SimpleGradeHoraria
+import tarefas
+from warm_start import CronometroSolucoes, aplicar_dicas, dicas_da_grade, relatorio_partida
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # sem OR-Tools o agendador falha e a geração cai no algoritmo simples
+    cp_model = None
+
+ALGORITMO_SIMPLES = "Algoritmo Simples (Rápido)"
+ALGORITMO_ORTOOLS = "Google OR-Tools (Otimizado)"
+ALGORITMO_ORTOOLS_DICA = "OR-Tools com Partida do Simples"
+ALGORITMO_PORTFOLIO = "Portfólio (OR-Tools + Simples em paralelo)"
+ALGORITMOS = [ALGORITMO_SIMPLES, ALGORITMO_ORTOOLS, ALGORITMO_ORTOOLS_DICA, ALGORITMO_PORTFOLIO]
+METODO_FALLBACK = "Algoritmo Simples (fallback)"
+
+_processo_dedicado = False
+
+
+def marcar_processo_dedicado():
+    """Indica que o processo atual só existe para gerar grades (ver `em_processo_dedicado`)"""
+    global _processo_dedicado
+    _processo_dedicado = True
+
+
+def em_processo_dedicado(funcao, *args, **kwargs):
+    """Executa `funcao` num processo que serve só a esta geração
+
+    Semear o `random` do módulo e interceptar o CpSolver mexem no estado do
+    interpretador inteiro. Dentro de uma tarefa (ver tarefas), de uma estratégia do portfólio ou
+    de uma parte da decomposição, `funcao` roda ali mesmo; fora disso,
+    roda num processo novo e só o resultado volta.
+    """
+    if _processo_dedicado or tarefas.em_tarefa():
+        return funcao(*args, **kwargs)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto, initializer=marcar_processo_dedicado) as executor:
+        return executor.submit(funcao, *args, **kwargs).result()
+
+
+def sincronizar_disponibilidade(professores):
+    """Reescreve os campos antigos de disponibilidade a partir da máscara
+
+    Os agendadores ainda leem `disponibilidade`/`horarios_indisponiveis`;
+    a máscara de bits é a fonte da verdade.
+    """
+    for professor in professores:
+        definir_disponibilidade(professor, mascara_professor(professor))
+
+
+def _gerar_simples(turmas, professores, disciplinas, salas):
+    """Roda o SimpleGradeHoraria com todos os dias da semana"""
+    simple_grade = SimpleGradeHoraria(
+        turmas=turmas,
+        professores=professores,
+        disciplinas=disciplinas,
+        salas=salas,
+        dias_em_estendido=DIAS_SEMANA  # ✅ SEMPRE TODOS OS DIAS
+    )
+    return simple_grade.gerar_grade()
+
+
+def _gerar_simples_semeado(turmas, professores, disciplinas, salas, semente):
+    """Algoritmo simples com o `random` do módulo semeado (só em processo dedicado)"""
+    random.seed(semente)
+    return _gerar_simples(turmas, professores, disciplinas, salas)
+
+
+def gerar_simples(turmas, professores, disciplinas, salas, semente=None):
+    """Gera a grade com o algoritmo simples (`semente` fixa o sorteio, se houver)
+
+    O SimpleGradeHoraria sorteia com o `random` do módulo; com `semente`, a
+    geração vai para um processo dedicado, que é o único a ser semeado.
+    """
+    sincronizar_disponibilidade(professores)
+    if semente is None:
+        return _gerar_simples(turmas, professores, disciplinas, salas)
+    return em_processo_dedicado(_gerar_simples_semeado, turmas, professores, disciplinas, salas, semente)
+
+
+@contextmanager
+def _interceptar_solve(envolver):
+    """Troca `CpSolver.Solve` (e `SolveWithSolutionCallback`) por `envolver(original)` dentro do bloco
+
+    O GradeHorariaORTools cria o modelo e o CpSolver dentro de `resolver()`
+    e não recebe parâmetros do solver; só o Solve enxerga os dois. A troca
+    vale para o processo inteiro: use só em processo dedicado (ver
+    `em_processo_dedicado`).
+    """
+    if cp_model is None:
+        yield
+        return
+    originais = {
+        nome: getattr(cp_model.CpSolver, nome)
+        for nome in ("Solve", "SolveWithSolutionCallback") if hasattr(cp_model.CpSolver, nome)
+    }
+    for nome, original in originais.items():
+        setattr(cp_model.CpSolver, nome, envolver(original))
+    try:
+        yield
+    finally:
+        for nome, original in originais.items():
+            setattr(cp_model.CpSolver, nome, original)
+
+
+@contextmanager
+def tempo_limite_cp_sat(segundos):
+    """Limita a `segundos` todo `CpSolver.Solve` chamado dentro do bloco
+
+    Um limite menor que o agendador já tenha posto é mantido. Ao fim do
+    tempo o CP-SAT devolve a melhor solução viável encontrada (status
+    FEASIBLE) em vez de o processo ser encerrado sem nada.
+    """
+    if segundos is None:
+        yield
+        return
+
+    def limitado(original):
+        def resolver(solver, *args, **kwargs):
+            parametros = solver.parameters
+            parametros.max_time_in_seconds = min(parametros.max_time_in_seconds, float(segundos))
+            return original(solver, *args, **kwargs)
+        return resolver
+
+    with _interceptar_solve(limitado):
+        yield
+
+
+@contextmanager
+def partida_cp_sat(tempos, dicas=None):
+    """Cronometra o CP-SAT chamado dentro do bloco e, com `dicas`, dá a partida por elas
+
+    `tempos` recebe 'primeira' e 'final' (segundos até a primeira solução e
+    até o fim), 'status' e, com `dicas` (ver warm_start.dicas_da_grade),
+    'dicas'/'variaveis' (variáveis com dica 1 / com dica). A primeira
+    solução só é medida quando o agendador não passa callback próprio.
+    """
+    def cronometrado(original):
+        def resolver(solver, modelo, *args, **kwargs):
+            if dicas is not None:
+                tempos["dicas"], tempos["variaveis"] = aplicar_dicas(modelo, dicas)
+            cronometro = None
+            if not args and kwargs.get("solution_callback") is None:
+                kwargs.pop("solution_callback", None)
+                cronometro = CronometroSolucoes()
+                args = (cronometro,)
+            inicio = time.time()
+            status = original(solver, modelo, *args, **kwargs)
+            tempos["final"] = time.time() - inicio
+            tempos["primeira"] = cronometro.tempo_primeira_solucao if cronometro else None
+            tempos["status"] = solver.StatusName(status)
+            return status
+        return resolver
+
+    with _interceptar_solve(cronometrado):
+        yield
+
+
+def _resolver_ortools(turmas, professores, disciplinas, tempo_limite=None, dicas=None, cronometrar=False):
+    """Resolve o modelo do agendador; retorna (aulas, tempos), `tempos` vazio sem `cronometrar`"""
+    grade = GradeHorariaORTools(
+        turmas,
+        professores,
+        disciplinas,
+        dias_em_estendido=DIAS_SEMANA  # ✅ SEMPRE TODOS OS DIAS
+    )
+    tempos = {}
+    with tempo_limite_cp_sat(tempo_limite), (partida_cp_sat(tempos, dicas) if cronometrar else nullcontext()):
+        return grade.resolver(), tempos
+
+
+def gerar_ortools(turmas, professores, disciplinas, tempo_limite=None):
+    """Gera a grade com o modelo CP-SAT do OR-Tools
+
+    `tempo_limite` (segundos) vira o `max_time_in_seconds` do CP-SAT; com
+    ele, a resolução vai para um processo dedicado (`tempo_limite_cp_sat`).
+    """
+    sincronizar_disponibilidade(professores)
+    if tempo_limite is None:
+        return _resolver_ortools(turmas, professores, disciplinas)[0]
+    return em_processo_dedicado(_resolver_ortools, turmas, professores, disciplinas, tempo_limite)[0]
+
+
+def gerar_ortools_com_partida(turmas, professores, disciplinas, salas, tempo_limite=None, semente=None,
+                              comparar=False):
+    """OR-Tools partindo da grade do algoritmo simples como dica
+
+    Retorna (aulas, metodo, aviso); o aviso traz o relatório de tempos. Com
+    `comparar=True` o OR-Tools também roda sem dica, para medir o ganho.
+    Se o OR-Tools falhar, a grade do algoritmo simples é devolvida.
+    """
+    inicio = time.time()
+    aulas_simples = gerar_simples(turmas, professores, disciplinas, salas, semente)
+    tempo_simples = time.time() - inicio
+
+    try:
+        aulas, tempos_com_dica = em_processo_dedicado(
+            _resolver_ortools, turmas, professores, disciplinas, tempo_limite, dicas_da_grade(aulas_simples), True
+        )
+        tempos_sem_dica = None
+        if comparar:
+            _, tempos_sem_dica = em_processo_dedicado(
+                _resolver_ortools, turmas, professores, disciplinas, tempo_limite, None, True
+            )
+    except Exception as e:
+        aviso = f"⚠️ OR-Tools com dica falhou: {str(e)}. Usando a grade do algoritmo simples."
+        return aulas_simples, METODO_FALLBACK, aviso
+    return aulas, "Google OR-Tools (partida do Simples)", relatorio_partida(tempo_simples, tempos_com_dica,
+                                                                            tempos_sem_dica)
+
+
+def resultado_do_algoritmo(aulas, metodo):
+    """Indica se a grade veio do algoritmo escolhido: não vazia e sem fallback para o simples
+
+    Vale também para o método composto da geração decomposta. Só essas
+    grades entram no cache.
+    """
+    return len(aulas) > 0 and METODO_FALLBACK not in metodo
+
+
+def gerar_aulas(algoritmo, turmas, professores, disciplinas, salas, tempo_limite=None, semente=None,
+                fixas=None, num_sementes=None, comparar_partida=False):
+    """Gera a grade com o algoritmo escolhido
+
+    Retorna (aulas, metodo, aviso). Se o OR-Tools falhar, usa o algoritmo
+    simples e devolve o motivo em `aviso`. `tempo_limite` (segundos) vale
+    para o OR-Tools e para o orçamento do portfólio; `semente` para o
+    algoritmo simples e as sementes do portfólio. `fixas` são aulas
+    travadas que entram na grade como estão (ver fixacao). `num_sementes`
+    limita as execuções do simples no portfólio (padrão: núcleos - 1).
+    `comparar_partida` faz a partida do simples medir também o OR-Tools sem dica.
+    """
+    if fixas:
+        return gerar_com_fixas(
+            gerar_aulas, fixas, algoritmo, turmas, professores, disciplinas, salas,
+            tempo_limite=tempo_limite, semente=semente, num_sementes=num_sementes,
+            comparar_partida=comparar_partida
+        )
+
+    if algoritmo == ALGORITMO_PORTFOLIO:
+        from portfolio import ORCAMENTO_PADRAO, gerar_aulas_portfolio
+        return gerar_aulas_portfolio(
+            turmas, professores, disciplinas, salas,
+            num_sementes=num_sementes, orcamento=tempo_limite or ORCAMENTO_PADRAO, semente_base=semente or 0
+        )
+
+    if algoritmo == ALGORITMO_ORTOOLS_DICA:
+        return gerar_ortools_com_partida(
+            turmas, professores, disciplinas, salas, tempo_limite=tempo_limite, semente=semente,
+            comparar=comparar_partida
+        )
+
+    if algoritmo == ALGORITMO_ORTOOLS:
+        try:
+            aulas = gerar_ortools(turmas, professores, disciplinas, tempo_limite=tempo_limite)
+            return aulas, "Google OR-Tools", None
+        except Exception as e:
+            aviso = f"⚠️ OR-Tools falhou: {str(e)}. Usando algoritmo simples..."
+            aulas = gerar_simples(turmas, professores, disciplinas, salas, semente)
+            return aulas, METODO_FALLBACK, aviso
+
+    return gerar_simples(turmas, professores, disciplinas, salas, semente), "Algoritmo Simples", None
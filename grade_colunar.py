@@ -0,0 +1,290 @@
+"""
+Armazenamento colunar das aulas de uma grade gerada.
+
+Em vez de uma lista de objetos `Aula` com strings repetidas, a grade vira
+um vetor de códigos por coluna (turma, disciplina, professor, sala, dia,
+grupo) mais um vetor de horários. Cada texto é guardado uma vez só, no
+vocabulário da coluna; a marca de aula fixa (travada no calendário) é um
+vetor booleano à parte; outros atributos das aulas (id, padrões do
+construtor) ficam em colunas de objetos e voltam em `materializar`. Tabelas para a tela e para o Excel saem de
+`dataframe()` sem copiar os códigos, e o acesso linha a linha (`for aula
+in grade`) continua devolvendo objetos com os atributos de `Aula`.
+"""
+import copy
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from grade_index import DIAS_ORDENADOS
+
+COLUNAS_TEXTO = ("turma", "disciplina", "professor", "sala", "dia", "grupo")
+COLUNAS = COLUNAS_TEXTO + ("horario",)
+
+
+class _Ausente:
+    """Marca de atributo que a aula original não tinha (sobrevive ao pickle)"""
+
+    def __reduce__(self):
+        return "AUSENTE"
+
+    def __repr__(self):
+        return "AUSENTE"
+
+
+AUSENTE = _Ausente()
+
+
+class Vocabulario:
+    """Textos distintos de uma coluna; o código é a posição na lista"""
+
+    __slots__ = ("valores", "codigos")
+
+    def __init__(self, valores=()):
+        self.valores = []
+        self.codigos = {}
+        for valor in valores:
+            self.codigo(valor)
+
+    def codigo(self, valor):
+        """Código do valor, criando-o se necessário (None vira -1)"""
+        if valor is None:
+            return -1
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    def tipo_codigo(self):
+        """Menor inteiro que comporta os códigos (o mesmo que o pandas usaria)"""
+        for tipo in (np.int8, np.int16, np.int32):
+            if len(self.valores) < np.iinfo(tipo).max:
+                return tipo
+        return np.int64
+
+
+def _coluna(nome):
+    def ler(self):
+        return self._grade.valor(nome, self._indice)
+    return property(ler)
+
+
+class LinhaAula:
+    """Visão somente leitura de uma aula da grade colunar
+
+    `copy.copy` devolve um objeto `Aula` independente, que pode ser alterado.
+    """
+
+    __slots__ = ("_grade", "_indice")
+
+    turma = _coluna("turma")
+    disciplina = _coluna("disciplina")
+    professor = _coluna("professor")
+    sala = _coluna("sala")
+    dia = _coluna("dia")
+    grupo = _coluna("grupo")
+
+    def __init__(self, grade, indice):
+        self._grade = grade
+        self._indice = indice
+
+    @property
+    def horario(self):
+        return int(self._grade.horarios[self._indice])
+
+    @property
+    def fixa(self):
+        return bool(self._grade.fixas[self._indice])
+
+    def __getattr__(self, nome):
+        # Atributos fora das colunas principais (ex: id da aula)
+        extras = self._grade.extras
+        if nome in extras:
+            valor = extras[nome][self._indice]
+            if valor is not AUSENTE:
+                return valor
+        raise AttributeError(nome)
+
+    def __copy__(self):
+        return self._grade.materializar(self._indice)
+
+    def __repr__(self):
+        return f"LinhaAula({self.turma}, {self.disciplina}, {self.professor}, {self.dia}, {self.horario})"
+
+
+def _atributos_extras(aula):
+    """(nome, valor) dos atributos da aula fora das colunas e da marca de fixa"""
+    if isinstance(aula, LinhaAula):
+        grade, indice = aula._grade, aula._indice
+        return [
+            (nome, valores[indice]) for nome, valores in grade.extras.items() if valores[indice] is not AUSENTE
+        ]
+    return [
+        (nome, valor) for nome, valor in getattr(aula, "__dict__", {}).items()
+        if nome not in COLUNAS and nome != "fixa"
+    ]
+
+
+class GradeColunar:
+    """Aulas de uma grade guardadas por coluna, com textos codificados"""
+
+    def __init__(self, aulas=()):
+        aulas = list(aulas)
+        self.tipo_aula = None
+        for aula in aulas:
+            self.tipo_aula = aula._grade.tipo_aula if isinstance(aula, LinhaAula) else type(aula)
+            break
+
+        self.vocabularios = {nome: Vocabulario() for nome in COLUNAS_TEXTO}
+        # Dias sempre na ordem da semana: o código do dia já serve para ordenar
+        self.vocabularios["dia"] = Vocabulario(DIAS_ORDENADOS)
+
+        self.codigos = {}
+        for nome in COLUNAS_TEXTO:
+            vocabulario = self.vocabularios[nome]
+            codigos = [vocabulario.codigo(getattr(aula, nome, None)) for aula in aulas]
+            self.codigos[nome] = np.array(codigos, dtype=vocabulario.tipo_codigo())
+        self.horarios = np.array([aula.horario for aula in aulas], dtype=np.int8)
+        self.fixas = np.array([bool(getattr(aula, "fixa", False)) for aula in aulas], dtype=bool)
+
+        # Demais atributos, por nome; AUSENTE onde a aula não tinha o atributo
+        extras = {}
+        for indice, aula in enumerate(aulas):
+            for nome, valor in _atributos_extras(aula):
+                if nome not in extras:
+                    extras[nome] = np.full(len(aulas), AUSENTE, dtype=object)
+                extras[nome][indice] = valor
+        self.extras = extras
+        self._versao = None
+
+    def __setstate__(self, estado):
+        # Grades gravadas antes da marca de aula fixa e dos atributos extras
+        estado.setdefault("fixas", np.zeros(len(estado["horarios"]), dtype=bool))
+        estado.setdefault("extras", {})
+        self.__dict__.update(estado)
+
+    def __len__(self):
+        return len(self.horarios)
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield LinhaAula(self, indice)
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("aula fora da grade")
+        return LinhaAula(self, indice)
+
+    def versao(self):
+        """Hash do conteúdo da grade: muda sempre que alguma aula muda"""
+        if self._versao is None:
+            resumo = hashlib.sha1(self.horarios.tobytes())
+            resumo.update(self.fixas.tobytes())
+            for nome in COLUNAS_TEXTO:
+                resumo.update(self.codigos[nome].tobytes())
+                resumo.update("\x1f".join(map(str, self.vocabularios[nome].valores)).encode("utf-8"))
+            self._versao = resumo.hexdigest()
+        return self._versao
+
+    def valor(self, coluna, indice):
+        """Texto da coluna na linha `indice` (None se vazio)"""
+        codigo = self.codigos[coluna][indice]
+        return None if codigo < 0 else self.vocabularios[coluna].valores[codigo]
+
+    def materializar(self, indice):
+        """Cria um objeto `Aula` (do mesmo tipo das aulas originais) para a linha
+
+        A assinatura de `Aula.__init__` não é usada: o objeto volta com os
+        mesmos atributos que a aula original tinha, colunas e extras.
+        """
+        aula = self.tipo_aula.__new__(self.tipo_aula)
+        for nome, valores in self.extras.items():
+            if valores[indice] is not AUSENTE:
+                setattr(aula, nome, valores[indice])
+        for nome in COLUNAS_TEXTO:
+            setattr(aula, nome, self.valor(nome, indice))
+        aula.horario = int(self.horarios[indice])
+        aula.fixa = bool(self.fixas[indice])
+        return aula
+
+    def aulas(self):
+        """Lista de objetos `Aula` independentes (para quem precisa alterá-los)"""
+        return [self.materializar(indice) for indice in range(len(self))]
+
+    def com_fixas(self, linhas, fixa=True):
+        """Nova grade com as `linhas` marcadas (ou desmarcadas) como fixas
+
+        Os vetores de códigos são compartilhados; só a marca é copiada.
+        """
+        grade = copy.copy(self)
+        grade.fixas = self.fixas.copy()
+        grade.fixas[np.asarray(linhas, dtype=np.intp)] = fixa
+        grade._versao = None
+        return grade
+
+    def aulas_fixas(self):
+        """Objetos `Aula` independentes das aulas marcadas como fixas"""
+        return [self.materializar(int(indice)) for indice in np.flatnonzero(self.fixas)]
+
+    def linhas(self, coluna, valor):
+        """Índices das linhas em que a coluna tem o valor"""
+        codigo = self.vocabularios[coluna].codigos.get(valor)
+        if codigo is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.codigos[coluna] == codigo)
+
+    def _chave_ordenacao(self, coluna, linhas):
+        if coluna == "horario":
+            return self.horarios[linhas]
+        codigos = self.codigos[coluna][linhas]
+        if coluna == "dia":
+            return codigos
+        # Posição alfabética de cada código; vazios (-1) vão para o fim
+        valores = self.vocabularios[coluna].valores
+        posicao = np.empty(len(valores) + 1, dtype=np.int32)
+        posicao[np.argsort(np.array(valores, dtype=object), kind="stable")] = np.arange(len(valores))
+        posicao[-1] = len(valores)
+        return posicao[codigos]
+
+    def ordenacao(self, colunas=("turma", "dia", "horario"), linhas=None):
+        """Índices das linhas ordenadas pelas colunas (texto em ordem alfabética)"""
+        if linhas is None:
+            linhas = np.arange(len(self))
+        chaves = [self._chave_ordenacao(coluna, linhas) for coluna in reversed(colunas)]
+        return linhas[np.lexsort(chaves)] if len(linhas) else linhas
+
+    def _categorica(self, coluna, linhas):
+        codigos = self.codigos[coluna] if linhas is None else self.codigos[coluna][linhas]
+        return pd.Categorical.from_codes(codigos, categories=self.vocabularios[coluna].valores)
+
+    def dataframe(self, linhas=None):
+        """DataFrame das aulas (todas ou só `linhas`, na ordem dada)
+
+        As colunas de texto são categóricas montadas sobre os próprios
+        vetores de códigos; nada é convertido de volta para string.
+        """
+        dados = {nome: self._categorica(nome, linhas) for nome in COLUNAS_TEXTO}
+        dados["horario"] = self.horarios if linhas is None else self.horarios[linhas]
+        return pd.DataFrame(dados, columns=list(COLUNAS), copy=False)
+
+    def rotulos_turma_horario(self, formatar, linhas=None):
+        """Coluna categórica com `formatar(turma, horario)` de cada linha
+
+        `formatar` é chamado uma vez por par (turma, horário) distinto;
+        linhas sem turma (código -1) ficam com rótulo vazio.
+        """
+        turmas = self.codigos["turma"] if linhas is None else self.codigos["turma"][linhas]
+        horarios = self.horarios if linhas is None else self.horarios[linhas]
+        pares = np.where(turmas < 0, -1, turmas.astype(np.int64) * 256 + horarios)
+        distintos, codigos = np.unique(pares, return_inverse=True)
+        rotulos = [
+            "" if par < 0 else formatar(self.vocabularios["turma"].valores[par // 256], int(par % 256))
+            for par in distintos.tolist()
+        ]
+        # Rótulos iguais vindos de pares diferentes compartilham a categoria
+        vocabulario = Vocabulario(dict.fromkeys(rotulos))
+        remapear = np.array([vocabulario.codigos[r] for r in rotulos], dtype=np.int32)
+        return pd.Categorical.from_codes(remapear[codigos] if len(codigos) else codigos, categories=vocabulario.valores)
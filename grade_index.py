@@ -0,0 +1,145 @@
+"""
+Índice da grade horária gerada.
+
+Monta uma única vez por grade o acesso direto às aulas por
+(turma, dia, horário), usado pelo calendário, pela lista detalhada
+e pela exportação para Excel, o resumo agregado por professor e a
+grade compacta de cada professor (máscaras de bits 5 dias × 8 horários).
+"""
+
+from disponibilidade import DIAS_CANONICOS, INDICE_DIA, MASCARA_DIA, MASCARA_SEMANA, NUM_HORARIOS, bit_slot
+
+DIAS_ORDENADOS = DIAS_CANONICOS
+ORDEM_DIAS = {dia: i for i, dia in enumerate(DIAS_ORDENADOS)}
+MINUTOS_POR_AULA = 50
+
+
+def chave_ordenacao_aula(aula):
+    """Ordena aulas por turma, dia da semana (segunda..sexta) e horário"""
+    return (aula.turma, ORDEM_DIAS.get(aula.dia, len(DIAS_ORDENADOS)), aula.horario)
+
+
+def chave_dia_horario(aula):
+    """Ordena aulas por dia da semana (segunda..sexta) e horário"""
+    return (ORDEM_DIAS.get(aula.dia, len(DIAS_ORDENADOS)), aula.horario)
+
+
+class ResumoProfessor:
+    """Totais de um professor na grade: aulas, horas, turmas e disciplinas"""
+
+    def __init__(self):
+        self.aulas = []
+        self.turmas = set()
+        self.disciplinas = set()
+
+    @property
+    def total_aulas(self):
+        return len(self.aulas)
+
+    @property
+    def horas(self):
+        return self.total_aulas * MINUTOS_POR_AULA / 60
+
+
+RESUMO_VAZIO = ResumoProfessor()
+
+
+class GradeProfessor:
+    """Grade semanal compacta de um professor
+
+    `ocupacao` e `indisponivel` são máscaras de 40 bits (5 dias × 8 horários);
+    `slots` mapeia a posição do bit para a aula alocada.
+    """
+
+    def __init__(self, aulas, mascara_disponibilidade=MASCARA_SEMANA):
+        self.aulas = aulas
+        self.mascara_disponibilidade = mascara_disponibilidade
+        self.indisponivel = MASCARA_SEMANA & ~mascara_disponibilidade
+        self.ocupacao = 0
+        self.slots = {}
+
+        for aula in aulas:
+            bit = bit_slot(aula.dia, aula.horario)
+            if bit is not None and bit not in self.slots:
+                self.slots[bit] = aula
+                self.ocupacao |= 1 << bit
+
+    def aula_no_slot(self, dia, horario):
+        """Retorna a aula do professor no dia/horário ou None"""
+        bit = bit_slot(dia, horario)
+        return self.slots.get(bit) if bit is not None else None
+
+    def esta_indisponivel(self, dia, horario):
+        """Indica se o professor não pode dar aula no dia/horário"""
+        bit = bit_slot(dia, horario)
+        return bit is not None and bool(self.indisponivel >> bit & 1)
+
+    def aulas_por_dia(self):
+        """Quantidade de horários ocupados em cada dia (segunda..sexta)"""
+        return [
+            (self.ocupacao >> (i * NUM_HORARIOS) & MASCARA_DIA).bit_count()
+            for i in range(len(DIAS_ORDENADOS))
+        ]
+
+
+class IndiceGrade:
+    """Índice (turma, dia, horário) -> aula de uma grade gerada"""
+
+    def __init__(self, aulas):
+        self.aulas = aulas
+        self.por_slot = {}
+        self.por_turma = {}
+        self.resumos = {}
+        self._grades_professores = {}
+
+        # Passagem única: slots, aulas por turma e agregados por professor
+        for aula in aulas:
+            # Mantém a primeira aula encontrada no slot, como a busca linear fazia
+            self.por_slot.setdefault((aula.turma, aula.dia, aula.horario), aula)
+            self.por_turma.setdefault(aula.turma, []).append(aula)
+
+            resumo = self.resumos.get(aula.professor)
+            if resumo is None:
+                resumo = self.resumos[aula.professor] = ResumoProfessor()
+            resumo.aulas.append(aula)
+            resumo.turmas.add(aula.turma)
+            resumo.disciplinas.add(aula.disciplina)
+
+        for aulas_turma in self.por_turma.values():
+            aulas_turma.sort(key=chave_ordenacao_aula)
+        for resumo in self.resumos.values():
+            resumo.aulas.sort(key=chave_dia_horario)
+
+        self.ordenadas = sorted(aulas, key=chave_ordenacao_aula)
+
+    def aula_no_slot(self, turma, dia, horario):
+        """Retorna a aula da turma no dia/horário ou None"""
+        return self.por_slot.get((turma, dia, horario))
+
+    def turmas(self):
+        """Turmas que possuem aulas na grade, em ordem alfabética"""
+        return sorted(self.por_turma)
+
+    def aulas_turma(self, turma):
+        """Aulas da turma ordenadas por dia e horário"""
+        return self.por_turma.get(turma, [])
+
+    def professores(self):
+        """Professores que possuem aulas na grade, em ordem alfabética"""
+        return sorted(self.resumos)
+
+    def resumo_professor(self, professor):
+        """Agregados do professor (vazio se ele não tem aulas na grade)"""
+        return self.resumos.get(professor, RESUMO_VAZIO)
+
+    def aulas_professor(self, professor):
+        """Aulas do professor ordenadas por dia e horário"""
+        return self.resumo_professor(professor).aulas
+
+    def grade_professor(self, professor, mascara_disponibilidade=MASCARA_SEMANA):
+        """Grade compacta do professor, refeita só se a disponibilidade mudar"""
+        grade = self._grades_professores.get(professor)
+        if grade is None or grade.mascara_disponibilidade != mascara_disponibilidade:
+            grade = GradeProfessor(self.aulas_professor(professor), mascara_disponibilidade)
+            self._grades_professores[professor] = grade
+        return grade
@@ -2,7 +2,11 @@ import multiprocessing
 
 # Configurações do Gunicorn
 bind = "0.0.0.0:10000"
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+# Um único processo: as gerações de grade ficam registradas na memória dele e
+# rodam no pool de processos do GerenciadorTarefas (um por núcleo). As threads
+# só atendem as requisições, que respondem na hora (submeter / consultar).
+workers = 1
+worker_class = "gthread"
+threads = multiprocessing.cpu_count() * 2 + 1
 timeout = 120
-keepalive = 5
\ No newline at end of file
+keepalive = 5
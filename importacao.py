@@ -0,0 +1,326 @@
+"""
+Importação em lote de turmas, disciplinas, professores e salas.
+
+Cada arquivo CSV (ou aba de uma planilha .xlsx) traz um tipo de cadastro,
+reconhecido pelo nome do arquivo ou da aba ("turmas.csv", aba
+"Professores", ...). As linhas são lidas em lotes de TAMANHO_LOTE, sem
+carregar o arquivo inteiro, e processadas na ordem das dependências:
+turmas, disciplinas (que citam turmas), professores (que citam
+disciplinas) e salas. As referências são conferidas contra o que já está
+cadastrado mais o que vem no próprio lote de importação.
+
+A importação é tudo ou nada: com qualquer erro, nenhum objeto é criado e
+a lista de erros (arquivo, linha, mensagem) volta para o app.
+"""
+import io
+import re
+import unicodedata
+
+import pandas as pd
+
+from disponibilidade import INDICE_DIA, NUM_HORARIOS, definir_disponibilidade, migrar_formato_antigo
+from models import Turma, Professor, Disciplina, Sala, DIAS_SEMANA
+
+TAMANHO_LOTE = 500  # linhas lidas e validadas de cada vez
+ORDEM_TIPOS = ("turmas", "disciplinas", "professores", "salas")
+PREFIXOS_TIPO = {"turmas": "turma", "disciplinas": "disciplina", "professores": "professor", "salas": "sala"}
+SEPARADOR_LISTA = re.compile(r"[;,|]")
+
+TIPOS_DISCIPLINA = ("pesada", "media", "leve", "pratica")
+TIPOS_SALA = ("normal", "laboratório", "auditório")
+GRUPOS_TURMA = ("A", "B")
+GRUPOS_PROFESSOR = ("A", "B", "AMBOS")
+
+# Nomes de coluna aceitos (já normalizados) -> atributo
+SINONIMOS_COLUNAS = {
+    "carga": "carga_semanal",
+    "aulas_semanais": "carga_semanal",
+    "dias": "disponibilidade",
+    "dias_disponiveis": "disponibilidade",
+    "indisponiveis": "horarios_indisponiveis",
+    "horarios_indisponiveis": "horarios_indisponiveis",
+}
+
+COLUNAS_MODELO = {
+    "turmas": "nome, serie, grupo (A/B), segmento (EF_II/EM, opcional)",
+    "disciplinas": "nome, carga_semanal, tipo, turmas (separadas por ;), grupo, cor_fundo, cor_fonte",
+    "professores": "nome, disciplinas (separadas por ;), grupo (A/B/AMBOS), disponibilidade (ex: seg;ter), "
+                   "horarios_indisponiveis (ex: seg_1;qua_5)",
+    "salas": "nome, capacidade, tipo",
+}
+
+
+class ErroLinha(Exception):
+    """Problema em uma linha; a mensagem vai para o relatório de erros"""
+
+
+class ResultadoImportacao:
+    """Objetos criados por tipo, erros encontrados e linhas lidas"""
+
+    def __init__(self):
+        self.novos = {tipo: [] for tipo in ORDEM_TIPOS}
+        self.erros = []  # (arquivo, linha, mensagem)
+        self.linhas_lidas = 0
+
+    @property
+    def total_novos(self):
+        return sum(len(objetos) for objetos in self.novos.values())
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\W+", "_", texto.strip().lower()).strip("_")
+
+
+def tipo_da_planilha(nome):
+    """Tipo de cadastro pelo nome do arquivo ou da aba (None se não reconhecido)"""
+    nome = _normalizar(re.sub(r"\.(csv|xlsx)$", "", str(nome), flags=re.IGNORECASE))
+    for tipo in ORDEM_TIPOS:
+        if nome.startswith(PREFIXOS_TIPO[tipo]):
+            return tipo
+    return None
+
+
+def _coluna(nome):
+    nome = _normalizar(nome)
+    return SINONIMOS_COLUNAS.get(nome, nome)
+
+
+def _texto(valor):
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _lotes_csv(arquivo):
+    """Linhas do CSV em lotes de (número da linha, {coluna: texto})"""
+    # sep=None detecta vírgula ou ponto e vírgula
+    leitor = pd.read_csv(arquivo, sep=None, engine="python", dtype=str, keep_default_na=False,
+                         chunksize=TAMANHO_LOTE, encoding="utf-8-sig")
+    primeira = 2  # linha 1 é o cabeçalho
+    for bloco in leitor:
+        colunas = [_coluna(c) for c in bloco.columns]
+        yield [
+            (primeira + i, dict(zip(colunas, map(_texto, valores))))
+            for i, valores in enumerate(bloco.itertuples(index=False, name=None))
+        ]
+        primeira += len(bloco)
+
+
+def _lotes_aba(aba):
+    linhas = aba.iter_rows(values_only=True)
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        return
+    colunas = [_coluna(c) if c is not None else "" for c in cabecalho]
+    lote = []
+    for numero, valores in enumerate(linhas, start=2):
+        lote.append((numero, dict(zip(colunas, map(_texto, valores)))))
+        if len(lote) == TAMANHO_LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _fontes(arquivos, resultado):
+    """(tipo, nome da fonte, gerador de lotes) de cada arquivo ou aba reconhecida"""
+    fontes = []
+    for arquivo in arquivos:
+        nome = getattr(arquivo, "name", str(arquivo))
+        if nome.lower().endswith(".xlsx"):
+            from openpyxl import load_workbook  # ImportError sobe para o app avisar
+            pasta = load_workbook(io.BytesIO(arquivo.getvalue()) if hasattr(arquivo, "getvalue") else arquivo,
+                                  read_only=True, data_only=True)
+            for aba in pasta.worksheets:
+                tipo = tipo_da_planilha(aba.title) or tipo_da_planilha(nome)
+                if tipo is None:
+                    resultado.erros.append((f"{nome} / {aba.title}", None, "Aba não reconhecida (use Turmas, Disciplinas, Professores ou Salas)"))
+                else:
+                    fontes.append((tipo, f"{nome} / {aba.title}", _lotes_aba(aba)))
+        else:
+            tipo = tipo_da_planilha(nome)
+            if tipo is None:
+                resultado.erros.append((nome, None, "Arquivo não reconhecido (use turmas.csv, disciplinas.csv, professores.csv ou salas.csv)"))
+            else:
+                fontes.append((tipo, nome, _lotes_csv(arquivo)))
+    return sorted(fontes, key=lambda fonte: ORDEM_TIPOS.index(fonte[0]))
+
+
+def _obrigatorio(linha, coluna):
+    valor = linha.get(coluna, "")
+    if not valor:
+        raise ErroLinha(f"Coluna '{coluna}' vazia")
+    return valor
+
+
+def _opcao(linha, coluna, opcoes, padrao):
+    valor = linha.get(coluna, "") or padrao
+    for opcao in opcoes:
+        if _normalizar(opcao) == _normalizar(valor):
+            return opcao
+    raise ErroLinha(f"{coluna} '{valor}' inválido (use {', '.join(opcoes)})")
+
+
+def _inteiro(linha, coluna, minimo, maximo, padrao=None):
+    valor = linha.get(coluna, "")
+    if not valor:
+        if padrao is None:
+            raise ErroLinha(f"Coluna '{coluna}' vazia")
+        return padrao
+    try:
+        numero = float(valor.replace(",", "."))
+    except ValueError:
+        raise ErroLinha(f"{coluna} '{valor}' não é um número")
+    if not numero.is_integer() or not minimo <= numero <= maximo:
+        raise ErroLinha(f"{coluna} deve ser um inteiro entre {minimo} e {maximo}")
+    return int(numero)
+
+
+def _lista(linha, coluna):
+    return [item.strip() for item in SEPARADOR_LISTA.split(linha.get(coluna, "")) if item.strip()]
+
+
+class _Importador:
+    """Valida as linhas e cria os objetos, guardando os nomes já usados"""
+
+    def __init__(self, turmas, disciplinas, professores, salas):
+        self.nomes_turmas = {t.nome for t in turmas}
+        self.nomes_disciplinas = {d.nome for d in disciplinas}
+        self.disciplinas_grupo = {(d.nome, getattr(d, "grupo", "A")) for d in disciplinas}
+        self.nomes_professores = {p.nome for p in professores}
+        self.nomes_salas = {s.nome for s in salas}
+
+    def _nome_novo(self, linha, existentes, rotulo):
+        nome = _obrigatorio(linha, "nome")
+        if nome in existentes:
+            raise ErroLinha(f"{rotulo} '{nome}' já cadastrada")
+        return nome
+
+    def turma(self, linha):
+        nome = self._nome_novo(linha, self.nomes_turmas, "Turma")
+        serie = _obrigatorio(linha, "serie")
+        grupo = _opcao(linha, "grupo", GRUPOS_TURMA, "A")
+        segmento_padrao = "EM" if "em" in serie.lower() else "EF_II"
+        segmento = _opcao(linha, "segmento", ("EF_II", "EM"), segmento_padrao)
+        self.nomes_turmas.add(nome)
+        return Turma(nome, serie, "manha", grupo, segmento)
+
+    def disciplina(self, linha):
+        nome = _obrigatorio(linha, "nome")
+        grupo = _opcao(linha, "grupo", GRUPOS_TURMA, "A")
+        if (nome, grupo) in self.disciplinas_grupo:
+            raise ErroLinha(f"Disciplina '{nome}' já cadastrada no grupo {grupo}")
+        carga = _inteiro(linha, "carga_semanal", 1, 10)
+        tipo = _opcao(linha, "tipo", TIPOS_DISCIPLINA, "media")
+        turmas = _lista(linha, "turmas")
+        if not turmas:
+            raise ErroLinha("Coluna 'turmas' vazia")
+        desconhecidas = [t for t in turmas if t not in self.nomes_turmas]
+        if desconhecidas:
+            raise ErroLinha(f"Turmas não cadastradas: {', '.join(desconhecidas)}")
+        self.disciplinas_grupo.add((nome, grupo))
+        self.nomes_disciplinas.add(nome)
+        return Disciplina(nome, carga, tipo, turmas, grupo,
+                          linha.get("cor_fundo") or "#4A90E2", linha.get("cor_fonte") or "#FFFFFF")
+
+    def professor(self, linha):
+        nome = self._nome_novo(linha, self.nomes_professores, "Professor(a)")
+        disciplinas = _lista(linha, "disciplinas")
+        if not disciplinas:
+            raise ErroLinha("Coluna 'disciplinas' vazia")
+        desconhecidas = [d for d in disciplinas if d not in self.nomes_disciplinas]
+        if desconhecidas:
+            raise ErroLinha(f"Disciplinas não cadastradas: {', '.join(desconhecidas)}")
+        grupo = _opcao(linha, "grupo", GRUPOS_PROFESSOR, "A")
+
+        dias = [_normalizar(d) for d in _lista(linha, "disponibilidade")] or list(DIAS_SEMANA)
+        dias_invalidos = [d for d in dias if d not in INDICE_DIA]
+        if dias_invalidos:
+            raise ErroLinha(f"Dias inválidos: {', '.join(dias_invalidos)}")
+        indisponiveis = [_normalizar(s) for s in _lista(linha, "horarios_indisponiveis")]
+        for slot in indisponiveis:
+            dia, _, horario = slot.rpartition("_")
+            if dia not in INDICE_DIA or not horario.isdigit() or not 1 <= int(horario) <= NUM_HORARIOS:
+                raise ErroLinha(f"Horário indisponível '{slot}' inválido (use dia_horario, ex: seg_1)")
+
+        professor = Professor(nome, disciplinas, set(), grupo, set())
+        definir_disponibilidade(professor, migrar_formato_antigo(dias, indisponiveis))
+        self.nomes_professores.add(nome)
+        return professor
+
+    def sala(self, linha):
+        nome = self._nome_novo(linha, self.nomes_salas, "Sala")
+        capacidade = _inteiro(linha, "capacidade", 1, 100, padrao=30)
+        tipo = _opcao(linha, "tipo", TIPOS_SALA, "normal")
+        self.nomes_salas.add(nome)
+        return Sala(nome, capacidade, tipo)
+
+
+def _valor_registro(valor):
+    if isinstance(valor, (list, tuple, set)):
+        return ";".join(_texto(item) for item in valor)
+    return _texto(valor)
+
+
+def _lotes_registros(registros):
+    """Registros (dicionários) em lotes no mesmo formato das planilhas"""
+    for inicio in range(0, len(registros), TAMANHO_LOTE):
+        yield [
+            (inicio + i + 1, {_coluna(c): _valor_registro(v) for c, v in registro.items()})
+            for i, registro in enumerate(registros[inicio:inicio + TAMANHO_LOTE])
+        ]
+
+
+def _processar(fontes, resultado, turmas, disciplinas, professores, salas):
+    importador = _Importador(turmas, disciplinas, professores, salas)
+    criar = {
+        "turmas": importador.turma,
+        "disciplinas": importador.disciplina,
+        "professores": importador.professor,
+        "salas": importador.sala,
+    }
+
+    for tipo, fonte, lotes in fontes:
+        for lote in lotes:
+            for numero, linha in lote:
+                if not any(linha.values()):
+                    continue
+                resultado.linhas_lidas += 1
+                try:
+                    resultado.novos[tipo].append(criar[tipo](linha))
+                except ErroLinha as e:
+                    resultado.erros.append((fonte, numero, str(e)))
+
+    if resultado.erros:
+        resultado.novos = {tipo: [] for tipo in ORDEM_TIPOS}
+    return resultado
+
+
+def importar(arquivos, turmas, disciplinas, professores, salas):
+    """Lê e valida os arquivos; devolve um ResultadoImportacao
+
+    Nada é alterado nas listas recebidas: com `resultado.erros` vazio, o
+    chamador inclui `resultado.novos` nos cadastros e grava tudo de uma vez.
+    """
+    resultado = ResultadoImportacao()
+    return _processar(_fontes(arquivos, resultado), resultado, turmas, disciplinas, professores, salas)
+
+
+def importar_dados(dados, turmas=(), disciplinas=(), professores=(), salas=()):
+    """Como `importar`, mas a partir de {tipo: [registros]} (ex: um JSON)
+
+    Os registros usam as mesmas colunas das planilhas; listas (turmas,
+    disciplinas, dias) podem vir como listas ou texto separado por ";".
+    Chaves que não são tipos de cadastro (ex: "nome" da escola) são ignoradas.
+    """
+    resultado = ResultadoImportacao()
+    fontes = []
+    for chave, registros in dados.items():
+        tipo = tipo_da_planilha(chave)
+        if tipo is not None and isinstance(registros, list):
+            fontes.append((tipo, chave, _lotes_registros(registros)))
+    fontes.sort(key=lambda fonte: ORDEM_TIPOS.index(fonte[0]))
+    return _processar(fontes, resultado, turmas, disciplinas, professores, salas)
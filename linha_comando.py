@@ -0,0 +1,294 @@
+"""
+Geração de grades pela linha de comando, sem o Streamlit.
+
+Exemplos:
+
+    python linha_comando.py escola.json -a ortools --tempo-limite 120 -o grade.xlsx
+    python linha_comando.py --banco -f csv -o grade.csv
+    python linha_comando.py campi/ -a portfolio -f json -o grades/ --processos 4
+    python linha_comando.py campi.jsonl -o grades/
+    python linha_comando.py escola.json -a ortools-dica --comparar-partida
+
+A escola vem de um JSON no formato {"nome": ..., "turmas": [...],
+"disciplinas": [...], "professores": [...], "salas": [...]}, com as mesmas
+colunas da importação de planilhas (ver importacao.COLUNAS_MODELO), ou do
+banco do app (--banco), lido pelo módulo database como o app lê. Um diretório (todos os *.json) ou um
+arquivo .jsonl (uma escola por linha) geram várias grades, resolvidas em
+paralelo, uma por processo; nesse caso a saída é um diretório com um
+arquivo por escola. Com --banco, as aulas fixadas no calendário do app
+ficam no lugar.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import exportacao
+import importacao
+from decomposicao import gerar_aulas_decompostas
+from geracao import (
+    ALGORITMO_ORTOOLS, ALGORITMO_ORTOOLS_DICA, ALGORITMO_PORTFOLIO, ALGORITMO_SIMPLES, gerar_aulas
+)
+from grade_colunar import COLUNAS, GradeColunar
+from persistencia import TIPOS_CADASTRO
+from portfolio import aulas_necessarias
+from qualidade import avaliar_grade
+from tarefas import CONCLUIDA, GerenciadorTarefas
+from validacao import CONFLITO_PROFESSOR, validar_grade
+
+ALGORITMOS_CLI = {
+    "simples": ALGORITMO_SIMPLES,
+    "ortools": ALGORITMO_ORTOOLS,
+    "ortools-dica": ALGORITMO_ORTOOLS_DICA,
+    "portfolio": ALGORITMO_PORTFOLIO,
+}
+FORMATOS = ("json", "csv", "xlsx")
+MARGEM_TEMPO_LIMITE = 30  # segundos além do --tempo-limite antes de encerrar o processo
+INTERVALO_ACOMPANHAMENTO = 0.2
+
+
+class ErroEscola(Exception):
+    """Escola que não pôde ser lida ou validada"""
+
+
+def carregar_json(dados, nome):
+    """Escola (nome, {tipo: [objetos]}) a partir do dicionário lido do JSON"""
+    resultado = importacao.importar_dados(dados)
+    if resultado.erros:
+        erros = "; ".join(
+            f"{fonte} #{linha}: {mensagem}" if linha else f"{fonte}: {mensagem}"
+            for fonte, linha, mensagem in resultado.erros[:10]
+        )
+        raise ErroEscola(f"{len(resultado.erros)} erro(s): {erros}")
+    return dados.get("nome") or nome, resultado.novos
+
+
+def carregar_banco():
+    """Escola do banco do app, carregada como o app carrega, com as aulas fixas da grade publicada"""
+    import streamlit as st
+    from session_state import init_session_state
+
+    try:
+        init_session_state()
+    except Exception as e:
+        raise ErroEscola(f"O banco do app não pôde ser lido: {e}")
+    colecoes = {tipo: list(st.session_state.get(tipo) or []) for tipo in TIPOS_CADASTRO}
+    if not any(colecoes.values()):
+        raise ErroEscola("Nenhum cadastro gravado no banco do app")
+    aulas = st.session_state.get("aulas") or []
+    if not isinstance(aulas, GradeColunar):
+        aulas = GradeColunar(aulas)
+    colecoes["fixas"] = aulas.aulas_fixas()
+    return "banco", colecoes
+
+
+def carregar_entrada(entrada):
+    """Lista de (nome, escola ou ErroEscola) a partir de um arquivo, .jsonl ou diretório"""
+    escolas = []
+
+    def adicionar(nome, ler):
+        try:
+            escolas.append(carregar_json(ler(), nome))
+        except (ErroEscola, ValueError, OSError) as e:
+            escolas.append((nome, ErroEscola(str(e))))
+
+    if os.path.isdir(entrada):
+        for arquivo in sorted(os.listdir(entrada)):
+            if arquivo.lower().endswith(".json"):
+                caminho = os.path.join(entrada, arquivo)
+                adicionar(os.path.splitext(arquivo)[0], lambda c=caminho: _ler_json(c))
+    elif entrada.lower().endswith(".jsonl"):
+        with open(entrada, encoding="utf-8") as arquivo:
+            for numero, linha in enumerate(arquivo, start=1):
+                if linha.strip():
+                    adicionar(f"escola_{numero}", lambda l=linha: json.loads(l))
+    else:
+        adicionar(os.path.splitext(os.path.basename(entrada))[0], lambda: _ler_json(entrada))
+    return escolas
+
+
+def _ler_json(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gerar_escola(escola, algoritmo, tempo_limite=None, semente=None, decompor=False, fixas=None,
+                 comparar_partida=False):
+    """Processo filho: gera a grade de uma escola e devolve aulas e estatísticas"""
+    inicio = time.time()
+    turmas, professores = escola["turmas"], escola["professores"]
+    disciplinas, salas = escola["disciplinas"], escola["salas"]
+    funcao = gerar_aulas_decompostas if decompor else gerar_aulas
+    aulas, metodo, aviso = funcao(
+        algoritmo, turmas, professores, disciplinas, salas,
+        tempo_limite=tempo_limite, semente=semente, fixas=fixas, comparar_partida=comparar_partida
+    )
+    validacao = validar_grade(aulas, turmas, professores, disciplinas)
+    qualidade = avaliar_grade(aulas, turmas, professores, disciplinas, salas)
+    estatisticas = {
+        "Método": metodo,
+        "Turmas": len(turmas),
+        "Professores": len(professores),
+        "Disciplinas": len(disciplinas),
+        "Aulas alocadas": len(aulas),
+        "Aulas necessárias": aulas_necessarias(turmas, disciplinas),
+        "Conflitos de professor": validacao.contagem(CONFLITO_PROFESSOR),
+        "Problemas de validação": validacao.contagem(),
+        "Penalidade de qualidade": round(qualidade.penalidade),
+        **qualidade.rotuladas(),
+        "Tempo (s)": round(time.time() - inicio, 2),
+    }
+    if aviso:
+        estatisticas["Aviso"] = aviso
+    return list(aulas), estatisticas
+
+
+def grade_em_dicionario(nome, aulas, estatisticas):
+    """Escola, estatísticas e aulas (ordenadas por turma, dia e horário) prontas para JSON"""
+    grade = GradeColunar(aulas)
+    return {
+        "escola": nome,
+        "estatisticas": estatisticas,
+        "aulas": [{coluna: getattr(grade[int(i)], coluna) for coluna in COLUNAS} for i in grade.ordenacao()],
+    }
+
+
+def escrever_saida(caminho, formato, nome, aulas, estatisticas):
+    """Grava aulas (ordenadas por turma, dia e horário) e estatísticas"""
+    if formato == "json":
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(grade_em_dicionario(nome, aulas, estatisticas), arquivo, ensure_ascii=False, indent=2)
+        return
+    grade = GradeColunar(aulas)
+    ordem = grade.ordenacao()
+    if formato == "csv":
+        grade.dataframe(ordem).to_csv(caminho, index=False)
+    else:
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(exportacao.exportar_grade(grade.dataframe(ordem), list(estatisticas.items())))
+
+
+def _formato(args):
+    if args.formato:
+        return args.formato
+    extensao = os.path.splitext(args.saida or "")[1].lstrip(".").lower()
+    return extensao if extensao in FORMATOS else "json"
+
+
+def _caminhos_saida(args, nomes, formato):
+    """Arquivo de saída de cada escola (diretório quando há mais de uma)"""
+    em_lote = len(nomes) > 1 or (args.entrada and (os.path.isdir(args.entrada) or args.entrada.endswith(".jsonl")))
+    if not em_lote:
+        return {nomes[0]: args.saida or f"grade.{formato}"}
+    diretorio = args.saida or "grades"
+    os.makedirs(diretorio, exist_ok=True)
+    return {nome: os.path.join(diretorio, f"{nome}.{formato}") for nome in nomes}
+
+
+def executar(args):
+    """Gera todas as escolas pedidas; devolve o código de saída do processo"""
+    if args.banco:
+        try:
+            escolas = [carregar_banco()]
+        except ErroEscola as e:
+            escolas = [("banco", e)]
+    else:
+        escolas = carregar_entrada(args.entrada)
+    if not escolas:
+        print(f"❌ Nenhuma escola encontrada em {args.entrada}", file=sys.stderr)
+        return 1
+    # Nomes repetidos (ex: dois JSONs com o mesmo "nome") ganham sufixo
+    vistos = {}
+    for i, (nome, escola) in enumerate(escolas):
+        vistos[nome] = vistos.get(nome, 0) + 1
+        if vistos[nome] > 1:
+            escolas[i] = (f"{nome}_{vistos[nome]}", escola)
+
+    formato = _formato(args)
+    algoritmo = ALGORITMOS_CLI[args.algoritmo]
+    caminhos = _caminhos_saida(args, [nome for nome, _ in escolas], formato)
+    limite_processo = args.tempo_limite + MARGEM_TEMPO_LIMITE if args.tempo_limite else None
+
+    gerenciador = GerenciadorTarefas(max_processos=args.processos)
+    tarefas = {}
+    falhas = 0
+    for nome, escola in escolas:
+        if isinstance(escola, ErroEscola):
+            print(f"❌ {nome}: {escola}", file=sys.stderr)
+            falhas += 1
+            continue
+        tarefas[nome] = gerenciador.submeter(
+            gerar_escola,
+            args=({tipo: escola.get(tipo, []) for tipo in TIPOS_CADASTRO}, algoritmo),
+            kwargs={"tempo_limite": args.tempo_limite, "semente": args.semente, "decompor": args.decompor,
+                    "fixas": escola.get("fixas"), "comparar_partida": args.comparar_partida},
+            limite=limite_processo
+        )
+
+    try:
+        while tarefas:
+            for nome, id_tarefa in list(tarefas.items()):
+                tarefa = gerenciador.status(id_tarefa)
+                if not tarefa.finalizada:
+                    continue
+                del tarefas[nome]
+                if tarefa.estado != CONCLUIDA:
+                    print(f"❌ {nome}: {(tarefa.erro or tarefa.estado).splitlines()[0]}", file=sys.stderr)
+                    falhas += 1
+                    continue
+                aulas, estatisticas = tarefa.resultado
+                escrever_saida(caminhos[nome], formato, nome, aulas, estatisticas)
+                print(
+                    f"✅ {nome}: {estatisticas['Aulas alocadas']}/{estatisticas['Aulas necessárias']} aulas "
+                    f"({estatisticas['Método']}, {estatisticas['Tempo (s)']}s) → {caminhos[nome]}"
+                )
+                if estatisticas.get("Aviso"):
+                    print(f"   {estatisticas['Aviso']}", file=sys.stderr)
+            time.sleep(INTERVALO_ACOMPANHAMENTO)
+    except KeyboardInterrupt:
+        gerenciador.encerrar_todas()
+        raise
+    return 1 if falhas else 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Gera grades horárias sem o Streamlit (uma escola ou várias em paralelo)."
+    )
+    parser.add_argument("entrada", nargs="?",
+                        help="Escola em .json, várias escolas em .jsonl ou um diretório de .json")
+    parser.add_argument("--banco", action="store_true",
+                        help="Ler a escola do banco do app (módulo database)")
+    parser.add_argument("-a", "--algoritmo", choices=sorted(ALGORITMOS_CLI), default="simples")
+    parser.add_argument("--tempo-limite", type=float,
+                        help="Segundos para o CP-SAT do OR-Tools (devolve a melhor grade achada) "
+                             "/ orçamento do portfólio")
+    parser.add_argument("--semente", type=int, help="Semente do algoritmo simples e do portfólio")
+    parser.add_argument("--comparar-partida", action="store_true",
+                        help="Com -a ortools-dica, roda o OR-Tools também sem dica e mostra o ganho")
+    parser.add_argument("--decompor", action="store_true",
+                        help="Resolver componentes independentes em paralelo")
+    parser.add_argument("-f", "--formato", choices=FORMATOS, help="Padrão: extensão de --saida, ou json")
+    parser.add_argument("-o", "--saida", help="Arquivo (uma escola) ou diretório (várias)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Escolas resolvidas ao mesmo tempo (padrão: número de núcleos)")
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if bool(args.entrada) == bool(args.banco):
+        parser.error("informe um arquivo/diretório de entrada ou --banco (um dos dois)")
+    if args.tempo_limite is not None and args.tempo_limite <= 0:
+        parser.error("--tempo-limite deve ser maior que zero")
+    if args.tempo_limite is not None and args.algoritmo == "simples":
+        print("⚠️ --tempo-limite não vale para o algoritmo simples; ignorado.", file=sys.stderr)
+    if args.comparar_partida and args.algoritmo != "ortools-dica":
+        print("⚠️ --comparar-partida só vale para -a ortools-dica; ignorado.", file=sys.stderr)
+    return executar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
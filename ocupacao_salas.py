@@ -0,0 +1,98 @@
+"""
+Ocupação das salas por horário e escolha de uma sala livre do tipo certo.
+
+Disciplinas práticas vão para o laboratório; as demais para salas
+normais ou o auditório (ver SALAS_ADEQUADAS). Usado onde aulas geradas
+separadamente precisam dividir as mesmas salas: a união das partes da
+geração decomposta, a geração de uma turma só e as aulas fixas.
+"""
+
+SALAS_ADEQUADAS = {"pratica": ("laboratório",)}  # tipo de disciplina -> tipos de sala
+SALAS_PADRAO = ("normal", "auditório")
+
+
+def tipos_sala(tipo_disciplina):
+    """Tipos de sala adequados para uma disciplina do tipo dado"""
+    return SALAS_ADEQUADAS.get(tipo_disciplina, SALAS_PADRAO)
+
+
+class OcupacaoSalas:
+    """Salas ocupadas em cada (dia, horário), com escolha de sala livre"""
+
+    def __init__(self, salas, disciplinas=(), aulas=()):
+        self.salas = list(salas)
+        self.tipo_sala = {s.nome: getattr(s, "tipo", None) for s in self.salas}
+        self.tipo_disciplina = {}
+        for disc in disciplinas:
+            self.tipo_disciplina.setdefault(disc.nome, getattr(disc, "tipo", None))
+        self.ocupadas = {}  # (sala, dia, horario) -> aula
+        for aula in aulas:
+            self.ocupar(aula)
+
+    def livre(self, sala, dia, horario):
+        return (sala, dia, horario) not in self.ocupadas
+
+    def ocupar(self, aula):
+        """Marca a sala da aula no horário dela; False se já estava ocupada"""
+        if not aula.sala:
+            return True
+        chave = (aula.sala, aula.dia, aula.horario)
+        if chave in self.ocupadas:
+            return False
+        self.ocupadas[chave] = aula
+        return True
+
+    def adequadas(self, disciplina):
+        """Salas do tipo certo para a disciplina; todas, se nenhuma cadastrada for desse tipo"""
+        tipos = tipos_sala(self.tipo_disciplina.get(disciplina))
+        nomes = [s.nome for s in self.salas if self.tipo_sala[s.nome] in tipos]
+        return nomes or [s.nome for s in self.salas]
+
+    def escolher(self, disciplina, dia, horario, preferida=None, so_adequadas=False):
+        """Nome de uma sala livre e adequada à disciplina no horário, ou None
+
+        A `preferida` vale se estiver livre e for adequada; senão vale a
+        primeira adequada cadastrada. Sem sala adequada livre, qualquer sala
+        livre serve (a qualidade conta a sala inadequada), a não ser com
+        `so_adequadas`.
+        """
+        candidatas = self.adequadas(disciplina)
+        if preferida in candidatas:
+            candidatas.insert(0, preferida)
+        if not so_adequadas:
+            candidatas += [s.nome for s in self.salas]
+        return next((nome for nome in candidatas if self.livre(nome, dia, horario)), None)
+
+
+def conflitos_salas(aulas):
+    """Lista (sala, dia, horário) com mais de uma aula (aulas sem sala não contam)"""
+    vistos = set()
+    conflitos = []
+    for aula in aulas:
+        if not aula.sala:
+            continue
+        slot = (aula.sala, aula.dia, aula.horario)
+        if slot in vistos:
+            conflitos.append(slot)
+        else:
+            vistos.add(slot)
+    return conflitos
+
+
+def realocar_salas(aulas, salas, disciplinas):
+    """Muda de sala as aulas que caíram numa sala já ocupada no mesmo horário
+
+    Cada aula em colisão vai para uma sala livre e adequada à disciplina
+    no mesmo horário. Retorna quantas aulas mudaram de sala; as que não
+    acharam sala livre continuam em conflito.
+    """
+    ocupacao = OcupacaoSalas(salas, disciplinas)
+    colidindo = [aula for aula in aulas if not ocupacao.ocupar(aula)]
+    realocadas = 0
+    for aula in colidindo:
+        sala = ocupacao.escolher(aula.disciplina, aula.dia, aula.horario)
+        if sala is not None:
+            aula.sala = sala
+            ocupacao.ocupar(aula)
+            realocadas += 1
+    return realocadas
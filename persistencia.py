@@ -0,0 +1,130 @@
+"""
+Gravação dos cadastros e da grade com rastreamento de alterações.
+
+O módulo `database` continua sendo a fonte da verdade: tudo é gravado por
+`auto_save.salvar_tudo()`, que é a única forma de escrita que ele oferece.
+O que muda é quando: em vez de gravar a escola inteira a cada edição,
+antes do `st.rerun()`, o app avisa o que mudou (`alterado`, `removido`,
+`grade_alterada`) e segue. Avisos que não mudam nada (formulário enviado
+sem edição) são descartados pela impressão digital do objeto. As edições
+feitas em sequência dentro de ATRASO_GRAVACAO segundos viram uma única
+chamada a `salvar_tudo()`, feita por um fragmento do app que roda a cada
+ATRASO_GRAVACAO segundos (`vencido()` / `descarregar()`); `descarregar()`
+também grava na hora, ao publicar uma grade.
+
+Cada sessão tem o seu Persistidor: `salvar_tudo()` grava o estado da
+sessão, e por isso precisa rodar na thread do script dela.
+"""
+import hashlib
+import pickle
+import time
+
+ATRASO_GRAVACAO = 1.0  # segundos entre a primeira alteração pendente e a gravação
+TIPOS_CADASTRO = ("turmas", "professores", "disciplinas", "salas")
+
+
+def _chave(tipo, objeto):
+    id_ = getattr(objeto, "id", None)
+    return tipo, str(objeto.nome if id_ is None else id_)
+
+
+def _impressao(objeto):
+    return hashlib.sha1(pickle.dumps(objeto)).digest()
+
+
+class Persistidor:
+    """Alterações pendentes de uma sessão, gravadas juntas por `salvar`"""
+
+    def __init__(self, salvar, atraso=ATRASO_GRAVACAO):
+        self.salvar = salvar
+        self.atraso = atraso
+        self._pendentes = set()  # (tipo, id) alterados desde a última gravação; ("grade", None) para a grade
+        self._impressoes = {}  # (tipo, id) -> impressão da última versão avisada
+        self._versao_grade = None
+        self._desde = None  # instante da primeira alteração pendente
+        self.ultimo_erro = None
+        self.gravacoes = 0
+        self.alteracoes_gravadas = 0
+
+    # Avisos do app
+
+    def conhecer(self, colecoes, aulas=None):
+        """Registra o estado carregado do banco, sem marcar nada para gravar
+
+        `colecoes` mapeia tipo -> lista de objetos (ver TIPOS_CADASTRO).
+        """
+        for tipo, objetos in colecoes.items():
+            for objeto in objetos:
+                self._impressoes[_chave(tipo, objeto)] = _impressao(objeto)
+        if aulas is not None:
+            self._versao_grade = aulas.versao()
+
+    def alterado(self, tipo, objeto):
+        """Objeto incluído ou editado; só fica pendente se o conteúdo mudou"""
+        chave = _chave(tipo, objeto)
+        impressao = _impressao(objeto)
+        if self._impressoes.get(chave) == impressao:
+            return
+        self._impressoes[chave] = impressao
+        self._marcar(chave)
+
+    def removido(self, tipo, objeto):
+        chave = _chave(tipo, objeto)
+        self._impressoes.pop(chave, None)
+        self._marcar(chave)
+
+    def grade_alterada(self, aulas):
+        """Grade publicada (GradeColunar)"""
+        versao = aulas.versao()
+        if versao == self._versao_grade:
+            return
+        self._versao_grade = versao
+        self._marcar(("grade", None))
+
+    def _marcar(self, chave):
+        if not self._pendentes:
+            self._desde = time.monotonic()
+        self._pendentes.add(chave)
+
+    # Gravação
+
+    def pendente(self):
+        return bool(self._pendentes)
+
+    def vencido(self):
+        """Há alterações pendentes há pelo menos `atraso` segundos"""
+        return bool(self._pendentes) and time.monotonic() - self._desde >= self.atraso
+
+    def descartar(self):
+        """Esquece as alterações pendentes (ex: o banco foi resetado); nada é apagado"""
+        self._pendentes.clear()
+        self._impressoes.clear()
+        self._versao_grade = None
+        self._desde = None
+        self.ultimo_erro = None
+
+    def descarregar(self, forcar=False):
+        """Grava agora, com uma chamada a `salvar`, tudo que estiver pendente; True se deu certo
+
+        Com `forcar`, grava mesmo sem nada pendente (botão "Salvar Tudo").
+        """
+        if not self._pendentes and not forcar:
+            return True
+        try:
+            gravado = self.salvar()
+        except Exception as e:
+            gravado, self.ultimo_erro = False, str(e)
+        else:
+            if not gravado:
+                self.ultimo_erro = "salvar_tudo() não gravou os dados"
+        if not gravado:
+            # Continua pendente: a próxima tentativa espera outro intervalo
+            self._desde = time.monotonic()
+            return False
+
+        self.ultimo_erro = None
+        self.gravacoes += 1
+        self.alteracoes_gravadas += len(self._pendentes)
+        self._pendentes.clear()
+        self._desde = None
+        return True
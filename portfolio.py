@@ -0,0 +1,149 @@
+"""
+Portfólio de algoritmos: OR-Tools e várias execuções do algoritmo simples
+com sementes diferentes correm em paralelo dentro do mesmo orçamento de
+tempo, e a melhor grade completa é escolhida. Entre grades completas e
+sem conflito, desempata a penalidade de qualidade (ver qualidade.py).
+"""
+import multiprocessing
+import os
+import random
+import time
+
+from geracao import gerar_ortools, gerar_simples, marcar_processo_dedicado
+from qualidade import Pontuador
+import tarefas
+
+ORCAMENTO_PADRAO = 60  # segundos de relógio para todo o portfólio
+MARGEM_ORTOOLS = 5  # segundos antes do fim do orçamento para o CP-SAT parar e devolver a grade
+INTERVALO_ESPERA = 0.1
+
+
+def aulas_necessarias(turmas, disciplinas):
+    """Total de aulas semanais exigidas pelas disciplinas das turmas"""
+    nomes = {t.nome for t in turmas}
+    return sum(d.carga_semanal * len(nomes.intersection(d.turmas)) for d in disciplinas)
+
+
+def pontuar_grade(aulas, necessarias, pontuador=None):
+    """Pontuação comparável entre grades (maior é melhor)
+
+    Prioriza grades completas, depois sem conflitos de professor, depois
+    mais aulas alocadas e, com um `pontuador`, menor penalidade de qualidade.
+    """
+    slots = set()
+    conflitos = 0
+    for aula in aulas:
+        slot = (aula.professor, aula.dia, aula.horario)
+        if slot in slots:
+            conflitos += 1
+        slots.add(slot)
+    penalidade = pontuador.pontuar(aulas).penalidade if pontuador is not None else 0
+    return (len(aulas) >= necessarias, -conflitos, len(aulas), -penalidade)
+
+
+def _executar_estrategia(conexao, estrategia, semente, prazo, turmas, professores, disciplinas, salas):
+    """Processo filho: roda uma estratégia e devolve as aulas pelo pipe"""
+    marcar_processo_dedicado()
+    try:
+        if estrategia == "ortools":
+            # O CP-SAT para antes do prazo com a melhor solução viável, a tempo de enviá-la
+            restante = prazo - time.time()
+            tempo_limite = max(1.0, restante / 2, restante - MARGEM_ORTOOLS)
+            aulas = gerar_ortools(turmas, professores, disciplinas, tempo_limite=tempo_limite)
+        else:
+            # Semente diferente e ordem de entrada embaralhada diversificam o guloso
+            rng = random.Random(semente)
+            turmas, professores, disciplinas = list(turmas), list(professores), list(disciplinas)
+            rng.shuffle(turmas)
+            rng.shuffle(professores)
+            rng.shuffle(disciplinas)
+            aulas = gerar_simples(turmas, professores, disciplinas, salas, semente)
+        conexao.send(("ok", aulas))
+    except Exception as e:
+        conexao.send(("erro", str(e)))
+    finally:
+        conexao.close()
+
+
+def gerar_aulas_portfolio(turmas, professores, disciplinas, salas,
+                          num_sementes=None, orcamento=ORCAMENTO_PADRAO, semente_base=0):
+    """Corre OR-Tools contra `num_sementes` execuções do algoritmo simples
+
+    Retorna (aulas, metodo, aviso) como `geracao.gerar_aulas`. Estratégias
+    que não terminam dentro de `orcamento` segundos são encerradas; o
+    OR-Tools recebe o que resta do orçamento (menos MARGEM_ORTOOLS) como
+    tempo limite e devolve a melhor grade que achou até ali.
+    """
+    if num_sementes is None:
+        num_sementes = max(1, (os.cpu_count() or 2) - 1)
+
+    estrategias = [("ortools", None)] + [("simples", semente_base + i) for i in range(num_sementes)]
+    contexto = multiprocessing.get_context("spawn")
+    necessarias = aulas_necessarias(turmas, disciplinas)
+    pontuador = Pontuador(turmas, professores, disciplinas, salas)
+    limite = time.time() + orcamento
+
+    em_execucao = {}
+    for estrategia, semente in estrategias:
+        pai, filho = contexto.Pipe(duplex=False)
+        processo = contexto.Process(
+            target=_executar_estrategia,
+            args=(filho, estrategia, semente, limite, turmas, professores, disciplinas, salas)
+        )
+        processo.start()
+        filho.close()
+        em_execucao[(estrategia, semente)] = (processo, pai)
+
+    melhor = None  # (pontuacao, aulas, nome)
+    falhas = []
+    encerrado_cedo = False
+    try:
+        while em_execucao and time.time() < limite:
+            for chave, (processo, conexao) in list(em_execucao.items()):
+                if not conexao.poll():
+                    if not processo.is_alive():
+                        falhas.append(f"{chave[0]}: processo encerrado sem resultado")
+                        del em_execucao[chave]
+                    continue
+                try:
+                    tipo, valor = conexao.recv()
+                except EOFError:
+                    tipo, valor = "erro", "processo encerrado sem resultado"
+                processo.join(timeout=5)
+                del em_execucao[chave]
+
+                estrategia, semente = chave
+                if tipo == "erro":
+                    falhas.append(f"{estrategia}: {valor}")
+                    continue
+                nome = "Google OR-Tools" if estrategia == "ortools" else f"Algoritmo Simples (semente {semente})"
+                pontuacao = pontuar_grade(valor, necessarias, pontuador)
+                if melhor is None or pontuacao > melhor[0]:
+                    melhor = (pontuacao, valor, nome)
+                    tarefas.reportar_progresso(len(valor))
+            # Grade completa e sem conflito: só a qualidade ainda pode melhorar. Espera as
+            # sementes do simples (rápidas) para comparar, mas não o OR-Tools
+            if (melhor is not None and melhor[0][:3] >= (True, 0, necessarias)
+                    and not any(estrategia == "simples" for estrategia, _ in em_execucao)):
+                encerrado_cedo = True
+                break
+            time.sleep(INTERVALO_ESPERA)
+    finally:
+        for processo, conexao in em_execucao.values():
+            processo.terminate()
+            processo.join(timeout=5)
+            conexao.close()
+
+    avisos = []
+    if em_execucao and not encerrado_cedo:
+        avisos.append(f"⏱️ {len(em_execucao)} estratégia(s) interrompida(s) no limite de {orcamento}s.")
+    if falhas:
+        avisos.append("⚠️ Falhas no portfólio: " + "; ".join(falhas))
+
+    if melhor is None:
+        raise RuntimeError("Nenhuma estratégia do portfólio produziu grade. " + " ".join(avisos))
+
+    (completa, _, _, _), aulas, nome = melhor
+    if not completa:
+        avisos.append(f"⚠️ Nenhuma grade completa: melhor resultado alocou {len(aulas)}/{necessarias} aulas.")
+    return aulas, f"Portfólio → {nome}", "\n".join(avisos) or None
@@ -0,0 +1,188 @@
+"""
+Pontuação de qualidade de grades sobre tensores de ocupação.
+
+As aulas viram vetores de índices (turma, professor, disciplina, sala,
+dia, horário) e as ocupações turma × dia × horário e professor × dia ×
+horário são montadas com `np.bincount`, sem laço por aula. Métricas
+(todas penalidades, menor é melhor):
+
+- janelas: horários vagos de um professor entre a primeira e a última
+  aula do dia (o intervalo do segmento em que ele deu aula não conta);
+- dias_professor: soma dos dias com aula de cada professor;
+- pesadas_seguidas: aulas de disciplinas "pesada" em horários colados;
+- pesadas_excesso: pesadas além de LIMITE_PESADAS_DIA no dia da turma;
+- repeticoes: aulas repetidas da mesma disciplina no dia que a carga
+  não obriga (ex: 3 aulas em 2 dias, quando cabiam em 3);
+- sala_inadequada: aula em sala de tipo errado (prática fora do
+  laboratório, teórica ocupando laboratório).
+
+`Pontuador.pontuar_lote` aceita vetores com uma dimensão de lote na
+frente (candidatos × aulas) e pontua milhares de grades por segundo; o
+portfólio, a interface e a linha de comando usam a mesma `penalidade`.
+"""
+import numpy as np
+
+from disponibilidade import NUM_HORARIOS
+from grade_colunar import GradeColunar, Vocabulario
+from grade_index import DIAS_ORDENADOS
+from ocupacao_salas import tipos_sala
+from viabilidade import INTERVALO_SEGMENTO, segmento_turma
+
+LIMITE_PESADAS_DIA = 2
+SEGMENTOS = tuple(INTERVALO_SEGMENTO)
+
+# nome -> (rótulo, peso na penalidade)
+METRICAS = {
+    "janelas": ("Janelas de professores", 3.0),
+    "dias_professor": ("Dias de aula (professores)", 1.0),
+    "pesadas_seguidas": ("Pesadas em sequência", 2.0),
+    "pesadas_excesso": (f"Pesadas além de {LIMITE_PESADAS_DIA}/dia", 2.0),
+    "repeticoes": ("Repetições evitáveis no dia", 2.0),
+    "sala_inadequada": ("Sala de tipo inadequado", 1.0),
+}
+
+
+class QualidadeGrade:
+    """Métricas de uma grade e a penalidade ponderada (menor é melhor)"""
+
+    def __init__(self, metricas, professores_com_aula):
+        self.metricas = metricas
+        self.professores_com_aula = professores_com_aula
+        self.penalidade = sum(METRICAS[nome][1] * valor for nome, valor in metricas.items())
+
+    @property
+    def dias_por_professor(self):
+        return self.metricas["dias_professor"] / max(1, self.professores_com_aula)
+
+    def rotuladas(self):
+        """{rótulo: valor}, na ordem de METRICAS"""
+        return {METRICAS[nome][0]: valor for nome, valor in self.metricas.items()}
+
+
+class Pontuador:
+    """Tabelas dos cadastros prontas para pontuar grades em lote"""
+
+    def __init__(self, turmas, professores, disciplinas, salas=()):
+        self.turmas = Vocabulario(t.nome for t in turmas)
+        self.professores = Vocabulario(p.nome for p in professores)
+        self.disciplinas = Vocabulario(d.nome for d in disciplinas)
+        self.salas = Vocabulario(s.nome for s in salas)
+
+        # Tabelas por índice têm uma posição extra no fim: o índice -1 (fora dos cadastros) cai nela
+        self.segmento = np.zeros(len(self.turmas.valores) + 1, dtype=np.intp)
+        for turma in turmas:
+            self.segmento[self.turmas.codigos[turma.nome]] = SEGMENTOS.index(segmento_turma(turma))
+        self.intervalo = np.zeros((len(SEGMENTOS), NUM_HORARIOS), dtype=bool)
+        for i, segmento in enumerate(SEGMENTOS):
+            self.intervalo[i, INTERVALO_SEGMENTO[segmento] - 1] = True
+
+        tipos_disc = {}
+        for disc in disciplinas:
+            tipos_disc.setdefault(disc.nome, getattr(disc, "tipo", None))
+        self.pesada = np.array([tipos_disc[nome] == "pesada" for nome in self.disciplinas.valores] + [False])
+        tipo_de_sala = {s.nome: getattr(s, "tipo", None) for s in salas}
+        self.adequada = np.zeros((len(self.disciplinas.valores) + 1, len(self.salas.valores) + 1), dtype=bool)
+        for i, disc in enumerate(self.disciplinas.valores):
+            permitidas = tipos_sala(tipos_disc[disc])
+            for j, sala in enumerate(self.salas.valores):
+                self.adequada[i, j] = tipo_de_sala[sala] in permitidas
+
+    def codigos(self, aulas):
+        """Vetores (turma, professor, disciplina, sala, dia, horario) de uma grade
+
+        Nomes fora dos cadastros viram -1 e a aula fica fora das métricas
+        que dependem deles.
+        """
+        grade = aulas if isinstance(aulas, GradeColunar) else GradeColunar(aulas)
+        vetores = []
+        for coluna, vocabulario in (("turma", self.turmas), ("professor", self.professores),
+                                    ("disciplina", self.disciplinas), ("sala", self.salas)):
+            # Código da grade -> índice do pontuador; a última posição atende o -1 (vazio)
+            mapa = np.array(
+                [vocabulario.codigos.get(valor, -1) for valor in grade.vocabularios[coluna].valores] + [-1],
+                dtype=np.intp
+            )
+            vetores.append(mapa[grade.codigos[coluna]])
+        vetores.append(grade.codigos["dia"].astype(np.intp))
+        vetores.append(grade.horarios.astype(np.intp))
+        return tuple(vetores)
+
+    @staticmethod
+    def _ocupacao(lote, indices, tamanhos, valido):
+        """Tensor (candidato, *tamanhos) com as aulas contadas por bincount"""
+        plano = lote
+        for indice, tamanho in zip(indices, tamanhos):
+            plano = plano * tamanho + indice
+        contagem = np.bincount(plano[valido], minlength=lote.shape[0] * int(np.prod(tamanhos)))
+        return contagem.reshape((lote.shape[0],) + tuple(tamanhos))
+
+    def pontuar_lote(self, turma, professor, disciplina, sala, dia, horario):
+        """Métricas de várias grades de uma vez
+
+        Cada argumento tem forma (candidatos, aulas) ou (aulas,). Retorna
+        {métrica: vetor por candidato}, mais "penalidade" e
+        "professores_com_aula".
+        """
+        turma, professor, disciplina, sala, dia, horario = (
+            np.atleast_2d(np.asarray(v, dtype=np.intp)) for v in (turma, professor, disciplina, sala, dia, horario)
+        )
+        candidatos = turma.shape[0]
+        lote = np.broadcast_to(np.arange(candidatos, dtype=np.intp)[:, None], turma.shape)
+        num_t, num_p, num_d = len(self.turmas.valores), len(self.professores.valores), len(self.disciplinas.valores)
+        dias, horas = len(DIAS_ORDENADOS), NUM_HORARIOS
+        h = horario - 1
+        slot_ok = (dia >= 0) & (dia < dias) & (h >= 0) & (h < horas)
+        com_turma = slot_ok & (turma >= 0)
+        com_prof = slot_ok & (professor >= 0)
+        metricas = {}
+
+        # Professor × dia × horário: janelas e dias de aula
+        ocupado = self._ocupacao(lote, (professor, dia, h), (num_p, dias, horas), com_prof) > 0
+        aulas_dia = ocupado.sum(-1)
+        primeira = ocupado.argmax(-1)
+        ultima = horas - 1 - ocupado[..., ::-1].argmax(-1)
+        segmento = self.segmento[turma]
+        presente = self._ocupacao(
+            lote, (professor, dia, segmento), (num_p, dias, len(SEGMENTOS)), com_prof & com_turma
+        ) > 0
+        neutro = (presente[..., :, None] & self.intervalo).any(-2)
+        dentro = (np.arange(horas) >= primeira[..., None]) & (np.arange(horas) <= ultima[..., None])
+        vagos = np.where(aulas_dia > 0, ultima - primeira + 1 - aulas_dia, 0)
+        vagos -= (neutro & ~ocupado & dentro & (aulas_dia > 0)[..., None]).sum(-1)
+        metricas["janelas"] = vagos.sum((1, 2))
+        dias_com_aula = (aulas_dia > 0).sum(-1)
+        metricas["dias_professor"] = dias_com_aula.sum(-1)
+
+        # Turma × dia × horário só com as pesadas
+        com_disc = com_turma & (disciplina >= 0)
+        pesada = com_disc & self.pesada[disciplina]
+        pesadas = self._ocupacao(lote, (turma, dia, h), (num_t, dias, horas), pesada) > 0
+        metricas["pesadas_seguidas"] = (pesadas[..., 1:] & pesadas[..., :-1]).sum((1, 2, 3))
+        metricas["pesadas_excesso"] = np.maximum(pesadas.sum(-1) - LIMITE_PESADAS_DIA, 0).sum((1, 2))
+
+        # Turma × disciplina × dia: repetições que a carga não obriga
+        por_dia = self._ocupacao(lote, (turma, disciplina, dia), (num_t, num_d, dias), com_disc)
+        total = por_dia.sum(-1)
+        metricas["repeticoes"] = (np.minimum(total, dias) - (por_dia > 0).sum(-1)).sum((1, 2))
+
+        # Tipo da sala contra o tipo da disciplina
+        com_sala = (disciplina >= 0) & (sala >= 0)
+        metricas["sala_inadequada"] = (com_sala & ~self.adequada[disciplina, sala]).sum(-1)
+
+        pesos = np.array([METRICAS[nome][1] for nome in METRICAS])
+        metricas["penalidade"] = np.stack([metricas[nome] for nome in METRICAS], axis=-1) @ pesos
+        metricas["professores_com_aula"] = (dias_com_aula > 0).sum(-1)
+        return metricas
+
+    def pontuar(self, aulas):
+        """QualidadeGrade de uma grade (lista de aulas ou GradeColunar)"""
+        resultado = self.pontuar_lote(*self.codigos(aulas))
+        return QualidadeGrade(
+            {nome: int(resultado[nome][0]) for nome in METRICAS},
+            int(resultado["professores_com_aula"][0])
+        )
+
+
+def avaliar_grade(aulas, turmas, professores, disciplinas, salas=()):
+    """Atalho para pontuar uma grade só"""
+    return Pontuador(turmas, professores, disciplinas, salas).pontuar(aulas)
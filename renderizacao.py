@@ -0,0 +1,174 @@
+"""
+HTML das grades (calendário da turma e grade semanal do professor).
+
+Cada tabela é montada uma vez por (versão da grade, entidade) e guardada
+num cache em memória compartilhado entre as sessões, com descarte dos
+fragmentos menos usados. A folha de estilo das tabelas é única e deve ser
+emitida uma vez por página (ESTILO_GRADES).
+"""
+import threading
+from collections import OrderedDict
+from html import escape
+
+from grade_index import DIAS_ORDENADOS
+from viabilidade import INTERVALO_SEGMENTO
+
+LIMITE_FRAGMENTOS = 500  # tabelas mantidas antes de descartar as menos usadas
+
+ESTILO_GRADES = """
+<style>
+.grade-table {
+    width: 100%;
+    border-collapse: collapse;
+}
+.grade-table th, .grade-table td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: center;
+}
+.grade-table th {
+    background-color: #f2f2f2;
+    font-weight: bold;
+}
+.horario-livre {
+    background-color: #f8f9fa;
+    color: #6c757d;
+}
+.horario-aula {
+    background-color: #d1ecf1;
+    color: #0c5460;
+}
+.horario-intervalo {
+    background-color: #fff3cd;
+    color: #856404;
+    font-weight: bold;
+}
+.grade-professor-table {
+    width: 100%;
+    border-collapse: collapse;
+    font-size: 14px;
+}
+.grade-professor-table th, .grade-professor-table td {
+    border: 1px solid #ddd;
+    padding: 10px;
+    text-align: center;
+    vertical-align: top;
+}
+.grade-professor-table th {
+    background-color: #4A90E2;
+    color: white;
+    font-weight: bold;
+}
+.horario-prof-livre {
+    background-color: #f8f9fa;
+    color: #6c757d;
+    font-style: italic;
+}
+.horario-prof-aula {
+    background-color: #d1ecf1;
+    color: #0c5460;
+    border-left: 4px solid #0c5460;
+}
+.horario-prof-indisponivel {
+    background-color: #ffe6e6;
+    color: #dc3545;
+    font-style: italic;
+}
+.info-turma {
+    font-weight: bold;
+    font-size: 12px;
+}
+.info-disciplina {
+    font-size: 11px;
+}
+.info-sala {
+    font-size: 10px;
+    color: #666;
+}
+</style>
+"""
+
+CABECALHO_DIAS = "<th>Segunda</th><th>Terça</th><th>Quarta</th><th>Quinta</th><th>Sexta</th>"
+ULTIMO_HORARIO_SEGMENTO = {"EF_II": 6, "EM": 8}
+
+_cache = OrderedDict()
+_trava = threading.Lock()
+
+
+def _em_cache(chave, montar):
+    with _trava:
+        html = _cache.get(chave)
+        if html is not None:
+            _cache.move_to_end(chave)
+            return html
+    html = montar()
+    with _trava:
+        _cache[chave] = html
+        _cache.move_to_end(chave)
+        while len(_cache) > LIMITE_FRAGMENTOS:
+            _cache.popitem(last=False)
+    return html
+
+
+def _texto(valor):
+    return escape(str(valor)) if valor is not None else ""
+
+
+def html_grade_turma(versao, indice_grade, turma_nome, segmento, horarios_disponiveis, horario_real):
+    """Tabela do calendário da turma
+
+    `horario_real(turma, horario)` devolve o texto da primeira coluna.
+    """
+    def montar():
+        intervalo = INTERVALO_SEGMENTO[segmento]
+        partes = ["<table class='grade-table'><tr><th>Horário</th>", CABECALHO_DIAS, "</tr>"]
+        for horario in range(1, ULTIMO_HORARIO_SEGMENTO[segmento] + 1):
+            partes.append(f"<tr><td><strong>{_texto(horario_real(turma_nome, horario))}</strong></td>")
+            for dia in DIAS_ORDENADOS:
+                aula = indice_grade.aula_no_slot(turma_nome, dia, horario)
+                if horario == intervalo:
+                    partes.append("<td class='horario-intervalo'>🕛 INTERVALO</td>")
+                elif aula:
+                    fixa = "🔒 " if getattr(aula, "fixa", False) else ""
+                    partes.append(
+                        f"<td class='horario-aula'>{fixa}{_texto(aula.disciplina)}<br><small>{_texto(aula.professor)}</small></td>"
+                    )
+                elif horario in horarios_disponiveis:
+                    partes.append("<td class='horario-livre'>LIVRE</td>")
+                else:
+                    partes.append("<td></td>")
+            partes.append("</tr>")
+        partes.append("</table>")
+        return "".join(partes)
+
+    return _em_cache((versao, "turma", turma_nome), montar)
+
+
+def html_grade_professor(versao, grade_prof, professor, horario_texto):
+    """Tabela semanal do professor (aulas, horários livres e indisponíveis)
+
+    `horario_texto(horario)` devolve o texto da primeira coluna.
+    """
+    def montar():
+        partes = ["<table class='grade-professor-table'><tr><th>Horário</th>", CABECALHO_DIAS, "</tr>"]
+        for horario in range(1, 9):
+            partes.append(f"<tr><td><strong>{_texto(horario_texto(horario))}</strong></td>")
+            for dia in DIAS_ORDENADOS:
+                aula = grade_prof.aula_no_slot(dia, horario)
+                if grade_prof.esta_indisponivel(dia, horario):
+                    partes.append("<td class='horario-prof-indisponivel'>❌ INDISPONÍVEL</td>")
+                elif aula:
+                    partes.append(
+                        "<td class='horario-prof-aula'>"
+                        f"<div class='info-turma'>{_texto(aula.turma)}</div>"
+                        f"<div class='info-disciplina'>{_texto(aula.disciplina)}</div>"
+                        f"<div class='info-sala'>{_texto(aula.sala)}</div>"
+                        "</td>"
+                    )
+                else:
+                    partes.append("<td class='horario-prof-livre'>LIVRE</td>")
+            partes.append("</tr>")
+        partes.append("</table>")
+        return "".join(partes)
+
+    return _em_cache((versao, "professor", professor, grade_prof.mascara_disponibilidade), montar)
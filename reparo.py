@@ -0,0 +1,210 @@
+"""
+Reparo incremental de uma grade já publicada.
+
+Depois de pequenas edições (indisponibilidade de um professor, carga de
+uma disciplina), encontra as aulas que passaram a violar alguma regra,
+tira só essas da grade e as realoca numa vizinhança pequena, mantendo
+todas as outras aulas onde estão. O resultado muda o mínimo possível a
+grade que professores e famílias já conhecem.
+"""
+import copy
+import time
+
+from disponibilidade import bit_slot, mascara_professor
+from grade_index import DIAS_ORDENADOS
+from viabilidade import HORARIOS_SEGMENTO, segmento_turma
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+class ResultadoReparo:
+    """Nova lista de aulas e o que mudou em relação à grade anterior"""
+
+    def __init__(self):
+        self.aulas = []
+        self.removidas = []  # aulas que saíram da grade
+        self.adicionadas = []  # aulas novas ou realocadas
+        self.nao_alocadas = []  # (turma, disciplina, motivo)
+        self.violacoes = 0
+        self.tempo_ms = 0.0
+
+    @property
+    def alterou(self):
+        return bool(self.removidas or self.adicionadas)
+
+
+class _Estado:
+    """Ocupação atual de turmas e professores durante o reparo"""
+
+    def __init__(self):
+        self.turma_slot = {}  # (turma, dia, horario) -> aula
+        self.prof_slot = {}  # (professor, dia, horario) -> aula
+
+    def livre(self, turma, professor, dia, horario):
+        return (turma, dia, horario) not in self.turma_slot and (professor, dia, horario) not in self.prof_slot
+
+    def colocar(self, aula):
+        self.turma_slot[(aula.turma, aula.dia, aula.horario)] = aula
+        self.prof_slot[(aula.professor, aula.dia, aula.horario)] = aula
+
+    def retirar(self, aula):
+        self.turma_slot.pop((aula.turma, aula.dia, aula.horario), None)
+        self.prof_slot.pop((aula.professor, aula.dia, aula.horario), None)
+
+
+def _pode(professor, mascaras_prof, dia, horario):
+    bit = bit_slot(dia, horario)
+    return bit is not None and bool(mascaras_prof.get(professor, 0) >> bit & 1)
+
+
+def reparar_grade(aulas, turmas, professores, disciplinas):
+    """Repara a grade pinando tudo que continua válido
+
+    Retorna ResultadoReparo. Aulas marcadas como fixas (`fixa=True`) nunca
+    são movidas, apenas removidas se a turma ou a disciplina deixarem de
+    existir.
+    """
+    inicio = time.perf_counter()
+    resultado = ResultadoReparo()
+
+    turmas_por_nome = {t.nome: t for t in turmas}
+    profs_por_nome = {p.nome: p for p in professores}
+    mascaras_prof = {p.nome: mascara_professor(p) for p in professores}
+    slots_turma = {
+        t.nome: [(dia, h) for dia in DIAS_ORDENADOS for h in HORARIOS_SEGMENTO[segmento_turma(t)]]
+        for t in turmas
+    }
+
+    # Carga exigida por (turma, disciplina), respeitando o grupo da turma
+    carga = {}
+    for disc in disciplinas:
+        for nome_turma in disc.turmas:
+            turma = turmas_por_nome.get(nome_turma)
+            if turma is not None and _grupo(disc) == _grupo(turma):
+                carga[(nome_turma, disc.nome)] = disc.carga_semanal
+
+    def qualificado(nome_prof, nome_turma, nome_disc):
+        prof = profs_por_nome.get(nome_prof)
+        return (prof is not None and nome_disc in prof.disciplinas
+                and _grupo(prof) in (_grupo(turmas_por_nome[nome_turma]), "AMBOS"))
+
+    # 1. Separa as aulas válidas (pinadas) das que violam alguma regra
+    estado = _Estado()
+    mantidas = []
+    pendentes = []  # aulas a realocar
+    contagem = {}
+    for aula in aulas:
+        chave = (aula.turma, aula.disciplina)
+        fixa = getattr(aula, "fixa", False)
+        if chave not in carga:
+            resultado.removidas.append(aula)  # turma/disciplina não existe mais
+            continue
+        if contagem.get(chave, 0) >= carga[chave]:
+            resultado.removidas.append(aula)  # carga semanal foi reduzida
+            continue
+        valida = (
+            (aula.dia, aula.horario) in slots_turma[aula.turma]
+            and qualificado(aula.professor, aula.turma, aula.disciplina)
+            and _pode(aula.professor, mascaras_prof, aula.dia, aula.horario)
+            and estado.livre(aula.turma, aula.professor, aula.dia, aula.horario)
+        )
+        contagem[chave] = contagem.get(chave, 0) + 1
+        if valida or fixa:
+            estado.colocar(aula)
+            mantidas.append(aula)
+        else:
+            pendentes.append(aula)
+    resultado.violacoes = len(resultado.removidas) + len(pendentes)
+
+    # Aulas novas quando a carga semanal aumentou
+    modelos_turma = {}
+    for aula in aulas:
+        modelos_turma.setdefault(aula.turma, aula)
+    faltantes = []
+    for chave, exigida in carga.items():
+        for _ in range(exigida - contagem.get(chave, 0)):
+            faltantes.append(chave)
+    resultado.violacoes += len(faltantes)
+
+    professor_habitual = {}
+    for aula in mantidas:
+        professor_habitual.setdefault((aula.turma, aula.disciplina), aula.professor)
+
+    def candidatos_professor(nome_turma, nome_disc, anterior=None):
+        preferidos = [anterior, professor_habitual.get((nome_turma, nome_disc))]
+        outros = sorted(p.nome for p in professores if qualificado(p.nome, nome_turma, nome_disc))
+        vistos = []
+        for nome in preferidos + outros:
+            if nome and nome not in vistos and qualificado(nome, nome_turma, nome_disc):
+                vistos.append(nome)
+        return vistos
+
+    def alocar(nome_turma, nome_disc, anterior=None):
+        """Tenta alocar direto; se não der, move uma aula da turma (1 troca)"""
+        profs = candidatos_professor(nome_turma, nome_disc, anterior)
+        for prof in profs:
+            for dia, horario in slots_turma[nome_turma]:
+                if _pode(prof, mascaras_prof, dia, horario) and estado.livre(nome_turma, prof, dia, horario):
+                    return prof, dia, horario, None
+
+        # Vizinhança: liberar um horário da turma movendo uma aula não fixa
+        for prof in profs:
+            for dia, horario in slots_turma[nome_turma]:
+                if not _pode(prof, mascaras_prof, dia, horario) or (prof, dia, horario) in estado.prof_slot:
+                    continue
+                ocupante = estado.turma_slot.get((nome_turma, dia, horario))
+                if ocupante is None or getattr(ocupante, "fixa", False):
+                    continue
+                for novo_dia, novo_horario in slots_turma[nome_turma]:
+                    if (_pode(ocupante.professor, mascaras_prof, novo_dia, novo_horario)
+                            and estado.livre(nome_turma, ocupante.professor, novo_dia, novo_horario)):
+                        return prof, dia, horario, (ocupante, novo_dia, novo_horario)
+        return None
+
+    def nova_aula(modelo, nome_turma, nome_disc, prof, dia, horario):
+        aula = copy.copy(modelo)
+        aula.turma, aula.disciplina, aula.professor = nome_turma, nome_disc, prof
+        aula.dia, aula.horario = dia, horario
+        aula.grupo = _grupo(turmas_por_nome[nome_turma])
+        if hasattr(aula, "fixa"):
+            aula.fixa = False
+        return aula
+
+    # 2. Realoca as aulas pendentes e cria as faltantes
+    tarefas_reparo = [(a.turma, a.disciplina, a.professor, a, a) for a in pendentes]
+    tarefas_reparo += [(t, d, None, None, modelos_turma.get(t)) for t, d in faltantes]
+    for nome_turma, nome_disc, anterior, original, modelo in tarefas_reparo:
+        if modelo is None:
+            resultado.nao_alocadas.append((nome_turma, nome_disc, "turma sem aulas para usar como modelo"))
+            continue
+        escolha = alocar(nome_turma, nome_disc, anterior)
+        if escolha is None:
+            resultado.nao_alocadas.append((nome_turma, nome_disc, "sem horário livre para turma e professor"))
+            if original is not None:
+                resultado.removidas.append(original)
+            continue
+
+        prof, dia, horario, movimento = escolha
+        if movimento is not None:
+            ocupante, novo_dia, novo_horario = movimento
+            estado.retirar(ocupante)
+            mantidas.remove(ocupante)
+            movida = nova_aula(ocupante, ocupante.turma, ocupante.disciplina, ocupante.professor, novo_dia, novo_horario)
+            estado.colocar(movida)
+            mantidas.append(movida)
+            resultado.removidas.append(ocupante)
+            resultado.adicionadas.append(movida)
+
+        aula = nova_aula(modelo, nome_turma, nome_disc, prof, dia, horario)
+        estado.colocar(aula)
+        mantidas.append(aula)
+        if original is not None:
+            resultado.removidas.append(original)
+        resultado.adicionadas.append(aula)
+
+    resultado.aulas = mantidas
+    resultado.tempo_ms = (time.perf_counter() - inicio) * 1000
+    return resultado
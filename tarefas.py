@@ -0,0 +1,306 @@
+"""
+Execução de tarefas longas (geração de grade) em processos separados.
+
+O script do Streamlit apenas submete a tarefa e consulta o estado; o
+trabalho roda num processo próprio, limitado ao número de núcleos, e
+pode ser cancelado a qualquer momento. O gerenciador é único por
+processo do servidor, então a tarefa sobrevive a um recarregamento da
+página (basta guardar o id).
+
+Cada tarefa roda em seu próprio grupo de processos, para que possa abrir
+subprocessos (ex: resolver componentes em paralelo) e ser cancelada por
+inteiro.
+"""
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+ESTADOS_FINAIS = (CONCLUIDA, FALHOU, CANCELADA)
+
+INTERVALO_MONITOR = 0.2  # segundos entre verificações dos processos
+RETENCAO_TAREFAS = 3600  # segundos que uma tarefa finalizada fica consultável
+
+# Canal do processo filho para reportar progresso (None no processo principal)
+_canal_progresso = None
+
+
+def em_tarefa():
+    """Indica se o código está rodando no processo de uma tarefa"""
+    return _canal_progresso is not None
+
+
+def reportar_progresso(objetivo):
+    """Reporta o melhor objetivo encontrado até agora pela tarefa em execução
+
+    Pode ser chamada por qualquer código executado dentro de uma tarefa; fora
+    de uma tarefa não faz nada.
+    """
+    if _canal_progresso is not None:
+        try:
+            _canal_progresso.send(("progresso", objetivo))
+        except (OSError, ValueError):
+            pass
+
+
+def _executar(conexao, funcao, args, kwargs):
+    """Ponto de entrada do processo filho"""
+    global _canal_progresso
+    _canal_progresso = conexao
+    if hasattr(os, "setsid"):
+        os.setsid()
+    try:
+        resultado = funcao(*args, **kwargs)
+        conexao.send(("resultado", resultado))
+    except Exception as e:
+        conexao.send(("erro", f"{str(e)}\n{traceback.format_exc()}"))
+    finally:
+        conexao.close()
+
+
+def _encerrar_processo(processo):
+    """Pede o fim do processo da tarefa e dos subprocessos que ele abriu (não espera)"""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(processo.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            processo.terminate()
+    else:
+        processo.terminate()
+
+
+def _recolher_processo(processo):
+    """Espera o processo sair; se ignorar o SIGTERM, é morto"""
+    processo.join(timeout=5)
+    if processo.is_alive():
+        processo.kill()
+        processo.join(timeout=1)
+
+
+class Tarefa:
+    """Estado de uma tarefa submetida ao gerenciador"""
+
+    def __init__(self, id, funcao, args, kwargs, info, limite=None):
+        self.id = id
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.info = info
+        self.limite = limite
+        self.estado = PENDENTE
+        self.criada_em = time.time()
+        self.inicio = None
+        self.fim = None
+        self.melhor_objetivo = None
+        self.resultado = None
+        self.erro = None
+        self._processo = None
+        self._conexao = None
+
+    @property
+    def finalizada(self):
+        return self.estado in ESTADOS_FINAIS
+
+    @property
+    def tempo_decorrido(self):
+        """Segundos de execução (0 enquanto pendente)"""
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.time()) - self.inicio
+
+
+class GerenciadorTarefas:
+    """Fila de tarefas executadas em até `max_processos` processos simultâneos"""
+
+    def __init__(self, max_processos=None):
+        self.max_processos = max_processos or os.cpu_count() or 1
+        self._contexto = multiprocessing.get_context("spawn")
+        self._tarefas = {}
+        self._fila = deque()
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._a_recolher = []  # processos encerrados, esperados (join) fora da trava
+
+    def submeter(self, funcao, args=(), kwargs=None, info=None, limite=None):
+        """Enfileira `funcao(*args, **kwargs)` e retorna o id da tarefa
+
+        `funcao` e os argumentos precisam ser serializáveis (pickle); `info`
+        fica só no processo principal, para quem for consultar a tarefa.
+        Com `limite` (segundos), a tarefa que rodar mais que isso é encerrada
+        e falha.
+        """
+        tarefa = Tarefa(uuid.uuid4().hex, funcao, tuple(args), kwargs or {}, info or {}, limite)
+        with self._lock:
+            self._tarefas[tarefa.id] = tarefa
+            self._fila.append(tarefa)
+            self._iniciar_pendentes()
+            self._garantir_monitor()
+        return tarefa.id
+
+    def status(self, id_tarefa):
+        """Retorna a Tarefa (com estado atualizado) ou None se desconhecida"""
+        with self._lock:
+            self._atualizar()
+            tarefa = self._tarefas.get(id_tarefa)
+        self._recolher()
+        return tarefa
+
+    def em_aberto(self):
+        """Quantidade de tarefas pendentes ou em execução"""
+        with self._lock:
+            self._atualizar()
+            abertas = sum(1 for t in self._tarefas.values() if not t.finalizada)
+        self._recolher()
+        return abertas
+
+    def cancelar(self, id_tarefa):
+        """Cancela a tarefa, encerrando o processo se já estiver rodando"""
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None or tarefa.finalizada:
+                return False
+            if tarefa.estado == PENDENTE:
+                self._fila.remove(tarefa)
+            else:
+                _encerrar_processo(tarefa._processo)
+                self._a_recolher.append(tarefa._processo)
+                tarefa._conexao.close()
+            tarefa.estado = CANCELADA
+            tarefa.fim = time.time()
+            self._iniciar_pendentes()
+        self._recolher()
+        return True
+
+    def encerrar_todas(self):
+        """Encerra todas as tarefas em execução (saída do servidor)"""
+        with self._lock:
+            for tarefa in self._em_execucao():
+                _encerrar_processo(tarefa._processo)
+                self._a_recolher.append(tarefa._processo)
+                tarefa.estado = CANCELADA
+                tarefa.fim = time.time()
+            self._fila.clear()
+        self._recolher()
+
+    def descartar(self, id_tarefa):
+        """Remove uma tarefa finalizada do registro"""
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is not None and tarefa.finalizada:
+                del self._tarefas[id_tarefa]
+
+    def _garantir_monitor(self):
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._monitorar, daemon=True)
+            self._monitor.start()
+
+    def _monitorar(self):
+        while True:
+            time.sleep(INTERVALO_MONITOR)
+            with self._lock:
+                self._atualizar()
+                ociosa = not any(not t.finalizada for t in self._tarefas.values())
+                if ociosa:
+                    self._monitor = None
+            self._recolher()
+            if ociosa:
+                return
+
+    def _recolher(self):
+        """Espera os processos encerrados sem segurar a trava (chamado depois de soltá-la)"""
+        with self._lock:
+            processos, self._a_recolher = self._a_recolher, []
+        for processo in processos:
+            _recolher_processo(processo)
+
+    def _em_execucao(self):
+        return [t for t in self._tarefas.values() if t.estado == EXECUTANDO]
+
+    def _iniciar_pendentes(self):
+        livres = self.max_processos - len(self._em_execucao())
+        while livres > 0 and self._fila:
+            tarefa = self._fila.popleft()
+            pai, filho = self._contexto.Pipe(duplex=False)
+            processo = self._contexto.Process(
+                target=_executar,
+                args=(filho, tarefa.funcao, tarefa.args, tarefa.kwargs)
+            )
+            processo.start()
+            filho.close()
+            tarefa._processo = processo
+            tarefa._conexao = pai
+            tarefa.estado = EXECUTANDO
+            tarefa.inicio = time.time()
+            livres -= 1
+
+    def _atualizar(self):
+        """Lê as mensagens dos processos filhos e finaliza os que terminaram
+
+        Chamado com a trava; os processos finalizados vão para `_a_recolher`.
+        """
+        agora = time.time()
+        for tarefa in self._em_execucao():
+            try:
+                while tarefa._conexao.poll():
+                    tipo, valor = tarefa._conexao.recv()
+                    if tipo == "progresso":
+                        tarefa.melhor_objetivo = valor
+                    elif tipo == "resultado":
+                        tarefa.resultado = valor
+                        tarefa.estado = CONCLUIDA
+                    else:
+                        tarefa.erro = valor
+                        tarefa.estado = FALHOU
+            except (EOFError, OSError):
+                if not tarefa.finalizada:
+                    tarefa.erro = "Processo da tarefa terminou sem resultado"
+                    tarefa.estado = FALHOU
+
+            if tarefa.finalizada:
+                tarefa.fim = agora
+                self._a_recolher.append(tarefa._processo)
+                tarefa._conexao.close()
+            elif tarefa.limite is not None and agora - tarefa.inicio > tarefa.limite:
+                _encerrar_processo(tarefa._processo)
+                self._a_recolher.append(tarefa._processo)
+                tarefa._conexao.close()
+                tarefa.erro = f"Tempo limite de {tarefa.limite:.0f}s excedido"
+                tarefa.estado = FALHOU
+                tarefa.fim = agora
+            elif not tarefa._processo.is_alive() and not tarefa._conexao.poll():
+                tarefa.erro = f"Processo da tarefa encerrado (código {tarefa._processo.exitcode})"
+                tarefa.estado = FALHOU
+                tarefa.fim = agora
+                self._a_recolher.append(tarefa._processo)
+                tarefa._conexao.close()
+
+        # Esquece tarefas finalizadas há muito tempo
+        for id_tarefa, tarefa in list(self._tarefas.items()):
+            if tarefa.finalizada and agora - tarefa.fim > RETENCAO_TAREFAS:
+                del self._tarefas[id_tarefa]
+
+        self._iniciar_pendentes()
+
+
+_gerenciador = None
+_lock_gerenciador = threading.Lock()
+
+
+def obter_gerenciador():
+    """Gerenciador de tarefas compartilhado por todas as sessões do servidor"""
+    global _gerenciador
+    with _lock_gerenciador:
+        if _gerenciador is None:
+            _gerenciador = GerenciadorTarefas()
+            atexit.register(_gerenciador.encerrar_todas)
+        return _gerenciador
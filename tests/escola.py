@@ -0,0 +1,97 @@
+"""
+Escola pequena para os testes, sem depender do módulo `models`.
+
+Duas turmas do EF II (horários 1, 2, 4, 5 e 6; o 3º é o intervalo), com
+Matemática e Português em cada uma. Ana dá Matemática e Bruno dá
+Português nas duas turmas; a grade de `grade_valida` fecha a carga
+semanal sem conflitos.
+"""
+from disponibilidade import MASCARA_SEMANA
+from grade_index import DIAS_ORDENADOS
+
+
+class _Cadastro:
+    """Objeto com os atributos passados por nome, como os do modelo"""
+
+    def __init__(self, **atributos):
+        self.__dict__.update(atributos)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.__dict__})"
+
+
+class Turma(_Cadastro):
+    pass
+
+
+class Professor(_Cadastro):
+    pass
+
+
+class Disciplina(_Cadastro):
+    pass
+
+
+class Sala(_Cadastro):
+    pass
+
+
+class Aula(_Cadastro):
+    pass
+
+
+def turmas():
+    return [
+        Turma(nome="6A", serie="6", grupo="A", segmento="EF_II"),
+        Turma(nome="7A", serie="7", grupo="A", segmento="EF_II"),
+    ]
+
+
+def professores(mascara_ana=MASCARA_SEMANA):
+    return [
+        Professor(nome="Ana", disciplinas=["Matemática"], grupo="A", mascara_disponibilidade=mascara_ana),
+        Professor(nome="Bruno", disciplinas=["Português"], grupo="A", mascara_disponibilidade=MASCARA_SEMANA),
+    ]
+
+
+def disciplinas(carga=5):
+    return [
+        Disciplina(nome="Matemática", carga_semanal=carga, tipo="pesada", turmas=["6A", "7A"], grupo="A"),
+        Disciplina(nome="Português", carga_semanal=carga, tipo="pesada", turmas=["6A", "7A"], grupo="A"),
+    ]
+
+
+def salas():
+    return [Sala(nome="Sala 1", tipo="normal"), Sala(nome="Laboratório", tipo="laboratório")]
+
+
+def grade_valida():
+    """Uma aula de cada disciplina por dia: no 6A Matemática no 1º horário, no 7A no 2º"""
+    aulas = []
+    for dia in DIAS_ORDENADOS:
+        for turma, primeira, segunda in (("6A", "Matemática", "Português"), ("7A", "Português", "Matemática")):
+            for horario, disciplina in ((1, primeira), (2, segunda)):
+                professor = "Ana" if disciplina == "Matemática" else "Bruno"
+                aulas.append(Aula(
+                    turma=turma, disciplina=disciplina, professor=professor, sala="Sala 1",
+                    dia=dia, horario=horario, grupo="A"
+                ))
+    return aulas
+
+
+def campos(aula):
+    """Tupla com as colunas da aula, para comparar aulas de tipos diferentes"""
+    return (aula.turma, aula.disciplina, aula.professor, aula.sala, aula.dia, aula.horario, aula.grupo)
+
+
+def escola_json(nome, carga=2):
+    """Escola de uma turma no formato JSON da linha de comando e da API"""
+    return {
+        "nome": nome,
+        "turmas": [{"nome": "6A", "serie": "6", "grupo": "A", "segmento": "EF_II"}],
+        "disciplinas": [{"nome": "Matemática", "carga_semanal": carga, "tipo": "pesada", "turmas": ["6A"],
+                         "grupo": "A"}],
+        "professores": [{"nome": "Ana", "disciplinas": ["Matemática"], "grupo": "A",
+                         "disponibilidade": "seg;ter;qua;qui;sex"}],
+        "salas": [{"nome": "Sala 1", "capacidade": 30, "tipo": "normal"}],
+    }
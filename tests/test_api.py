@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("scheduler_ortools")  # a API gera pela linha_comando, que importa os agendadores
+
+import api  # noqa: E402
+
+from tests import escola  # noqa: E402
+
+
+@pytest.fixture
+def cliente():
+    return api.app.test_client()
+
+
+def _acompanhar(cliente, url, limite=60):
+    fim = time.time() + limite
+    while time.time() < fim:
+        resposta = cliente.get(url)
+        if resposta.get_json()["estado"] not in ("pendente", "executando"):
+            return resposta
+        time.sleep(0.1)
+    raise AssertionError("geração não terminou")
+
+
+def test_post_responde_202_e_a_consulta_traz_a_grade(cliente):
+    resposta = cliente.post("/api/grades", json={**escola.escola_json("norte", carga=3), "semente": 1})
+    assert resposta.status_code == 202
+    corpo = resposta.get_json()
+    assert corpo["estado"] == "pendente"
+    assert resposta.headers["Location"] == corpo["url"] == f"/api/grades/{corpo['id']}"
+
+    final = _acompanhar(cliente, corpo["url"])
+    assert final.status_code == 200
+    grade = final.get_json()
+    assert grade["estado"] == "concluida" and grade["escola"] == "norte"
+    assert len(grade["aulas"]) == grade["estatisticas"]["Aulas alocadas"] == 3
+    assert cliente.get(corpo["url"]).get_json()["aulas"] == grade["aulas"]  # consultas repetidas
+
+
+@pytest.mark.parametrize("alteracao, trecho", [
+    ({"algoritmo": "magico"}, "algoritmo deve ser"),
+    ({"tempo_limite": True}, "tempo_limite deve ser"),
+    ({"tempo_limite": 10_000}, "tempo_limite deve ser"),
+    ({"semente": "1"}, "semente deve ser"),
+    ({"decompor": "sim"}, "decompor deve ser"),
+    ({"disciplinas": [{"nome": "Matemática", "carga_semanal": 2, "tipo": "pesada", "turmas": ["9Z"]}]},
+     "Turmas não cadastradas: 9Z"),
+])
+def test_escola_ou_parametro_invalido_da_422(cliente, alteracao, trecho):
+    resposta = cliente.post("/api/grades", json={**escola.escola_json("x"), **alteracao})
+    assert resposta.status_code == 422
+    assert trecho in resposta.get_json()["erro"]
+
+
+def test_corpo_que_nao_e_objeto_e_tarefa_desconhecida(cliente):
+    assert cliente.post("/api/grades", json=[1, 2]).status_code == 400
+    assert cliente.get("/api/grades/nao-existe").status_code == 404
+    assert cliente.delete("/api/grades/nao-existe").status_code == 404
+
+
+def test_fila_cheia_da_503(cliente, monkeypatch):
+    monkeypatch.setattr(api, "MAX_TAREFAS_ABERTAS", 0)
+    resposta = cliente.post("/api/grades", json=escola.escola_json("x"))
+    assert resposta.status_code == 503
+    assert resposta.headers["Retry-After"] == "30"
@@ -0,0 +1,97 @@
+import itertools
+import sqlite3
+
+import pytest
+
+import cache_grade
+from disponibilidade import MASCARA_SEMANA, mascara_do_dia
+
+from tests import escola
+
+
+def _chave(turmas=None, professores=None, disciplinas=None, algoritmo="Algoritmo Simples (Rápido)", **opcoes):
+    return cache_grade.chave_entradas(
+        escola.turmas() if turmas is None else turmas,
+        escola.professores() if professores is None else professores,
+        escola.disciplinas() if disciplinas is None else disciplinas,
+        escola.salas(), algoritmo, **opcoes
+    )
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    relogio = itertools.count(1000)
+    monkeypatch.setattr(cache_grade.time, "time", lambda: float(next(relogio)))
+    return str(tmp_path / "escola.db")
+
+
+def test_chave_nao_depende_da_ordem_dos_cadastros():
+    turmas, professores, disciplinas = escola.turmas(), escola.professores(), escola.disciplinas()
+    disciplinas[0].turmas = list(reversed(disciplinas[0].turmas))
+    assert _chave() == _chave(turmas[::-1], professores[::-1], disciplinas[::-1])
+    assert len(_chave()) == 64
+
+
+def test_chave_muda_com_cada_entrada_do_gerador():
+    base = _chave()
+    disciplinas = escola.disciplinas()
+    disciplinas[1].carga_semanal = 4
+    fixa = escola.grade_valida()[0]
+    variacoes = [
+        _chave(professores=escola.professores(mascara_ana=MASCARA_SEMANA & ~mascara_do_dia("segunda"))),
+        _chave(disciplinas=disciplinas),
+        _chave(algoritmo="Google OR-Tools (Otimizado)"),
+        _chave(semente=7),
+        _chave(fixas=[fixa]),
+    ]
+    assert base not in variacoes
+    assert len(set(variacoes)) == len(variacoes)
+
+
+def test_guardar_e_buscar_devolvem_aulas_metodo_e_aviso(banco):
+    aulas = escola.grade_valida()
+    assert cache_grade.buscar("k", caminho=banco) is None
+    assert cache_grade.guardar("k", aulas, "Google OR-Tools", "🔒 2 aula(s) fixa(s)", caminho=banco)
+
+    lidas, metodo, aviso = cache_grade.buscar("k", caminho=banco)
+    assert [escola.campos(a) for a in lidas] == [escola.campos(a) for a in aulas]
+    assert (metodo, aviso) == ("Google OR-Tools", "🔒 2 aula(s) fixa(s)")
+
+
+def test_grade_vazia_nao_entra_no_cache(banco):
+    assert not cache_grade.guardar("k", [], "Google OR-Tools", caminho=banco)
+    assert cache_grade.buscar("k", caminho=banco) is None
+
+
+def test_descarta_a_grade_usada_ha_mais_tempo(banco, monkeypatch):
+    monkeypatch.setattr(cache_grade, "LIMITE_CACHE", 2)
+    aulas = escola.grade_valida()
+    cache_grade.guardar("a", aulas, "m", caminho=banco)
+    cache_grade.guardar("b", aulas, "m", caminho=banco)
+    assert cache_grade.buscar("a", caminho=banco) is not None  # "a" passa a ser a mais recente
+    cache_grade.guardar("c", aulas, "m", caminho=banco)
+
+    assert cache_grade.buscar("b", caminho=banco) is None
+    assert cache_grade.buscar("a", caminho=banco) is not None
+    assert cache_grade.buscar("c", caminho=banco) is not None
+
+
+def test_tabela_antiga_ganha_a_coluna_de_aviso(banco):
+    with sqlite3.connect(banco) as conn:
+        conn.execute(
+            "CREATE TABLE cache_grades (chave TEXT PRIMARY KEY, metodo TEXT NOT NULL, aulas BLOB NOT NULL, "
+            "criado_em REAL NOT NULL, usado_em REAL NOT NULL)"
+        )
+    assert cache_grade.guardar("k", escola.grade_valida(), "m", "aviso", caminho=banco)
+    assert cache_grade.buscar("k", caminho=banco)[2] == "aviso"
+
+
+def test_fallback_e_grade_vazia_nao_sao_resultado_do_algoritmo():
+    pytest.importorskip("scheduler_ortools")
+    from geracao import METODO_FALLBACK, resultado_do_algoritmo
+
+    aulas = escola.grade_valida()
+    assert resultado_do_algoritmo(aulas, "Google OR-Tools")
+    assert not resultado_do_algoritmo([], "Google OR-Tools")
+    assert not resultado_do_algoritmo(aulas, METODO_FALLBACK)
+    assert not resultado_do_algoritmo(aulas, f"Google OR-Tools + {METODO_FALLBACK} (decomposto em 2 partes)")
@@ -0,0 +1,59 @@
+from carga_turmas import IndiceCargas, calcular_carga_maxima
+
+from tests import escola
+
+
+def _nomes(carga):
+    return sorted(d.nome for d in carga.disciplinas)
+
+
+def test_carga_das_disciplinas_do_mesmo_grupo():
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    disciplinas.append(escola.Disciplina(nome="Artes", carga_semanal=2, tipo="leve", turmas=["6A"], grupo="B"))
+    carga = IndiceCargas(turmas, disciplinas).carga(turmas[0])
+    assert _nomes(carga) == ["Matemática", "Português"]
+    assert carga.carga_total == 10
+    assert carga.segmento == "EF_II" and carga.carga_maxima == 25 and not carga.excedida
+
+
+def test_edicao_de_disciplina_atualiza_so_as_turmas_afetadas():
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    indice = IndiceCargas(turmas, disciplinas)
+    carga_6a, carga_7a = indice.carga(turmas[0]), indice.carga(turmas[1])
+
+    disciplinas[0].turmas = ["7A"]
+    indice.disciplina_alterada(disciplinas[0])
+    assert _nomes(indice.carga(turmas[0])) == ["Português"]
+    assert indice.carga(turmas[1]) is not carga_7a  # recalculada
+    assert indice.carga(turmas[0]) is not carga_6a
+
+    nova = escola.Disciplina(nome="Ciências", carga_semanal=3, tipo="leve", turmas=["7A"], grupo="A")
+    disciplinas.append(nova)
+    indice.disciplina_alterada(nova)
+    assert indice.carga(turmas[1]).carga_total == 13
+    assert not indice.desatualizado(turmas, disciplinas)
+
+    disciplinas.remove(nova)
+    indice.disciplina_removida(nova)
+    assert indice.carga(turmas[1]).carga_total == 10
+
+
+def test_turma_renomeada_e_segmento():
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    indice = IndiceCargas(turmas, disciplinas)
+    turma = turmas[1]
+    turma.nome, turma.segmento, turma.serie = "1EM", "EM", "1em"
+    indice.turma_alterada(turma, nome_anterior="7A")
+    assert indice.segmento("1EM") == "EM"
+    assert indice.carga(turma).disciplinas == []  # disciplinas ainda apontam para "7A"
+    assert indice.carga(turma).carga_maxima == calcular_carga_maxima("1em") == 35
+    assert indice.segmento("3EM B") == "EM"  # turma desconhecida: pelo nome
+
+
+def test_lista_alterada_sem_avisar_fica_desatualizada():
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    indice = IndiceCargas(turmas, disciplinas)
+    assert not indice.desatualizado(turmas, disciplinas)
+    turmas.append(escola.Turma(nome="8A", serie="8", grupo="A", segmento="EF_II"))
+    assert indice.desatualizado(turmas, disciplinas)
+    assert indice.desatualizado(list(turmas), disciplinas)
@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("scheduler_ortools")  # decomposicao importa os agendadores via geracao
+
+import decomposicao  # noqa: E402
+from decomposicao import conflitos_salas, gerar_aulas_decompostas, particionar, realocar_salas  # noqa: E402
+from grade_index import DIAS_ORDENADOS  # noqa: E402
+from validacao import validar_grade  # noqa: E402
+
+from tests import escola  # noqa: E402
+
+SLOTS_EF_II = [(dia, h) for dia in DIAS_ORDENADOS for h in (1, 2, 4, 5, 6)]
+
+
+def _escola_separada():
+    """6A (grupo A) e 6B (grupo B), cada uma com seus professores"""
+    turmas = [escola.Turma(nome="6A", serie="6", grupo="A", segmento="EF_II"),
+              escola.Turma(nome="6B", serie="6", grupo="B", segmento="EF_II")]
+    professores = [
+        escola.Professor(nome="Ana", disciplinas=["Matemática"], grupo="A"),
+        escola.Professor(nome="Bia", disciplinas=["Matemática"], grupo="B"),
+    ]
+    disciplinas = [
+        escola.Disciplina(nome="Matemática", carga_semanal=4, tipo="pesada", turmas=["6A"], grupo="A"),
+        escola.Disciplina(nome="Matemática", carga_semanal=4, tipo="pesada", turmas=["6B"], grupo="B"),
+    ]
+    for professor in professores:
+        professor.mascara_disponibilidade = (1 << 40) - 1
+    return turmas, professores, disciplinas
+
+
+def gerar_em_sequencia(algoritmo, turmas, professores, disciplinas, salas, tempo_limite=None, semente=None,
+                       **opcoes):
+    """Gerador determinístico: cada turma da parte ocupa os próximos horários, sempre na primeira sala"""
+    aulas = []
+    slots = iter(SLOTS_EF_II)
+    for turma in turmas:
+        for disc in disciplinas:
+            if turma.nome not in disc.turmas:
+                continue
+            professor = next(p.nome for p in professores if disc.nome in p.disciplinas and p.grupo == turma.grupo)
+            for _ in range(disc.carga_semanal):
+                dia, horario = next(slots)
+                aulas.append(escola.Aula(turma=turma.nome, disciplina=disc.nome, professor=professor,
+                                         sala=salas[0].nome, dia=dia, horario=horario, grupo=turma.grupo))
+    return aulas, "Sequencial", None
+
+
+def test_particiona_por_professor_compartilhado():
+    turmas, professores, disciplinas = _escola_separada()
+    assert sorted(len(c.turmas) for c in particionar(turmas, professores, disciplinas)) == [1, 1]
+
+    professores.append(escola.Professor(nome="Caio", disciplinas=["Matemática"], grupo="AMBOS"))
+    componentes = particionar(turmas, professores, disciplinas)
+    assert len(componentes) == 1
+    assert {t.nome for t in componentes[0].turmas} == {"6A", "6B"}
+
+
+def test_realoca_aula_que_divide_a_sala_para_uma_sala_adequada():
+    salas = [escola.Sala(nome="Sala 1", tipo="normal"), escola.Sala(nome="Lab", tipo="laboratório"),
+             escola.Sala(nome="Sala 2", tipo="normal")]
+    aulas = [
+        escola.Aula(turma="6A", disciplina="Matemática", professor="Ana", sala="Sala 1", dia="segunda", horario=1),
+        escola.Aula(turma="6B", disciplina="Matemática", professor="Bia", sala="Sala 1", dia="segunda", horario=1),
+    ]
+    assert conflitos_salas(aulas) == [("Sala 1", "segunda", 1)]
+    assert realocar_salas(aulas, salas, escola.disciplinas()) == 1
+    assert aulas[1].sala == "Sala 2"  # a primeira livre do tipo certo, não o laboratório
+    assert conflitos_salas(aulas) == []
+
+
+def test_uniao_troca_sala_em_vez_de_resolver_de_novo(monkeypatch):
+    monkeypatch.setattr(decomposicao, "gerar_aulas", gerar_em_sequencia)
+    turmas, professores, disciplinas = _escola_separada()
+    salas = [escola.Sala(nome="Sala 1", tipo="normal"), escola.Sala(nome="Sala 2", tipo="normal")]
+
+    aulas, metodo, aviso = gerar_aulas_decompostas("x", turmas, professores, disciplinas, salas, max_processos=2)
+    assert "decomposto em 2 partes" in metodo
+    assert conflitos_salas(aulas) == []
+    assert validar_grade(aulas, turmas, professores, disciplinas).valida
+    assert "mudaram de sala" in aviso and "novamente em conjunto" not in aviso
+
+
+def test_sala_sem_alternativa_resolve_as_partes_juntas_e_confere_de_novo(monkeypatch):
+    monkeypatch.setattr(decomposicao, "gerar_aulas", gerar_em_sequencia)
+    turmas, professores, disciplinas = _escola_separada()
+    salas = [escola.Sala(nome="Sala 1", tipo="normal")]
+
+    aulas, metodo, aviso = gerar_aulas_decompostas("x", turmas, professores, disciplinas, salas, max_processos=2)
+    assert "2 partes foram resolvidas novamente em conjunto" in aviso
+    assert "ainda tem" not in aviso
+    assert len(aulas) == 8
+    assert conflitos_salas(aulas) == []
+    assert validar_grade(aulas, turmas, professores, disciplinas).valida
@@ -0,0 +1,46 @@
+from disponibilidade import (
+    MASCARA_SEMANA, bit_slot, campos_formato_antigo, definir_disponibilidade, disponivel, mascara_professor,
+    migrar_formato_antigo
+)
+from tests.escola import Professor
+
+
+def test_migracao_do_formato_antigo():
+    mascara = migrar_formato_antigo(["seg", "quarta"], {"seg_3", "qua_8", "sex_1"})
+    assert disponivel(mascara, "segunda", 1)
+    assert not disponivel(mascara, "seg", 3)
+    assert not disponivel(mascara, "quarta", 8)
+    assert not disponivel(mascara, "terca", 1)
+    assert not disponivel(mascara, "sexta", 1)
+    assert bin(mascara).count("1") == 2 * 8 - 2
+
+
+def test_ida_e_volta_pelo_formato_antigo():
+    mascara = MASCARA_SEMANA & ~(1 << bit_slot("terca", 2)) & ~(1 << bit_slot("sexta", 6))
+    mascara &= ~(0xFF << bit_slot("quinta", 1))
+    dias, indisponiveis = campos_formato_antigo(mascara)
+    assert dias == {"segunda", "terca", "quarta", "sexta"}
+    assert indisponiveis == {"ter_2", "sex_6"}
+    assert migrar_formato_antigo(dias, indisponiveis) == mascara
+
+
+def test_professor_antigo_migra_na_primeira_leitura():
+    professor = Professor(nome="Ana", disponibilidade=["segunda"], horarios_indisponiveis=["seg_2"])
+    mascara = mascara_professor(professor)
+    assert professor.mascara_disponibilidade == mascara
+    assert not disponivel(mascara, "segunda", 2)
+
+    # A máscara gravada vale mais que os campos antigos
+    professor.horarios_indisponiveis = []
+    assert mascara_professor(professor) == mascara
+
+
+def test_definir_disponibilidade_atualiza_campos_antigos():
+    professor = Professor(nome="Ana", disponibilidade=set(), horarios_indisponiveis=set())
+    mascara = 1 << bit_slot("quarta", 4) | 1 << bit_slot("quarta", 5)
+    definir_disponibilidade(professor, mascara)
+    assert professor.mascara_disponibilidade == mascara
+    assert professor.disponibilidade == {"quarta"}
+    assert "qua_1" in professor.horarios_indisponiveis
+    assert "qua_4" not in professor.horarios_indisponiveis
+    assert migrar_formato_antigo(professor.disponibilidade, professor.horarios_indisponiveis) == mascara
@@ -0,0 +1,65 @@
+import io
+
+import pandas as pd
+import pytest
+
+import exportacao
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio():
+    exportacao._cache.clear()
+    yield
+    exportacao._cache.clear()
+
+
+def abrir(dados):
+    return openpyxl.load_workbook(io.BytesIO(dados))
+
+
+def test_grade_com_estatisticas():
+    df = pd.DataFrame({"Turma": ["6A", "6B"], "Sala": ["Sala 1", None]})
+    pasta = abrir(exportacao.exportar_grade(df, [("Total de aulas", 2)]))
+    assert pasta.sheetnames == ["Grade_Completa", "Estatísticas"]
+    assert list(pasta["Grade_Completa"].values) == [("Turma", "Sala"), ("6A", "Sala 1"), ("6B", None)]
+    assert list(pasta["Estatísticas"].values) == [("Estatística", "Valor"), ("Total de aulas", 2)]
+
+
+def test_uma_aba_por_professor_com_nome_valido():
+    resumo = pd.DataFrame({"Professor": ["Ana", "Bruno/Beto"], "Aulas": [2, 1]})
+    aulas = pd.DataFrame({
+        "Professor": ["Ana", "Ana", "Bruno/Beto"],
+        "Turma": ["6A", "6B", "6A"],
+        "Horário": [1, 2, 4],
+    })
+    pasta = abrir(exportacao.exportar_professores(resumo, aulas))
+    assert pasta.sheetnames == ["Resumo_Professores", "Ana", "Bruno_Beto"]
+    assert list(pasta["Ana"].values) == [("Turma", "Horário"), ("6A", 1), ("6B", 2)]
+    assert list(pasta["Bruno_Beto"].values) == [("Turma", "Horário"), ("6A", 4)]
+
+
+def test_cache_gera_uma_vez_por_chave():
+    chamadas = []
+
+    def gerar():
+        chamadas.append(1)
+        return b"xlsx"
+
+    assert exportacao.exportacao_pronta("v1") is None
+    assert exportacao.obter_exportacao("v1", gerar) == b"xlsx"
+    assert exportacao.obter_exportacao("v1", gerar) == b"xlsx"
+    assert len(chamadas) == 1
+    assert exportacao.exportacao_pronta("v1") == b"xlsx"
+
+
+def test_cache_descarta_as_mais_antigas(monkeypatch):
+    monkeypatch.setattr(exportacao, "LIMITE_EXPORTACOES", 2)
+    for chave in ("v1", "v2"):
+        exportacao.obter_exportacao(chave, lambda: chave.encode())
+    exportacao.exportacao_pronta("v1")  # v1 volta a ser a mais recente
+    exportacao.obter_exportacao("v3", lambda: b"v3")
+    assert exportacao.exportacao_pronta("v2") is None
+    assert exportacao.exportacao_pronta("v1") == b"v1"
+    assert exportacao.exportacao_pronta("v3") == b"v3"
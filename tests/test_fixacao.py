@@ -0,0 +1,129 @@
+import pytest
+
+from disponibilidade import bit_slot, mascara_professor
+from fixacao import ErroFixas, completar_com_fixas, gerar_com_fixas, reduzir_problema
+from grade_index import DIAS_ORDENADOS
+from validacao import validar_grade
+
+from tests import escola
+
+SLOTS_EF_II = [(dia, h) for dia in DIAS_ORDENADOS for h in (1, 2, 4, 5, 6)]
+
+
+def _fixa(turma, disciplina, professor, dia, horario, sala="Sala 1"):
+    return escola.Aula(turma=turma, disciplina=disciplina, professor=professor, sala=sala, dia=dia,
+                       horario=horario, grupo="A", fixa=True)
+
+
+def _fixas():
+    return [_fixa("6A", "Matemática", "Ana", "segunda", 4), _fixa("6A", "Matemática", "Ana", "terca", 4)]
+
+
+def _aula(turma, disciplina, professor, dia, horario, sala="Sala 1"):
+    return escola.Aula(turma=turma, disciplina=disciplina, professor=professor, sala=sala, dia=dia,
+                       horario=horario, grupo="A")
+
+
+def gerar_guloso(algoritmo, turmas, professores, disciplinas, salas, **opcoes):
+    """Agendador mínimo que só conhece a disponibilidade dos professores, mais restrito primeiro"""
+    demandas = [
+        (turma, disc, [p for p in professores if disc.nome in p.disciplinas])
+        for disc in disciplinas for turma in turmas if turma.nome in disc.turmas
+    ]
+    demandas.sort(key=lambda d: sum(bin(mascara_professor(p)).count("1") for p in d[2]))
+    ocupados, aulas = set(), []
+    for turma, disc, qualificados in demandas:
+        for _ in range(disc.carga_semanal):
+            for dia, horario in SLOTS_EF_II:
+                professor = next((
+                    p.nome for p in qualificados
+                    if mascara_professor(p) >> bit_slot(dia, horario) & 1 and (p.nome, dia, horario) not in ocupados
+                ), None)
+                if professor and (turma.nome, dia, horario) not in ocupados:
+                    ocupados.update({(turma.nome, dia, horario), (professor, dia, horario)})
+                    aulas.append(_aula(turma.nome, disc.nome, professor, dia, horario, salas[0].nome))
+                    break
+    return aulas, "Guloso", None
+
+
+def test_reducao_tira_carga_e_horarios_das_fixas_sem_mudar_os_originais():
+    turmas, professores, disciplinas = escola.turmas(), escola.professores(), escola.disciplinas()
+    problema = reduzir_problema(_fixas(), turmas, professores, disciplinas)
+
+    cargas = {(d.nome, tuple(d.turmas)): d.carga_semanal for d in problema.disciplinas}
+    assert cargas == {
+        ("Matemática", ("7A",)): 5,
+        ("Matemática · 6A", ("6A",)): 3,
+        ("Português", ("6A", "7A")): 5,
+        ("🔒 Fixas 6A", ("6A",)): 2,
+    }
+    assert len({d.nome for d in problema.disciplinas}) == len(problema.disciplinas)
+    assert disciplinas[0].turmas == ["6A", "7A"] and disciplinas[0].carga_semanal == 5
+
+    ana = next(p for p in problema.professores if p.nome == "Ana")
+    assert ana.disciplinas == ["Matemática", "Matemática · 6A"]
+    fixados = 1 << bit_slot("segunda", 4) | 1 << bit_slot("terca", 4)
+    assert mascara_professor(ana) == escola.MASCARA_SEMANA & ~fixados
+    assert professores[0].disciplinas == ["Matemática"]
+    assert professores[0].mascara_disponibilidade == escola.MASCARA_SEMANA
+
+    bloqueio = next(p for p in problema.professores if p.nome == "🔒 Fixas 6A")
+    assert bloqueio.disciplinas == ["🔒 Fixas 6A"]
+    assert mascara_professor(bloqueio) == fixados
+
+
+def test_completar_restaura_nomes_e_tira_as_aulas_de_bloqueio():
+    fixas = _fixas()
+    problema = reduzir_problema(fixas, escola.turmas(), escola.professores(), escola.disciplinas())
+    geradas = [
+        _aula("6A", "🔒 Fixas 6A", "🔒 Fixas 6A", "segunda", 4),
+        _aula("6A", "Matemática · 6A", "Ana", "quarta", 4),
+        _aula("7A", "Matemática", "Ana", "quarta", 5),
+    ]
+    aulas, aviso = completar_com_fixas(geradas, fixas, problema, escola.salas(), escola.disciplinas())
+    assert [(a.turma, a.disciplina, a.dia, a.horario) for a in aulas] == [
+        ("6A", "Matemática", "segunda", 4), ("6A", "Matemática", "terca", 4),
+        ("6A", "Matemática", "quarta", 4), ("7A", "Matemática", "quarta", 5),
+    ]
+    assert "2 aula(s) fixa(s)" in aviso
+
+
+def test_aula_gerada_no_horario_de_uma_fixa_falha():
+    fixas = _fixas()
+    problema = reduzir_problema(fixas, escola.turmas(), escola.professores(), escola.disciplinas())
+    geradas = [_aula("6A", "Português", "Bruno", "segunda", 4)]
+    with pytest.raises(ErroFixas, match="Português da 6A, segunda 4º"):
+        completar_com_fixas(geradas, fixas, problema, escola.salas(), escola.disciplinas())
+
+
+def test_aula_na_sala_de_uma_fixa_muda_de_sala_ou_falha():
+    fixas = _fixas()
+    problema = reduzir_problema(fixas, escola.turmas(), escola.professores(), escola.disciplinas())
+    salas = [escola.Sala(nome="Sala 1", tipo="normal"), escola.Sala(nome="Sala 2", tipo="normal")]
+
+    geradas = [_aula("7A", "Português", "Bruno", "segunda", 4)]
+    aulas, aviso = completar_com_fixas(geradas, fixas, problema, salas, escola.disciplinas())
+    assert aulas[-1].sala == "Sala 2" and aulas[0].sala == "Sala 1"
+    assert "1 aula(s) gerada(s) mudaram de sala" in aviso
+
+    geradas = [_aula("7A", "Português", "Bruno", "segunda", 4)]
+    with pytest.raises(ErroFixas, match="Sala 1, segunda 4º"):
+        completar_com_fixas(geradas, fixas, problema, salas[:1], escola.disciplinas())
+
+
+def test_agendador_que_so_le_disponibilidade_nao_usa_os_horarios_fixados():
+    turmas, professores, disciplinas = escola.turmas(), escola.professores(), escola.disciplinas()
+    salas = [escola.Sala(nome="Sala 1", tipo="normal"), escola.Sala(nome="Sala 2", tipo="normal"),
+             escola.Sala(nome="Sala 3", tipo="normal")]
+    fixas = _fixas() + [_fixa("7A", "Português", "Bruno", "segunda", 1, sala="Sala 2")]
+
+    aulas, metodo, aviso = gerar_com_fixas(
+        gerar_guloso, fixas, "x", turmas, professores, disciplinas, salas
+    )
+    assert metodo == "Guloso"
+    assert "3 aula(s) fixa(s)" in aviso
+    assert len(aulas) == 20
+    assert all(a in aulas for a in fixas)
+    assert validar_grade(aulas, turmas, professores, disciplinas).valida
+    ocupadas = [(a.sala, a.dia, a.horario) for a in aulas]
+    assert len(set(ocupadas)) == len(ocupadas)
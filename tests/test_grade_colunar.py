@@ -0,0 +1,70 @@
+import copy
+import pickle
+
+from grade_colunar import GradeColunar
+
+from tests import escola
+
+
+def _aulas():
+    aulas = escola.grade_valida()
+    for numero, aula in enumerate(aulas):
+        aula.id = numero
+    aulas[0].fixa = True
+    aulas[1].observacao = "troca combinada"  # atributo só de uma aula
+    aulas[2].sala = None
+    return aulas
+
+
+def test_ida_e_volta_preserva_colunas_e_atributos_extras():
+    aulas = _aulas()
+    grade = GradeColunar(aulas)
+    assert len(grade) == len(aulas)
+
+    materializadas = grade.aulas()
+    for original, linha, nova in zip(aulas, grade, materializadas):
+        assert type(nova) is escola.Aula
+        assert escola.campos(linha) == escola.campos(nova) == escola.campos(original)
+        assert linha.id == nova.id == original.id
+        assert nova.fixa == getattr(original, "fixa", False)
+    assert materializadas[1].observacao == "troca combinada"
+    assert not hasattr(materializadas[0], "observacao")
+    assert not hasattr(grade[0], "observacao")
+
+    # A cópia de uma linha é independente da grade
+    copia = copy.copy(grade[3])
+    copia.horario = 6
+    assert grade[3].horario == aulas[3].horario
+
+
+def test_grade_refeita_a_partir_das_linhas_tem_a_mesma_versao():
+    grade = GradeColunar(_aulas())
+    assert GradeColunar(list(grade)).versao() == grade.versao()
+    assert GradeColunar(grade.aulas()).versao() == grade.versao()
+    assert grade.com_fixas([4]).versao() != grade.versao()
+
+
+def test_pickle_preserva_a_grade():
+    grade = GradeColunar(_aulas())
+    lida = pickle.loads(pickle.dumps(grade))
+    assert lida.versao() == grade.versao()
+    assert [escola.campos(a) for a in lida] == [escola.campos(a) for a in grade]
+    assert [a.id for a in lida.aulas()] == [a.id for a in grade.aulas()]
+    assert not hasattr(lida[0], "observacao")
+
+
+def test_rotulos_de_aulas_sem_turma_ficam_vazios():
+    aulas = _aulas()
+    aulas[5].turma = None
+    grade = GradeColunar(aulas)
+    chamadas = []
+
+    def formatar(turma, horario):
+        chamadas.append((turma, horario))
+        return f"{turma} {horario}º"
+
+    rotulos = list(grade.rotulos_turma_horario(formatar))
+    assert rotulos[5] == ""
+    assert rotulos[0] == f"{aulas[0].turma} {aulas[0].horario}º"
+    assert all(turma is not None for turma, _ in chamadas)
+    assert len(chamadas) == len(set(chamadas))
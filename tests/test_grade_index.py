@@ -0,0 +1,56 @@
+from disponibilidade import NUM_HORARIOS, disponivel
+from grade_index import DIAS_ORDENADOS, IndiceGrade, chave_dia_horario, chave_ordenacao_aula
+
+from tests import escola
+
+
+def _aulas():
+    aulas = escola.grade_valida()
+    # Slot repetido: o índice precisa devolver a primeira aula, como a busca linear
+    aulas.append(escola.Aula(
+        turma="6A", disciplina="Português", professor="Bruno", sala="Sala 1", dia="segunda", horario=1, grupo="A"
+    ))
+    return aulas
+
+
+def test_aula_no_slot_igual_a_busca_linear():
+    aulas = _aulas()
+    indice = IndiceGrade(aulas)
+    for turma in ("6A", "7A", "8A"):
+        for dia in DIAS_ORDENADOS:
+            for horario in range(1, NUM_HORARIOS + 1):
+                linear = next(
+                    (a for a in aulas if a.turma == turma and a.dia == dia and a.horario == horario), None
+                )
+                assert indice.aula_no_slot(turma, dia, horario) is linear
+
+
+def test_agregados_por_turma_e_professor_iguais_a_busca_linear():
+    aulas = _aulas()
+    indice = IndiceGrade(aulas)
+
+    assert indice.turmas() == sorted({a.turma for a in aulas})
+    for turma in indice.turmas():
+        linear = sorted((a for a in aulas if a.turma == turma), key=chave_ordenacao_aula)
+        assert indice.aulas_turma(turma) == linear
+
+    assert indice.professores() == sorted({a.professor for a in aulas})
+    for professor in indice.professores() + ["Carla"]:
+        do_professor = [a for a in aulas if a.professor == professor]
+        resumo = indice.resumo_professor(professor)
+        assert resumo.total_aulas == len(do_professor)
+        assert resumo.turmas == {a.turma for a in do_professor}
+        assert resumo.disciplinas == {a.disciplina for a in do_professor}
+        assert indice.aulas_professor(professor) == sorted(do_professor, key=chave_dia_horario)
+
+
+def test_grade_professor_marca_ocupacao_e_indisponibilidade():
+    aulas = _aulas()
+    mascara = escola.professores()[0].mascara_disponibilidade & ~1  # Ana não pode na segunda, 1º horário
+    grade = IndiceGrade(aulas).grade_professor("Ana", mascara)
+    for dia in DIAS_ORDENADOS:
+        for horario in range(1, NUM_HORARIOS + 1):
+            linear = next((a for a in aulas if a.professor == "Ana" and a.dia == dia and a.horario == horario), None)
+            assert grade.aula_no_slot(dia, horario) is linear
+            assert grade.esta_indisponivel(dia, horario) == (not disponivel(mascara, dia, horario))
+    assert grade.aulas_por_dia() == [2] * len(DIAS_ORDENADOS)
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+pytest.importorskip("models")  # importacao cria os objetos do modelo
+
+import importacao  # noqa: E402
+from disponibilidade import disponivel  # noqa: E402
+
+from tests import escola  # noqa: E402
+
+
+def csv(nome, texto):
+    arquivo = io.BytesIO(texto.encode("utf-8"))
+    arquivo.name = nome
+    return arquivo
+
+
+def test_importa_na_ordem_das_dependencias():
+    # Professores antes das disciplinas e turmas no upload: a ordem é a das dependências
+    arquivos = [
+        csv("professores.csv", "nome;disciplinas;disponibilidade;horarios_indisponiveis\n"
+                               "Carla;Ciências;seg,ter;seg_1\n"),
+        csv("disciplinas.csv", "nome;carga_semanal;tipo;turmas\nCiências;3;pratica;8A\n"),
+        csv("turmas.csv", "nome;serie\n8A;8ano\n"),
+    ]
+    resultado = importacao.importar(arquivos, [], [], [], [])
+    assert resultado.erros == []
+    assert [len(resultado.novos[t]) for t in importacao.ORDEM_TIPOS] == [1, 1, 1, 0]
+    carla = resultado.novos["professores"][0]
+    assert not disponivel(carla.mascara_disponibilidade, "segunda", 1)
+    assert disponivel(carla.mascara_disponibilidade, "terca", 1)
+    assert not disponivel(carla.mascara_disponibilidade, "quarta", 1)
+
+
+def test_referencia_ruim_rejeita_a_importacao_inteira():
+    dados = {
+        "turmas": [{"nome": "8A", "serie": "8ano"}],
+        "disciplinas": [
+            {"nome": "Ciências", "carga_semanal": 3, "turmas": ["8A"]},
+            {"nome": "Artes", "carga_semanal": 2, "turmas": ["9Z"]},
+        ],
+        "professores": [{"nome": "Carla", "disciplinas": ["Ciências", "Artes"]}],
+    }
+    resultado = importacao.importar_dados(dados)
+    assert all(objetos == [] for objetos in resultado.novos.values())
+    assert resultado.linhas_lidas == 4
+    assert ("disciplinas", 2, "Turmas não cadastradas: 9Z") in resultado.erros
+    assert ("professores", 1, "Disciplinas não cadastradas: Artes") in resultado.erros
+
+
+def test_referencias_conferidas_contra_o_que_ja_existe():
+    dados = {
+        "turmas": [{"nome": "6A", "serie": "6ano"}],
+        "disciplinas": [{"nome": "Artes", "carga_semanal": 2, "turmas": "6A;7A"}],
+    }
+    resultado = importacao.importar_dados(dados, turmas=escola.turmas())
+    assert resultado.erros == [("turmas", 1, "Turma '6A' já cadastrada")]
+    assert resultado.total_novos == 0
+
+    del dados["turmas"]
+    resultado = importacao.importar_dados(dados, turmas=escola.turmas())
+    assert resultado.erros == []
+    assert resultado.novos["disciplinas"][0].turmas == ["6A", "7A"]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytest.importorskip("scheduler_ortools")  # linha_comando importa os agendadores via geracao
+
+import geracao  # noqa: E402
+import linha_comando  # noqa: E402
+
+from tests import escola  # noqa: E402
+
+
+def limite_visto_pelo_solver(segundos):
+    """Resolve um modelo trivial sob `tempo_limite_cp_sat` e devolve o limite aplicado"""
+    from ortools.sat.python import cp_model
+
+    modelo = cp_model.CpModel()
+    modelo.NewBoolVar("x")
+    solver = cp_model.CpSolver()
+    with geracao.tempo_limite_cp_sat(segundos):
+        solver.Solve(modelo)
+    return solver.parameters.max_time_in_seconds
+
+
+def test_lote_jsonl_gera_uma_grade_por_escola_e_aponta_a_invalida(tmp_path, capsys):
+    entrada = tmp_path / "campi.jsonl"
+    ruim = escola.escola_json("ruim")
+    ruim["disciplinas"][0]["turmas"] = ["9Z"]
+    entrada.write_text("\n".join(json.dumps(e) for e in (escola.escola_json("norte"), ruim, escola.escola_json("sul", 3))),
+                       encoding="utf-8")
+    saida = tmp_path / "grades"
+
+    codigo = linha_comando.main([str(entrada), "-o", str(saida), "--processos", "2"])
+
+    assert codigo == 1  # uma escola falhou, as outras foram geradas
+    assert sorted(p.name for p in saida.iterdir()) == ["norte.json", "sul.json"]
+    sul = json.loads((saida / "sul.json").read_text(encoding="utf-8"))
+    assert sul["escola"] == "sul"
+    assert len(sul["aulas"]) == sul["estatisticas"]["Aulas alocadas"] == 3
+    assert sul["estatisticas"]["Conflitos de professor"] == 0
+    erros = capsys.readouterr().err
+    assert "escola_2" in erros and "9Z" in erros  # sem importar, fica o nome pela linha
+
+
+def test_diretorio_com_nomes_repetidos_e_csv(tmp_path):
+    entrada = tmp_path / "escolas"
+    entrada.mkdir()
+    for arquivo in ("a.json", "b.json"):
+        (entrada / arquivo).write_text(json.dumps(escola.escola_json("campus")), encoding="utf-8")
+    saida = tmp_path / "grades"
+
+    assert linha_comando.main([str(entrada), "-f", "csv", "-o", str(saida)]) == 0
+    assert sorted(p.name for p in saida.iterdir()) == ["campus.csv", "campus_2.csv"]
+    assert len((saida / "campus.csv").read_text(encoding="utf-8").splitlines()) == 1 + 2
+
+
+def test_limite_do_cp_sat_vale_so_no_processo_dedicado():
+    cp_model = pytest.importorskip("ortools.sat.python.cp_model")
+    original = cp_model.CpSolver.Solve
+    assert geracao.em_processo_dedicado(limite_visto_pelo_solver, 5) == 5.0
+    assert cp_model.CpSolver.Solve is original
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import persistencia
+from persistencia import Persistidor
+
+
+class Gravador:
+    """Faz o papel de auto_save.salvar_tudo: conta as chamadas"""
+
+    def __init__(self, resultado=True):
+        self.resultado = resultado
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        if isinstance(self.resultado, Exception):
+            raise self.resultado
+        return self.resultado
+
+
+class Grade:
+    def __init__(self, versao):
+        self._versao = versao
+
+    def versao(self):
+        return self._versao
+
+
+def turma(nome, turno="manha"):
+    return SimpleNamespace(id=nome, nome=nome, turno=turno)
+
+
+def test_alteracoes_em_sequencia_viram_uma_gravacao():
+    salvar = Gravador()
+    persistidor = Persistidor(salvar)
+    for nome in ("6A", "6B", "7A"):
+        persistidor.alterado("turmas", turma(nome))
+    persistidor.removido("salas", SimpleNamespace(nome="Sala 1"))
+    persistidor.grade_alterada(Grade("v1"))
+
+    assert persistidor.descarregar()
+    assert salvar.chamadas == 1
+    assert persistidor.alteracoes_gravadas == 5
+    assert not persistidor.pendente()
+    assert persistidor.descarregar()
+    assert salvar.chamadas == 1
+
+
+def test_aviso_sem_mudanca_nao_fica_pendente():
+    persistidor = Persistidor(Gravador())
+    persistidor.conhecer({"turmas": [turma("6A")]}, Grade("v1"))
+    assert not persistidor.pendente()
+
+    persistidor.alterado("turmas", turma("6A"))
+    persistidor.grade_alterada(Grade("v1"))
+    assert not persistidor.pendente()
+
+    persistidor.alterado("turmas", turma("6A", turno="tarde"))
+    assert persistidor.pendente()
+
+
+def test_vencido_so_depois_do_atraso(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(persistencia.time, "monotonic", lambda: agora[0])
+    persistidor = Persistidor(Gravador(), atraso=1.0)
+    assert not persistidor.vencido()
+
+    persistidor.alterado("turmas", turma("6A"))
+    agora[0] += 0.5
+    persistidor.alterado("turmas", turma("6B"))
+    assert not persistidor.vencido()
+    agora[0] += 0.5
+    assert persistidor.vencido()
+
+
+def test_falha_mantem_pendente():
+    salvar = Gravador(False)
+    persistidor = Persistidor(salvar)
+    persistidor.alterado("turmas", turma("6A"))
+    assert not persistidor.descarregar()
+    assert persistidor.pendente()
+    assert persistidor.ultimo_erro
+
+    salvar.resultado = OSError("disco cheio")
+    assert not persistidor.descarregar()
+    assert "disco cheio" in persistidor.ultimo_erro
+
+    salvar.resultado = True
+    assert persistidor.descarregar()
+    assert not persistidor.pendente()
+    assert persistidor.ultimo_erro is None
+    assert persistidor.gravacoes == 1
+
+
+def test_forcar_grava_sem_pendencia():
+    salvar = Gravador()
+    persistidor = Persistidor(salvar)
+    assert persistidor.descarregar(forcar=True)
+    assert salvar.chamadas == 1
+
+
+def test_descartar_esquece_pendencias_sem_gravar():
+    salvar = Gravador()
+    persistidor = Persistidor(salvar)
+    persistidor.alterado("turmas", turma("6A"))
+    persistidor.descartar()
+    assert not persistidor.pendente()
+    assert persistidor.descarregar()
+    assert salvar.chamadas == 0
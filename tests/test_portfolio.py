@@ -0,0 +1,71 @@
+import os
+import random
+import time
+
+import pytest
+
+pytest.importorskip("scheduler_ortools")  # geracao importa os agendadores
+
+import geracao  # noqa: E402
+from portfolio import aulas_necessarias, gerar_aulas_portfolio, pontuar_grade  # noqa: E402
+from tarefas import CONCLUIDA, GerenciadorTarefas  # noqa: E402
+
+from tests import escola  # noqa: E402
+
+
+def pid_da_geracao():
+    """Roda dentro de uma tarefa: (pid da tarefa, pid onde a geração dedicada rodou)"""
+    return os.getpid(), geracao.em_processo_dedicado(os.getpid)
+
+
+def _esperar(gerenciador, id_tarefa, limite=60):
+    fim = time.time() + limite
+    while time.time() < fim:
+        tarefa = gerenciador.status(id_tarefa)
+        if tarefa.finalizada:
+            return tarefa
+        time.sleep(0.05)
+    raise AssertionError("tarefa não terminou")
+
+
+def test_pontuacao_prefere_completa_depois_sem_conflito():
+    grade = escola.grade_valida()
+    necessarias = aulas_necessarias(escola.turmas(), escola.disciplinas())
+    assert necessarias == len(grade) == 20
+
+    com_conflito = grade[:-1] + [escola.Aula(**{**vars(grade[0]), "turma": "7A"})]
+    incompleta = grade[:-1]
+    assert pontuar_grade(grade, necessarias) > pontuar_grade(com_conflito, necessarias)
+    assert pontuar_grade(com_conflito, necessarias) > pontuar_grade(incompleta, necessarias)
+
+
+def test_geracao_com_semente_fora_de_processo_dedicado_nao_mexe_no_random():
+    assert geracao.em_processo_dedicado(os.getpid) != os.getpid()
+
+    random.seed(123)
+    estado = random.getstate()
+    aulas = geracao.gerar_simples(escola.turmas(), escola.professores(), escola.disciplinas(), escola.salas(),
+                                  semente=7)
+    assert aulas
+    assert random.getstate() == estado
+
+
+def test_dentro_de_uma_tarefa_a_geracao_roda_no_proprio_processo():
+    gerenciador = GerenciadorTarefas(max_processos=1)
+    try:
+        tarefa = _esperar(gerenciador, gerenciador.submeter(pid_da_geracao))
+        assert tarefa.estado == CONCLUIDA
+        pid_tarefa, pid_geracao = tarefa.resultado
+        assert pid_tarefa == pid_geracao != os.getpid()
+    finally:
+        gerenciador.encerrar_todas()
+
+
+def test_portfolio_nao_mexe_no_random_do_processo():
+    random.seed(99)
+    estado = random.getstate()
+    aulas, metodo, _ = gerar_aulas_portfolio(escola.turmas(), escola.professores(), escola.disciplinas(),
+                                             escola.salas(), num_sementes=2, orcamento=30, semente_base=5)
+    assert metodo.startswith("Portfólio → ")
+    assert aulas
+    assert random.getstate() == estado
@@ -0,0 +1,59 @@
+import numpy as np
+
+from grade_colunar import GradeColunar
+from qualidade import METRICAS, Pontuador, avaliar_grade
+
+from tests import escola
+
+
+def _pontuador():
+    return Pontuador(escola.turmas(), escola.professores(), escola.disciplinas(), escola.salas())
+
+
+def _aulas():
+    aulas = escola.grade_valida()
+    # Janela da Ana na segunda: 6A no 1º horário, 7A no 5º (o 3º é o intervalo e não conta)
+    aula = next(a for a in aulas if a.turma == "7A" and a.dia == "segunda" and a.professor == "Ana")
+    aula.horario = 5
+    aulas[0].sala = "Laboratório"  # Matemática é teórica
+    aulas.append(escola.Aula(
+        turma="6A", disciplina="Artes", professor="Zé", sala=None, dia="sexta", horario=6, grupo="A"
+    ))
+    return aulas
+
+
+def test_pontuacao_da_lista_e_da_grade_colunar_e_a_mesma():
+    pontuador = _pontuador()
+    aulas = _aulas()
+    da_lista = pontuador.pontuar(aulas)
+    da_grade = pontuador.pontuar(GradeColunar(aulas))
+    assert da_lista.metricas == da_grade.metricas
+    assert da_lista.penalidade == da_grade.penalidade
+    assert da_lista.professores_com_aula == da_grade.professores_com_aula == 2
+    assert avaliar_grade(aulas, escola.turmas(), escola.professores(), escola.disciplinas(), escola.salas()
+                         ).metricas == da_lista.metricas
+
+
+def test_metricas_da_grade_exemplo():
+    qualidade = _pontuador().pontuar(_aulas())
+    assert qualidade.metricas == {
+        "janelas": 2,
+        "dias_professor": 10,
+        "pesadas_seguidas": 9,
+        "pesadas_excesso": 0,
+        "repeticoes": 0,
+        "sala_inadequada": 1,
+    }
+    assert qualidade.penalidade == sum(METRICAS[nome][1] * valor for nome, valor in qualidade.metricas.items())
+    assert qualidade.dias_por_professor == 5
+
+
+def test_lote_pontua_cada_candidato_como_se_fosse_sozinho():
+    pontuador = _pontuador()
+    candidatos = [escola.grade_valida(), _aulas()[:20]]
+    vetores = [pontuador.codigos(aulas) for aulas in candidatos]
+    lote = pontuador.pontuar_lote(*(np.stack(coluna) for coluna in zip(*vetores)))
+    for indice, aulas in enumerate(candidatos):
+        sozinho = pontuador.pontuar(aulas)
+        assert {nome: int(lote[nome][indice]) for nome in METRICAS} == sozinho.metricas
+        assert lote["penalidade"][indice] == sozinho.penalidade
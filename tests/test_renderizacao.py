@@ -0,0 +1,83 @@
+import pytest
+
+import renderizacao
+from disponibilidade import MASCARA_SEMANA, bit_slot
+from grade_index import IndiceGrade
+from renderizacao import html_grade_professor, html_grade_turma
+
+from tests import escola
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio():
+    renderizacao._cache.clear()
+    yield
+    renderizacao._cache.clear()
+
+
+class Contador:
+    """Texto da primeira coluna, contando quantas tabelas foram montadas"""
+
+    def __init__(self):
+        self.montagens = 0
+
+    def turma(self, turma, horario):
+        if horario == 1:
+            self.montagens += 1
+        return f"{horario}º"
+
+    def professor(self, horario):
+        if horario == 1:
+            self.montagens += 1
+        return f"{horario}º"
+
+
+def test_tabela_da_turma_montada_uma_vez_por_versao():
+    indice = IndiceGrade(escola.grade_valida())
+    contador = Contador()
+    html = html_grade_turma("v1", indice, "6A", "EF_II", [1, 2, 4, 5, 6], contador.turma)
+    assert html_grade_turma("v1", indice, "6A", "EF_II", [1, 2, 4, 5, 6], contador.turma) is html
+    assert contador.montagens == 1
+    assert "INTERVALO" in html and "Matemática<br><small>Ana" in html and "LIVRE" in html
+
+    html_grade_turma("v2", indice, "6A", "EF_II", [1, 2, 4, 5, 6], contador.turma)
+    html_grade_turma("v1", indice, "7A", "EF_II", [1, 2, 4, 5, 6], contador.turma)
+    assert contador.montagens == 3
+
+
+def test_texto_escapado_e_aula_fixa_marcada():
+    aula = escola.Aula(turma="6A", disciplina="<b>Artes</b>", professor="Ana & Bia", sala="Sala 1",
+                       dia="segunda", horario=1, grupo="A", fixa=True)
+    html = html_grade_turma("v1", IndiceGrade([aula]), "6A", "EF_II", [1], lambda turma, horario: horario)
+    assert "🔒 &lt;b&gt;Artes&lt;/b&gt;" in html
+    assert "Ana &amp; Bia" in html
+
+
+def test_tabela_do_professor_refeita_quando_a_disponibilidade_muda():
+    indice = IndiceGrade(escola.grade_valida())
+    contador = Contador()
+    mascara = MASCARA_SEMANA & ~(1 << bit_slot("sexta", 8))
+    html = html_grade_professor("v1", indice.grade_professor("Ana"), "Ana", contador.professor)
+    assert "INDISPONÍVEL" not in html
+    html_grade_professor("v1", indice.grade_professor("Ana"), "Ana", contador.professor)
+    assert contador.montagens == 1
+
+    html = html_grade_professor("v1", indice.grade_professor("Ana", mascara), "Ana", contador.professor)
+    assert contador.montagens == 2
+    assert html.count("INDISPONÍVEL") == 1
+
+
+def test_cache_descarta_as_menos_usadas(monkeypatch):
+    monkeypatch.setattr(renderizacao, "LIMITE_FRAGMENTOS", 2)
+    indice = IndiceGrade(escola.grade_valida())
+    contador = Contador()
+    for turma in ("6A", "7A"):
+        html_grade_turma("v1", indice, turma, "EF_II", [], contador.turma)
+    html_grade_turma("v1", indice, "6A", "EF_II", [], contador.turma)  # 6A volta a ser a mais usada
+    html_grade_turma("v1", indice, "8A", "EF_II", [], contador.turma)
+    assert contador.montagens == 3
+
+    html_grade_turma("v1", indice, "6A", "EF_II", [], contador.turma)
+    assert contador.montagens == 3
+    html_grade_turma("v1", indice, "7A", "EF_II", [], contador.turma)
+    assert contador.montagens == 4
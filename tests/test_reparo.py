@@ -0,0 +1,58 @@
+from disponibilidade import MASCARA_SEMANA, mascara_do_dia
+from reparo import reparar_grade
+from validacao import validar_grade
+
+from tests import escola
+
+
+def test_grade_valida_nao_muda():
+    aulas = escola.grade_valida()
+    resultado = reparar_grade(aulas, escola.turmas(), escola.professores(), escola.disciplinas())
+    assert not resultado.alterou
+    assert resultado.violacoes == 0
+    assert [escola.campos(a) for a in resultado.aulas] == [escola.campos(a) for a in aulas]
+
+
+def test_professora_indisponivel_gera_grade_valida_mexendo_so_no_necessario():
+    aulas = escola.grade_valida()
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    professores = escola.professores(mascara_ana=MASCARA_SEMANA & ~mascara_do_dia("segunda"))
+    assert not validar_grade(aulas, turmas, professores, disciplinas).valida
+
+    resultado = reparar_grade(aulas, turmas, professores, disciplinas)
+    assert resultado.violacoes == 2
+    assert not resultado.nao_alocadas
+    assert validar_grade(resultado.aulas, turmas, professores, disciplinas).valida
+
+    # Saem as duas aulas da Ana na segunda e, no máximo, uma aula trocada de lugar para cada
+    removidas = [a for a in aulas if any(a is r for r in resultado.removidas)]
+    assert [a for a in removidas if a.professor == "Ana" and a.dia == "segunda"] == [
+        a for a in aulas if a.professor == "Ana" and a.dia == "segunda"
+    ]
+    assert len(removidas) <= 4
+    mantidas = [a for a in aulas if not any(a is r for r in removidas)]
+    assert all(any(a is m for m in resultado.aulas) for a in mantidas)
+
+
+def test_carga_maior_ganha_aulas_novas():
+    aulas = escola.grade_valida()
+    turmas, professores = escola.turmas(), escola.professores()
+    disciplinas = escola.disciplinas()
+    disciplinas[0].carga_semanal = 6  # Matemática
+
+    resultado = reparar_grade(aulas, turmas, professores, disciplinas)
+    assert resultado.violacoes == 2
+    assert len(resultado.adicionadas) == 2
+    assert not resultado.removidas
+    assert validar_grade(resultado.aulas, turmas, professores, disciplinas).valida
+
+
+def test_carga_menor_remove_aulas_excedentes():
+    aulas = escola.grade_valida()
+    turmas, professores = escola.turmas(), escola.professores()
+    disciplinas = escola.disciplinas(carga=4)
+
+    resultado = reparar_grade(aulas, turmas, professores, disciplinas)
+    assert len(resultado.removidas) == 4
+    assert not resultado.adicionadas
+    assert validar_grade(resultado.aulas, turmas, professores, disciplinas).valida
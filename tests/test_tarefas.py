@@ -0,0 +1,148 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import tarefas
+from tarefas import CANCELADA, CONCLUIDA, EXECUTANDO, FALHOU, PENDENTE, GerenciadorTarefas
+
+
+def somar(a, b):
+    return a + b
+
+
+def falhar():
+    raise ValueError("sem professor")
+
+
+def dormir(segundos, progresso=None):
+    if progresso is not None:
+        tarefas.reportar_progresso(progresso)
+    time.sleep(segundos)
+    return segundos
+
+
+def dormir_com_neto(arquivo_pid):
+    """Abre um subprocesso (como a geração decomposta) e espera"""
+    neto = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    with open(arquivo_pid, "w") as arquivo:
+        arquivo.write(str(neto.pid))
+    time.sleep(60)
+
+
+def _esperar(gerenciador, id_tarefa, estados=tarefas.ESTADOS_FINAIS, prazo=30):
+    fim = time.time() + prazo
+    while time.time() < fim:
+        tarefa = gerenciador.status(id_tarefa)
+        if tarefa.estado in estados:
+            return tarefa
+        time.sleep(0.05)
+    raise AssertionError(f"tarefa ainda em {tarefa.estado}")
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Processo zumbi (já encerrado, esperando o pai) conta como morto
+    try:
+        with open(f"/proc/{pid}/stat") as arquivo:
+            return arquivo.read().split()[2] != "Z"
+    except OSError:
+        return True
+
+
+@pytest.fixture
+def gerenciador():
+    gerenciador = GerenciadorTarefas(max_processos=1)
+    yield gerenciador
+    gerenciador.encerrar_todas()
+
+
+def test_resultado_vem_do_processo_filho(gerenciador):
+    id_tarefa = gerenciador.submeter(somar, args=(2, 3), info={"turma": "6A"})
+    tarefa = _esperar(gerenciador, id_tarefa)
+    assert tarefa.estado == CONCLUIDA
+    assert tarefa.resultado == 5
+    assert tarefa.info == {"turma": "6A"}
+    assert tarefa._processo.pid != os.getpid()
+    assert tarefa.tempo_decorrido > 0
+
+
+def test_excecao_vira_falha_com_traceback(gerenciador):
+    tarefa = _esperar(gerenciador, gerenciador.submeter(falhar))
+    assert tarefa.estado == FALHOU
+    assert "sem professor" in tarefa.erro and "Traceback" in tarefa.erro
+
+
+def test_fila_respeita_o_maximo_de_processos(gerenciador):
+    primeira = gerenciador.submeter(dormir, args=(1,), kwargs={"progresso": 42})
+    segunda = gerenciador.submeter(somar, args=(1, 1))
+    assert gerenciador.status(segunda).estado == PENDENTE
+    assert gerenciador.em_aberto() == 2
+
+    _esperar(gerenciador, primeira, estados=(EXECUTANDO,))
+    tarefa = _esperar(gerenciador, primeira)
+    assert tarefa.melhor_objetivo == 42
+    assert gerenciador.status(segunda).inicio >= tarefa.fim
+    assert _esperar(gerenciador, segunda).resultado == 2
+    assert gerenciador.em_aberto() == 0
+
+
+def test_cancelar_tarefa_pendente_nao_abre_processo(gerenciador):
+    gerenciador.submeter(dormir, args=(2,))
+    pendente = gerenciador.submeter(somar, args=(1, 1))
+    assert gerenciador.cancelar(pendente)
+    tarefa = gerenciador.status(pendente)
+    assert tarefa.estado == CANCELADA and tarefa._processo is None
+    assert not gerenciador.cancelar(pendente)
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="grupos de processos só em POSIX")
+def test_cancelar_encerra_o_grupo_de_processos(gerenciador, tmp_path):
+    arquivo_pid = tmp_path / "neto.pid"
+    id_tarefa = gerenciador.submeter(dormir_com_neto, args=(str(arquivo_pid),))
+    fim = time.time() + 30
+    while not arquivo_pid.exists() or not arquivo_pid.read_text():
+        assert time.time() < fim
+        time.sleep(0.05)
+    neto = int(arquivo_pid.read_text())
+    processo = gerenciador.status(id_tarefa)._processo
+
+    assert gerenciador.cancelar(id_tarefa)
+    assert gerenciador.status(id_tarefa).estado == CANCELADA
+    assert not processo.is_alive()
+    fim = time.time() + 10
+    while _vivo(neto) and time.time() < fim:
+        time.sleep(0.05)
+    assert not _vivo(neto)
+
+
+def test_tempo_limite_encerra_e_falha(gerenciador):
+    id_tarefa = gerenciador.submeter(dormir, args=(30,), limite=0.5)
+    tarefa = _esperar(gerenciador, id_tarefa)
+    assert tarefa.estado == FALHOU
+    assert "Tempo limite" in tarefa.erro
+    assert tarefa.tempo_decorrido < 10
+
+
+def test_tarefa_finalizada_expira_depois_da_retencao(gerenciador, monkeypatch):
+    id_tarefa = gerenciador.submeter(somar, args=(1, 2))
+    _esperar(gerenciador, id_tarefa)
+    assert gerenciador.status(id_tarefa) is not None
+
+    monkeypatch.setattr(tarefas, "RETENCAO_TAREFAS", 0)
+    time.sleep(0.01)
+    assert gerenciador.status(id_tarefa) is None
+
+
+def test_descartar_so_remove_tarefas_finalizadas(gerenciador):
+    rodando = gerenciador.submeter(dormir, args=(2,))
+    gerenciador.descartar(rodando)
+    assert gerenciador.status(rodando) is not None
+    gerenciador.cancelar(rodando)
+    gerenciador.descartar(rodando)
+    assert gerenciador.status(rodando) is None
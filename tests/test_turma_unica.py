@@ -0,0 +1,91 @@
+from disponibilidade import bit_slot, mascara_do_dia
+from grade_colunar import GradeColunar
+from turma_unica import gerar_turma, ocupacao_professores
+from validacao import validar_grade
+
+from tests import escola
+
+
+def _turma(nome):
+    return next(t for t in escola.turmas() if t.nome == nome)
+
+
+def test_ocupacao_ignora_a_propria_turma():
+    grade = GradeColunar(escola.grade_valida())
+    ocupados = ocupacao_professores(grade, "7A")
+    esperado = {}
+    for aula in escola.grade_valida():
+        if aula.turma != "7A":
+            esperado[aula.professor] = esperado.get(aula.professor, 0) | 1 << bit_slot(aula.dia, aula.horario)
+    assert ocupados == esperado
+
+
+def test_turma_refeita_encaixa_nas_outras_sem_conflito():
+    grade = GradeColunar(escola.grade_valida())
+    turmas, professores, disciplinas = escola.turmas(), escola.professores(), escola.disciplinas()
+
+    resultado = gerar_turma(_turma("7A"), grade, professores, disciplinas, escola.salas())
+    assert resultado.completa
+    assert all(type(a) is escola.Aula and a.turma == "7A" for a in resultado.aulas)
+
+    outras = [a for a in grade if a.turma != "7A"]
+    relatorio = validar_grade(outras + resultado.aulas, turmas, professores, disciplinas)
+    assert relatorio.valida, relatorio.problemas
+
+
+def test_aulas_fixas_sao_mantidas():
+    aulas = escola.grade_valida()
+    linhas = [i for i, a in enumerate(aulas) if a.turma == "7A" and a.dia == "quarta"]
+    grade = GradeColunar(aulas).com_fixas(linhas)
+
+    resultado = gerar_turma(_turma("7A"), grade, escola.professores(), escola.disciplinas())
+    assert resultado.completa
+    fixas = [escola.campos(grade[i]) for i in linhas]
+    assert [escola.campos(a) for a in resultado.aulas[:len(fixas)]] == fixas
+    assert len(resultado.aulas) == 10
+    slots = [(a.dia, a.horario) for a in resultado.aulas]
+    assert len(set(slots)) == len(slots)
+
+
+def test_professora_sem_horario_deixa_aulas_nao_alocadas():
+    # Ana só pode na segunda, e lá já está ocupada pelo 6A no 1º horário
+    grade = GradeColunar(escola.grade_valida())
+    professores = escola.professores(mascara_ana=mascara_do_dia("segunda"))
+    resultado = gerar_turma(_turma("7A"), grade, professores, escola.disciplinas())
+    assert not resultado.completa
+    assert resultado.nao_alocadas == [("Matemática", 1)]
+
+
+def test_aulas_novas_so_em_sala_adequada_livre():
+    # 6A ocupa a Sala 1 no 1º e 2º horários de todo dia; Matemática e Português não vão para o laboratório
+    grade = GradeColunar(escola.grade_valida())
+    resultado = gerar_turma(_turma("7A"), grade, escola.professores(), escola.disciplinas(), escola.salas())
+    assert resultado.completa
+    assert {a.sala for a in resultado.aulas} == {"Sala 1"}
+    assert all(a.horario >= 4 for a in resultado.aulas)
+
+
+def test_disciplina_pratica_vai_para_o_laboratorio():
+    grade = GradeColunar(escola.grade_valida())
+    professores = escola.professores() + [
+        escola.Professor(nome="Caio", disciplinas=["Ciências"], grupo="A", mascara_disponibilidade=escola.MASCARA_SEMANA)
+    ]
+    disciplinas = escola.disciplinas() + [
+        escola.Disciplina(nome="Ciências", carga_semanal=2, tipo="pratica", turmas=["7A"], grupo="A")
+    ]
+    resultado = gerar_turma(_turma("7A"), grade, professores, disciplinas, escola.salas())
+    assert resultado.completa
+    salas = {(a.disciplina, a.sala) for a in resultado.aulas}
+    assert ("Ciências", "Laboratório") in salas and ("Ciências", "Sala 1") not in salas
+    ocupadas = [(a.sala, a.dia, a.horario) for a in [a for a in grade if a.turma != "7A"] + resultado.aulas]
+    assert len(set(ocupadas)) == len(ocupadas)
+
+
+def test_sem_sala_livre_a_aula_fica_de_fora():
+    # Só a Sala 1, que o 6A ocupa em 10 dos 25 horários: os 15 restantes não bastam para 20 aulas
+    grade = GradeColunar(escola.grade_valida())
+    disciplinas = escola.disciplinas(carga=10)
+    disciplinas[0].turmas = disciplinas[1].turmas = ["7A"]
+    resultado = gerar_turma(_turma("7A"), grade, escola.professores(), disciplinas, escola.salas()[:1])
+    assert sum(faltam for _, faltam in resultado.nao_alocadas) == 5
+    assert all(a.sala == "Sala 1" for a in resultado.aulas)
@@ -0,0 +1,52 @@
+from disponibilidade import MASCARA_SEMANA, bit_slot
+from validacao import (CARGA, CONFLITO_PROFESSOR, CONFLITO_TURMA, FORA_DO_TURNO, INDISPONIVEL, INTERVALO,
+                       validar_grade)
+
+from tests import escola
+
+
+def _validar(aulas, professores=None):
+    return validar_grade(aulas, escola.turmas(), professores or escola.professores(), escola.disciplinas())
+
+
+def _mover(aula, dia, horario):
+    aula.dia, aula.horario = dia, horario
+
+
+def test_grade_exemplo_e_valida():
+    relatorio = _validar(escola.grade_valida())
+    assert relatorio.valida
+    assert relatorio.aulas == 20
+    assert relatorio.resumo() == {}
+
+
+def test_conflitos_de_professor_e_turma():
+    aulas = escola.grade_valida()
+    # Matemática do 7A na segunda vai para o 1º horário: Ana e o 7A ficam com duas aulas
+    aula = next(a for a in aulas if a.turma == "7A" and a.dia == "segunda" and a.horario == 2)
+    _mover(aula, "segunda", 1)
+    relatorio = _validar(aulas)
+    assert relatorio.resumo() == {CONFLITO_PROFESSOR: 1, CONFLITO_TURMA: 1}
+
+
+def test_intervalo_fora_do_turno_e_indisponivel():
+    aulas = escola.grade_valida()
+    _mover(aulas[0], "segunda", 3)  # intervalo do EF II
+    _mover(aulas[4], "terca", 8)  # só existe no EM
+    aulas[8].dia = "sabado"
+    da_ana = next(a for a in aulas[9:] if a.professor == "Ana")
+    mascara_ana = MASCARA_SEMANA & ~(1 << bit_slot(da_ana.dia, da_ana.horario))
+    relatorio = _validar(aulas, escola.professores(mascara_ana=mascara_ana))
+    assert relatorio.contagem(INTERVALO) == 1
+    assert relatorio.contagem(FORA_DO_TURNO) == 2
+    assert relatorio.contagem(INDISPONIVEL) == 1
+    assert relatorio.contagem(CARGA) == 0
+
+
+def test_carga_diferente_da_semanal():
+    aulas = escola.grade_valida()
+    removida = aulas.pop()
+    relatorio = _validar(aulas)
+    assert relatorio.resumo() == {CARGA: 1}
+    assert relatorio.problemas[0][1] == removida.turma
+    assert "4 aula(s) na grade, carga semanal 5" in relatorio.problemas[0][2]
@@ -0,0 +1,55 @@
+from carga_turmas import IndiceCargas
+from disponibilidade import MASCARA_DIA, bit_slot, mascara_do_dia
+from viabilidade import analisar_viabilidade
+
+from tests import escola
+
+
+def test_escola_exemplo_e_viavel():
+    analise = analisar_viabilidade(escola.turmas(), escola.professores(), escola.disciplinas())
+    assert analise.viavel
+    assert analise.demanda == 20
+    assert analise.fluxo_carga == analise.fluxo_horarios == 20
+
+
+def test_professora_com_mais_aulas_que_horarios_livres():
+    # Ana só pode na segunda (8 horários) e precisa dar 10 aulas de Matemática
+    professores = escola.professores(mascara_ana=mascara_do_dia("segunda"))
+    analise = analisar_viabilidade(escola.turmas(), professores, escola.disciplinas())
+    assert not analise.viavel
+    assert analise.fluxo_carga == 18
+    assert len(analise.gargalos) == 1
+    assert "Ana" in analise.gargalos[0] and "Bruno" not in analise.gargalos[0]
+    assert "faltam 2 aulas" in analise.gargalos[0]
+
+
+def test_horarios_livres_fora_do_turno_das_turmas():
+    # Só Matemática: 11 horários livres para 10 aulas, mas só os 5 da segunda caem no turno do EF II
+    disciplinas = [d for d in escola.disciplinas() if d.nome == "Matemática"]
+    mascara = mascara_do_dia("segunda")
+    for horario in (3, 7, 8):
+        mascara |= 1 << bit_slot("terca", horario)
+    professores = escola.professores(mascara_ana=mascara)
+    analise = analisar_viabilidade(escola.turmas(), professores, disciplinas)
+    assert analise.fluxo_carga == analise.demanda == 10
+    assert not analise.viavel
+    assert analise.fluxo_horarios == 5
+    assert "Ana" in analise.gargalos[0] and "6A" in analise.gargalos[0]
+
+
+def test_disciplina_sem_professor_disponivel():
+    professores = escola.professores(mascara_ana=MASCARA_DIA << 40)  # fora da semana
+    analise = analisar_viabilidade(escola.turmas(), professores, escola.disciplinas())
+    assert not analise.viavel
+    assert sum("não tem professor" in g for g in analise.gargalos) == 2
+
+
+def test_usa_as_disciplinas_e_o_segmento_do_indice():
+    turmas, disciplinas = escola.turmas(), escola.disciplinas()
+    indice = IndiceCargas(turmas, disciplinas)
+    assert analisar_viabilidade(turmas, escola.professores(), disciplinas, indice).demanda == 20
+
+    # Sem Matemática na 7A, só o índice avisado sabe; a lista passada não é relida
+    disciplinas[0].turmas = ["6A"]
+    indice.disciplina_alterada(disciplinas[0])
+    assert analisar_viabilidade(turmas, escola.professores(), [], indice).demanda == 15
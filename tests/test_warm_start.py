@@ -0,0 +1,73 @@
+import pytest
+
+from warm_start import dicas_da_grade, relatorio_partida, valores_das_dicas
+
+from tests import escola
+
+DICAS = {("6A", "Matemática", "Ana", "segunda", 1), ("7A", "Português", "Bruno", "segunda", 1)}
+
+
+def resolver_com_partida(dicas):
+    """Resolve, sob `partida_cp_sat`, um modelo com variáveis nomeadas como as do agendador"""
+    from ortools.sat.python import cp_model
+
+    import geracao
+
+    modelo = cp_model.CpModel()
+    x = {h: modelo.NewBoolVar(f"x[6A,Matemática,segunda,{h}]") for h in (1, 2)}
+    modelo.AddExactlyOne(x.values())
+    tempos = {}
+    with geracao.partida_cp_sat(tempos, dicas):
+        cp_model.CpSolver().Solve(modelo)
+    dica = modelo.Proto().solution_hint
+    return tempos, list(zip(dica.vars, dica.values))
+
+
+def test_dicas_da_grade():
+    assert len(dicas_da_grade(escola.grade_valida())) == 20
+
+
+def test_casa_variaveis_pelo_nome():
+    nomes = [
+        "x[6A,Matemática,segunda,1]",         # aula da grade
+        "x_6A_Matemática_segunda_2",          # mesma turma/disciplina/dia, outro horário
+        "aula 6A Matemática Ana segunda 1",   # cita o professor certo
+        "aula 6A Matemática Bruno segunda 1",  # cita outro professor
+        "janela_Ana_segunda",                 # não é de alocação
+        "",
+        "x[7A,Português,segunda,1]",
+    ]
+    assert valores_das_dicas(nomes, DICAS) == {0: 1, 1: 0, 2: 1, 3: 0, 6: 1}
+
+
+def test_turma_com_espaco_no_nome():
+    dicas = {("6º Ano A", "Matemática", "Ana", "terca", 4)}
+    assert valores_das_dicas(["x(6º Ano A|Matemática|terca|4)", "x(6º Ano B|Matemática|terca|4)"], dicas) == {0: 1}
+
+
+def test_relatorio_mostra_o_ganho():
+    relatorio = relatorio_partida(
+        0.5,
+        {"dicas": 3, "variaveis": 10, "primeira": 1.0, "final": 4.0, "status": "OPTIMAL"},
+        {"primeira": 3.0, "final": 5.5, "status": "OPTIMAL"},
+    )
+    assert "Dica 1 em 3 de 10" in relatorio
+    assert "Ganho na primeira solução: +2.0s" in relatorio
+    assert "Ganho na solução final: +1.5s" in relatorio
+
+
+def test_relatorio_sem_variaveis_casadas_avisa():
+    relatorio = relatorio_partida(0.5, {"dicas": 0, "variaveis": 0, "primeira": 1.0, "final": 1.0})
+    assert "resolvido sem dica" in relatorio
+    assert "sem dica nem medição" in relatorio_partida(0.5, {})
+
+
+def test_partida_aplica_as_dicas_e_cronometra():
+    pytest.importorskip("ortools")
+    geracao = pytest.importorskip("geracao")  # importa os agendadores
+
+    tempos, dicas = geracao.em_processo_dedicado(resolver_com_partida, {("6A", "Matemática", "Ana", "segunda", 2)})
+    assert dicas == [(0, 0), (1, 1)]
+    assert (tempos["dicas"], tempos["variaveis"]) == (1, 2)
+    assert tempos["status"] == "OPTIMAL"
+    assert tempos["primeira"] is not None and tempos["final"] >= tempos["primeira"]
@@ -0,0 +1,226 @@
+"""
+Geração da grade de uma única turma dentro da grade já publicada.
+
+As aulas das outras turmas não mudam: os horários que elas ocupam de cada
+professor entram como ocupação fixa. Sobra um problema pequeno (no máximo
+35 aulas em 40 horários), resolvido exatamente por fluxo máximo:
+
+    fonte -> disciplina (carga) -> (disciplina, dia) -> horário da turma -> sumidouro
+
+A aresta (disciplina, dia) -> horário existe quando há professor
+qualificado livre naquele horário e uma sala do tipo certo que as outras
+turmas não ocupam. A capacidade de (disciplina, dia)
+limita as aulas da mesma disciplina no dia, espalhando-as pela semana.
+Se não couber, a busca é refeita em etapas mais permissivas: primeiro só
+com o professor habitual de cada disciplina, depois com qualquer
+professor qualificado, por fim sem o limite por dia.
+"""
+import time
+
+import numpy as np
+
+from disponibilidade import NUM_HORARIOS, bit_slot, mascara_professor
+from grade_index import DIAS_ORDENADOS
+from ocupacao_salas import OcupacaoSalas
+from viabilidade import HORARIOS_SEGMENTO, _Fluxo, segmento_turma
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+class ResultadoTurma:
+    """Aulas novas da turma e o que não pôde ser alocado"""
+
+    def __init__(self, turma):
+        self.turma = turma
+        self.aulas = []  # aulas da turma (fixas mantidas + novas)
+        self.nao_alocadas = []  # (disciplina, quantidade)
+        self.tempo_ms = 0.0
+
+    @property
+    def completa(self):
+        return not self.nao_alocadas
+
+
+def ocupacao_professores(grade, turma_nome):
+    """Máscara dos horários de cada professor ocupados por outras turmas da grade colunar"""
+    if grade is None or len(grade) == 0:
+        return {}
+    outras = grade.codigos["turma"] != grade.vocabularios["turma"].codigos.get(turma_nome, -2)
+    professores = grade.codigos["professor"]
+    dias = grade.codigos["dia"]
+    validas = outras & (professores >= 0) & (dias >= 0) & (dias < len(DIAS_ORDENADOS))
+    bits = dias[validas].astype(np.int64) * NUM_HORARIOS + grade.horarios[validas] - 1
+    mascaras = np.zeros(len(grade.vocabularios["professor"].valores), dtype=np.int64)
+    np.bitwise_or.at(mascaras, professores[validas], np.left_shift(np.int64(1), bits))
+    return {
+        nome: int(mascara)
+        for nome, mascara in zip(grade.vocabularios["professor"].valores, mascaras.tolist())
+        if mascara
+    }
+
+
+def _nova_aula(tipo_aula, **valores):
+    # Mesmo caminho de GradeColunar.materializar: não depende da assinatura de Aula.__init__
+    aula = tipo_aula.__new__(tipo_aula)
+    for nome, valor in valores.items():
+        setattr(aula, nome, valor)
+    return aula
+
+
+def _alocar(demanda, slots, livres_por_slot, limite_dia):
+    """Fluxo máximo disciplina -> dia -> horário; devolve {horário: disciplina} e o total alocado"""
+    fluxo = _Fluxo()
+    fonte, sumidouro = fluxo.no(), fluxo.no()
+    no_slot = {}
+    for slot in slots:
+        no_slot[slot] = fluxo.no()
+        fluxo.aresta(no_slot[slot], sumidouro, 1)
+
+    arestas = []  # (aresta, disciplina, slot)
+    for disciplina, carga in demanda.items():
+        no_disc = fluxo.no()
+        fluxo.aresta(fonte, no_disc, carga)
+        for dia in DIAS_ORDENADOS:
+            no_dia = fluxo.no()
+            fluxo.aresta(no_disc, no_dia, limite_dia(carga))
+            for slot in slots:
+                if slot[0] == dia and disciplina in livres_por_slot[slot]:
+                    arestas.append((len(fluxo.destino), disciplina, slot))
+                    fluxo.aresta(no_dia, no_slot[slot], 1)
+
+    total = fluxo.maximo(fonte, sumidouro)
+    escolhidos = {slot: disciplina for aresta, disciplina, slot in arestas if fluxo.capacidade[aresta] == 0}
+    return escolhidos, total
+
+
+def gerar_turma(turma, grade, professores, disciplinas, salas=()):
+    """Refaz só as aulas de `turma`, com as outras turmas de `grade` como ocupação fixa
+
+    `grade` é a GradeColunar publicada (ou None). Aulas da turma marcadas
+    como fixas (`fixa=True`) são mantidas. Cada aula nova vai para uma das
+    `salas` do tipo certo livre no horário (a que a turma já usava para a
+    disciplina, se possível); sem `salas`, as aulas ficam sem sala.
+    Retorna ResultadoTurma; quem chama junta `resultado.aulas` às aulas
+    das outras turmas.
+    """
+    inicio = time.perf_counter()
+    resultado = ResultadoTurma(turma.nome)
+    grupo_turma = _grupo(turma)
+    tipo_aula = getattr(grade, "tipo_aula", None)
+    if tipo_aula is None:
+        from models import Aula as tipo_aula
+
+    aulas_anteriores = [] if grade is None else [grade[int(i)] for i in grade.linhas("turma", turma.nome)]
+    fixas = [a for a in aulas_anteriores if getattr(a, "fixa", False)]
+    ocupados = ocupacao_professores(grade, turma.nome)
+
+    # Demanda da turma (grupo da turma), descontadas as aulas fixas
+    demanda = {}
+    for disc in disciplinas:
+        if turma.nome in disc.turmas and _grupo(disc) == grupo_turma:
+            demanda[disc.nome] = demanda.get(disc.nome, 0) + disc.carga_semanal
+    for aula in fixas:
+        if demanda.get(aula.disciplina, 0) > 0:
+            demanda[aula.disciplina] -= 1
+        ocupados[aula.professor] = ocupados.get(aula.professor, 0) | 1 << bit_slot(aula.dia, aula.horario)
+    demanda = {d: c for d, c in demanda.items() if c > 0}
+
+    # Salas ocupadas pelas outras turmas e pelas aulas fixas desta
+    ocupacao = OcupacaoSalas(salas, disciplinas, [] if grade is None else (
+        a for a in grade if a.turma != turma.nome or getattr(a, "fixa", False)
+    ))
+
+    def sala_livre(disciplina, slot):
+        return not salas or ocupacao.escolher(disciplina, *slot, so_adequadas=True) is not None
+
+    slots_fixos = {(a.dia, a.horario) for a in fixas}
+    slots = [
+        (dia, h) for dia in DIAS_ORDENADOS for h in HORARIOS_SEGMENTO[segmento_turma(turma)]
+        if (dia, h) not in slots_fixos
+    ]
+
+    # Professores qualificados e livres em cada horário da turma
+    qualificados = {
+        d: sorted(
+            (p for p in professores
+             if d in p.disciplinas and _grupo(p) in (grupo_turma, "AMBOS")),
+            key=lambda p: p.nome
+        )
+        for d in demanda
+    }
+    livres = {p.nome: mascara_professor(p) & ~ocupados.get(p.nome, 0) for d in qualificados for p in qualificados[d]}
+
+    def livre(nome_prof, slot):
+        return bool(livres.get(nome_prof, 0) >> bit_slot(*slot) & 1)
+
+    # Professor habitual: o que já dava a disciplina na turma, senão o mais livre
+    anteriores = {}
+    for aula in aulas_anteriores:
+        anteriores.setdefault(aula.disciplina, aula.professor)
+    habitual = {}
+    for d, profs in qualificados.items():
+        nomes = [p.nome for p in profs]
+        if anteriores.get(d) in nomes:
+            habitual[d] = anteriores[d]
+        elif nomes:
+            habitual[d] = max(nomes, key=lambda n: sum(livre(n, s) for s in slots))
+
+    def livres_por_slot(so_habitual):
+        return {
+            slot: {
+                d for d, profs in qualificados.items()
+                if d in habitual
+                and (livre(habitual[d], slot) if so_habitual else any(livre(p.nome, slot) for p in profs))
+                and sala_livre(d, slot)
+            }
+            for slot in slots
+        }
+
+    def espalhar(carga):
+        return -(-carga // len(DIAS_ORDENADOS))  # teto(carga / 5) aulas por dia
+
+    def sem_limite(carga):
+        return carga
+
+    necessarias = sum(demanda.values())
+    melhor = ({}, -1)
+    for so_habitual, limite_dia in ((True, espalhar), (False, espalhar), (False, sem_limite)):
+        escolhidos, total = _alocar(demanda, slots, livres_por_slot(so_habitual), limite_dia)
+        if total > melhor[1]:
+            melhor = (escolhidos, total)
+        if total == necessarias:
+            break
+    escolhidos, _ = melhor
+
+    # Sala preferida: a que a turma já usava para a disciplina, senão a mais usada pela turma
+    salas_anteriores = [a.sala for a in aulas_anteriores if a.sala]
+    sala_turma = max(set(salas_anteriores), key=salas_anteriores.count) if salas_anteriores else None
+    sala_disciplina = {}
+    for aula in aulas_anteriores:
+        if aula.sala:
+            sala_disciplina.setdefault(aula.disciplina, aula.sala)
+
+    resultado.aulas = list(fixas)
+    alocadas = {}
+    for (dia, horario), disciplina in sorted(escolhidos.items(), key=lambda item: bit_slot(*item[0])):
+        professor = habitual[disciplina] if livre(habitual[disciplina], (dia, horario)) else next(
+            p.nome for p in qualificados[disciplina] if livre(p.nome, (dia, horario))
+        )
+        sala = ocupacao.escolher(
+            disciplina, dia, horario, sala_disciplina.get(disciplina, sala_turma), so_adequadas=True
+        )
+        aula = _nova_aula(
+            tipo_aula, turma=turma.nome, disciplina=disciplina, professor=professor,
+            sala=sala, dia=dia, horario=horario, grupo=grupo_turma
+        )
+        ocupacao.ocupar(aula)
+        resultado.aulas.append(aula)
+        alocadas[disciplina] = alocadas.get(disciplina, 0) + 1
+    resultado.nao_alocadas = [
+        (d, carga - alocadas.get(d, 0)) for d, carga in demanda.items() if alocadas.get(d, 0) < carga
+    ]
+    resultado.tempo_ms = (time.perf_counter() - inicio) * 1000
+    return resultado
@@ -0,0 +1,124 @@
+"""
+Validação de uma grade pronta, numa passada só pelas aulas.
+
+Confere o que os agendadores (e o fallback do OR-Tools para o simples)
+devolvem antes de a grade ser publicada:
+
+- professor ou turma com duas aulas no mesmo horário;
+- aula no intervalo ou fora dos horários do segmento da turma;
+- aula fora da disponibilidade do professor (máscara de bits, que já
+  inclui `disponibilidade` e `horarios_indisponiveis`);
+- aulas por (turma, disciplina) diferentes da `carga_semanal`.
+
+Cada aula é vista uma vez, com dicionários para as ocupações e a
+contagem de carga; o custo é linear no número de aulas.
+"""
+import time
+
+from disponibilidade import bit_slot, mascara_professor
+from viabilidade import HORARIOS_SEGMENTO, INTERVALO_SEGMENTO, segmento_turma
+
+CONFLITO_PROFESSOR = "Professor em dois lugares"
+CONFLITO_TURMA = "Turma com duas aulas"
+INTERVALO = "Aula no intervalo"
+FORA_DO_TURNO = "Fora do horário da turma"
+INDISPONIVEL = "Professor indisponível"
+CARGA = "Carga diferente da semanal"
+TIPOS = (CONFLITO_PROFESSOR, CONFLITO_TURMA, INTERVALO, FORA_DO_TURNO, INDISPONIVEL, CARGA)
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+class RelatorioValidacao:
+    """Problemas encontrados na grade: (tipo, turma, mensagem)"""
+
+    def __init__(self):
+        self.problemas = []
+        self.aulas = 0
+        self.tempo_ms = 0.0
+
+    @property
+    def valida(self):
+        return not self.problemas
+
+    def contagem(self, tipo=None):
+        """Quantos problemas (de um tipo, ou no total)"""
+        if tipo is None:
+            return len(self.problemas)
+        return sum(1 for t, _, _ in self.problemas if t == tipo)
+
+    def resumo(self):
+        """{tipo: quantidade} só dos tipos encontrados, na ordem de TIPOS"""
+        contagens = {}
+        for tipo, _, _ in self.problemas:
+            contagens[tipo] = contagens.get(tipo, 0) + 1
+        return {tipo: contagens[tipo] for tipo in TIPOS if tipo in contagens}
+
+
+def validar_grade(aulas, turmas, professores, disciplinas):
+    """Confere a grade inteira e retorna RelatorioValidacao
+
+    A carga é conferida para as `turmas` informadas; aulas de turmas que
+    não estão na lista só passam pelas verificações de horário.
+    """
+    inicio = time.perf_counter()
+    relatorio = RelatorioValidacao()
+    problemas = relatorio.problemas
+
+    turmas_por_nome = {t.nome: t for t in turmas}
+    mascaras_prof = {p.nome: mascara_professor(p) for p in professores}
+    horarios_turma = {t.nome: set(HORARIOS_SEGMENTO[segmento_turma(t)]) for t in turmas}
+    intervalo_turma = {t.nome: INTERVALO_SEGMENTO[segmento_turma(t)] for t in turmas}
+
+    prof_slot = {}  # (professor, dia, horario) -> turma
+    turma_slot = {}  # (turma, dia, horario) -> disciplina
+    contagem = {}  # (turma, disciplina) -> aulas na grade
+    for aula in aulas:
+        relatorio.aulas += 1
+        turma, dia, horario, professor = aula.turma, aula.dia, aula.horario, aula.professor
+        onde = f"{aula.disciplina} ({turma}) {dia} {horario}º"
+        contagem[(turma, aula.disciplina)] = contagem.get((turma, aula.disciplina), 0) + 1
+
+        chave = (professor, dia, horario)
+        if chave in prof_slot:
+            problemas.append((CONFLITO_PROFESSOR, turma, f"{professor} também dá aula em {prof_slot[chave]}: {onde}"))
+        else:
+            prof_slot[chave] = turma
+
+        chave = (turma, dia, horario)
+        if chave in turma_slot:
+            problemas.append((CONFLITO_TURMA, turma, f"{onde} junto com {turma_slot[chave]}"))
+        else:
+            turma_slot[chave] = aula.disciplina
+
+        bit = bit_slot(dia, horario)
+        if horario == intervalo_turma.get(turma):
+            problemas.append((INTERVALO, turma, onde))
+        elif bit is None or (turma in horarios_turma and horario not in horarios_turma[turma]):
+            problemas.append((FORA_DO_TURNO, turma, onde))
+        elif professor not in mascaras_prof:
+            problemas.append((INDISPONIVEL, turma, f"{professor} não está cadastrado: {onde}"))
+        elif not mascaras_prof[professor] >> bit & 1:
+            problemas.append((INDISPONIVEL, turma, f"{professor}: {onde}"))
+
+    # Carga semanal de cada (turma, disciplina) do mesmo grupo
+    esperada = {}
+    for disc in disciplinas:
+        for nome_turma in disc.turmas:
+            turma = turmas_por_nome.get(nome_turma)
+            if turma is not None and _grupo(disc) == _grupo(turma):
+                chave = (nome_turma, disc.nome)
+                esperada[chave] = esperada.get(chave, 0) + disc.carga_semanal
+    for chave in sorted(esperada.keys() | {c for c in contagem if c[0] in turmas_por_nome}):
+        nome_turma, nome_disc = chave
+        na_grade, semanal = contagem.get(chave, 0), esperada.get(chave, 0)
+        if na_grade != semanal:
+            problemas.append((
+                CARGA, nome_turma, f"{nome_disc} ({nome_turma}): {na_grade} aula(s) na grade, carga semanal {semanal}"
+            ))
+
+    relatorio.tempo_ms = (time.perf_counter() - inicio) * 1000
+    return relatorio
@@ -0,0 +1,288 @@
+"""
+Prova rápida de inviabilidade da grade, antes de chamar qualquer solver.
+
+Além das verificações diretas (disciplina sem professor qualificado,
+professor com menos horários livres que aulas exclusivas), resolve dois
+problemas de fluxo máximo que são relaxações da grade:
+
+1. Carga: demanda (turma, disciplina) -> professores qualificados ->
+   horários livres de cada professor.
+2. Horários: turma -> (turma, horário) -> (professor, horário), respeitando
+   um professor por horário, uma aula por horário da turma e a
+   disponibilidade de cada professor.
+
+Se o fluxo não cobre toda a demanda a grade é impossível, e o corte
+mínimo aponta o gargalo (professores ou turmas saturados).
+"""
+import time
+from collections import deque
+
+from disponibilidade import NUM_HORARIOS, bit_slot, mascara_professor
+from grade_index import DIAS_ORDENADOS
+
+# Horário do intervalo em cada segmento (não recebe aula)
+INTERVALO_SEGMENTO = {"EF_II": 3, "EM": 4}
+HORARIOS_SEGMENTO = {
+    "EF_II": [h for h in range(1, 7) if h != INTERVALO_SEGMENTO["EF_II"]],
+    "EM": [h for h in range(1, 9) if h != INTERVALO_SEGMENTO["EM"]],
+}
+
+
+def _grupo(objeto):
+    grupo = getattr(objeto, "grupo", "A")
+    return grupo if grupo in ("A", "B", "AMBOS") else "A"
+
+
+def segmento_turma(turma):
+    """Segmento da turma ("EM" ou "EF_II")"""
+    segmento = getattr(turma, "segmento", None)
+    if segmento in HORARIOS_SEGMENTO:
+        return segmento
+    return "EM" if "em" in turma.nome.lower() else "EF_II"
+
+
+def mascara_segmento(segmento):
+    """Máscara de bits dos horários de aula do segmento (sem o intervalo)"""
+    mascara = 0
+    for dia in DIAS_ORDENADOS:
+        for horario in HORARIOS_SEGMENTO[segmento]:
+            mascara |= 1 << bit_slot(dia, horario)
+    return mascara
+
+
+def mascara_turma(turma):
+    """Máscara de bits dos horários de aula da turma (sem o intervalo)"""
+    return mascara_segmento(segmento_turma(turma))
+
+
+class _Fluxo:
+    """Fluxo máximo (Dinic) em grafo com capacidades inteiras"""
+
+    def __init__(self):
+        self.adj = []
+        self.destino = []
+        self.capacidade = []
+
+    def no(self):
+        self.adj.append([])
+        return len(self.adj) - 1
+
+    def aresta(self, u, v, capacidade):
+        self.adj[u].append(len(self.destino))
+        self.destino.append(v)
+        self.capacidade.append(capacidade)
+        self.adj[v].append(len(self.destino))
+        self.destino.append(u)
+        self.capacidade.append(0)
+
+    def _niveis(self, s):
+        nivel = [-1] * len(self.adj)
+        nivel[s] = 0
+        fila = deque([s])
+        while fila:
+            u = fila.popleft()
+            for e in self.adj[u]:
+                v = self.destino[e]
+                if self.capacidade[e] > 0 and nivel[v] < 0:
+                    nivel[v] = nivel[u] + 1
+                    fila.append(v)
+        return nivel
+
+    def maximo(self, s, t):
+        total = 0
+        while True:
+            nivel = self._niveis(s)
+            if nivel[t] < 0:
+                return total
+            proxima = [0] * len(self.adj)
+            while True:
+                # Busca em profundidade iterativa por um caminho aumentante
+                caminho = []
+                u = s
+                while u != t:
+                    avancou = False
+                    while proxima[u] < len(self.adj[u]):
+                        e = self.adj[u][proxima[u]]
+                        v = self.destino[e]
+                        if self.capacidade[e] > 0 and nivel[v] == nivel[u] + 1:
+                            caminho.append(e)
+                            u = v
+                            avancou = True
+                            break
+                        proxima[u] += 1
+                    if not avancou:
+                        if u == s:
+                            break
+                        nivel[u] = -1  # beco sem saída
+                        e = caminho.pop()
+                        u = self.destino[e ^ 1]
+                        proxima[u] += 1
+                if u != t:
+                    break
+                gargalo = min(self.capacidade[e] for e in caminho)
+                for e in caminho:
+                    self.capacidade[e] -= gargalo
+                    self.capacidade[e ^ 1] += gargalo
+                total += gargalo
+
+    def alcancaveis(self, s):
+        """Nós do lado da fonte no corte mínimo (após `maximo`)"""
+        vistos = {s}
+        fila = deque([s])
+        while fila:
+            u = fila.popleft()
+            for e in self.adj[u]:
+                v = self.destino[e]
+                if self.capacidade[e] > 0 and v not in vistos:
+                    vistos.add(v)
+                    fila.append(v)
+        return vistos
+
+
+class AnaliseViabilidade:
+    """Resultado da análise: viável ou não, com os gargalos encontrados"""
+
+    def __init__(self):
+        self.gargalos = []
+        self.demanda = 0
+        self.fluxo_carga = 0
+        self.fluxo_horarios = 0
+        self.tempo_ms = 0.0
+
+    @property
+    def viavel(self):
+        return not self.gargalos
+
+
+def analisar_viabilidade(turmas, professores, disciplinas, indice=None):
+    """Verifica se existe alguma chance de a grade ser montada
+
+    `indice` (carga_turmas.IndiceCargas) dá as disciplinas e o segmento de
+    cada turma; sem ele, um índice é montado com `turmas` e `disciplinas`.
+    Retorna AnaliseViabilidade; `gargalos` lista em texto cada motivo que
+    prova a inviabilidade.
+    """
+    inicio = time.perf_counter()
+    analise = AnaliseViabilidade()
+    if indice is None:
+        from carga_turmas import IndiceCargas  # carga_turmas importa este módulo
+        indice = IndiceCargas(turmas, disciplinas)
+
+    cargas = {id(t): indice.carga(t) for t in turmas}
+    mascaras_prof = {id(p): mascara_professor(p) for p in professores}
+    mascaras_turma = {id(t): mascara_segmento(cargas[id(t)].segmento) for t in turmas}
+
+    # Demandas (turma, disciplina) e professores qualificados para cada uma
+    demandas = []
+    carga_por_turma = {}
+    for turma in turmas:
+        grupo_turma = _grupo(turma)
+        for disc in cargas[id(turma)].disciplinas:
+            if disc.carga_semanal > 0:
+                qualificados = [
+                    p for p in professores
+                    if disc.nome in p.disciplinas and _grupo(p) in (grupo_turma, "AMBOS")
+                    and mascaras_prof[id(p)] & mascaras_turma[id(turma)]
+                ]
+                if not qualificados:
+                    analise.gargalos.append(
+                        f"📚 {disc.nome} ({turma.nome}) não tem professor qualificado e disponível no grupo {grupo_turma}"
+                    )
+                demandas.append((turma, disc, qualificados))
+                analise.demanda += disc.carga_semanal
+                carga_por_turma[id(turma)] = carga_por_turma.get(id(turma), 0) + disc.carga_semanal
+
+    # Turma com mais aulas que horários
+    for turma in turmas:
+        carga = carga_por_turma.get(id(turma), 0)
+        capacidade = bin(mascaras_turma[id(turma)]).count("1")
+        if carga > capacidade:
+            analise.gargalos.append(f"🎒 {turma.nome}: {carga} aulas para {capacidade} horários")
+
+    # 1. Fluxo de carga: demanda -> professor -> horários livres do professor
+    fluxo = _Fluxo()
+    fonte, sumidouro = fluxo.no(), fluxo.no()
+    nos_prof = {}
+    for prof in professores:
+        nos_prof[id(prof)] = fluxo.no()
+        fluxo.aresta(nos_prof[id(prof)], sumidouro, bin(mascaras_prof[id(prof)]).count("1"))
+    for turma, disc, qualificados in demandas:
+        no_demanda = fluxo.no()
+        fluxo.aresta(fonte, no_demanda, disc.carga_semanal)
+        for prof in qualificados:
+            fluxo.aresta(no_demanda, nos_prof[id(prof)], disc.carga_semanal)
+    analise.fluxo_carga = fluxo.maximo(fonte, sumidouro)
+
+    if analise.fluxo_carga < analise.demanda and not analise.gargalos:
+        lado_fonte = fluxo.alcancaveis(fonte)
+        saturados = [p for p in professores if nos_prof[id(p)] in lado_fonte]
+        horarios = sum(bin(mascaras_prof[id(p)]).count("1") for p in saturados)
+        nomes = ", ".join(sorted(p.nome for p in saturados)) or "-"
+        analise.gargalos.append(
+            f"👩‍🏫 Professores {nomes}: juntos têm {horarios} horários livres, "
+            f"mas faltam {analise.demanda - analise.fluxo_carga} aulas que só eles podem dar"
+        )
+
+    # 2. Fluxo por horário: turma -> (turma, horário) -> (professor, horário)
+    if not analise.gargalos:
+        qualificados_turma = {}
+        carga_turma = {}
+        for turma, disc, qualificados in demandas:
+            qualificados_turma.setdefault(id(turma), set()).update(id(p) for p in qualificados)
+            carga_turma[id(turma)] = carga_turma.get(id(turma), 0) + disc.carga_semanal
+
+        # Professores com a mesma disponibilidade e as mesmas turmas são
+        # intercambiáveis: viram um único nó com capacidade = quantidade
+        equivalentes = {}
+        for prof in professores:
+            turmas_prof = frozenset(t for t, ids in qualificados_turma.items() if id(prof) in ids)
+            if turmas_prof:
+                equivalentes.setdefault((mascaras_prof[id(prof)], turmas_prof), []).append(prof)
+        classes_turma = {}
+        for (mascara, turmas_prof), profs in equivalentes.items():
+            for id_turma in turmas_prof:
+                classes_turma.setdefault(id_turma, []).append((mascara, turmas_prof))
+
+        fluxo = _Fluxo()
+        fonte, sumidouro = fluxo.no(), fluxo.no()
+        nos_classe_slot = {}
+        nos_turma = {}
+        for turma in turmas:
+            if id(turma) not in carga_turma:
+                continue
+            no_turma = nos_turma[id(turma)] = fluxo.no()
+            fluxo.aresta(fonte, no_turma, carga_turma[id(turma)])
+            mascara = mascaras_turma[id(turma)]
+            for bit in range(len(DIAS_ORDENADOS) * NUM_HORARIOS):
+                if not mascara >> bit & 1:
+                    continue
+                no_slot = None
+                for classe in classes_turma.get(id(turma), ()):
+                    if not classe[0] >> bit & 1:
+                        continue
+                    if no_slot is None:
+                        no_slot = fluxo.no()
+                        fluxo.aresta(no_turma, no_slot, 1)
+                    chave = (classe, bit)
+                    if chave not in nos_classe_slot:
+                        nos_classe_slot[chave] = fluxo.no()
+                        fluxo.aresta(nos_classe_slot[chave], sumidouro, len(equivalentes[classe]))
+                    fluxo.aresta(no_slot, nos_classe_slot[chave], 1)
+        analise.fluxo_horarios = fluxo.maximo(fonte, sumidouro)
+
+        if analise.fluxo_horarios < analise.demanda:
+            lado_fonte = fluxo.alcancaveis(fonte)
+            turmas_afetadas = sorted(t.nome for t in turmas if nos_turma.get(id(t)) in lado_fonte)
+            profs_saturados = sorted({
+                p.nome
+                for (classe, _), no in nos_classe_slot.items() if no in lado_fonte
+                for p in equivalentes[classe]
+            })
+            analise.gargalos.append(
+                f"🗓️ Faltam {analise.demanda - analise.fluxo_horarios} aulas nas turmas "
+                f"{', '.join(turmas_afetadas) or '-'}: os horários livres dos professores "
+                f"{', '.join(profs_saturados) or '-'} não coincidem com os horários das turmas"
+            )
+
+    analise.tempo_ms = (time.perf_counter() - inicio) * 1000
+    return analise
@@ -0,0 +1,127 @@
+"""
+Partida a quente do modelo CP-SAT a partir de uma grade já conhecida.
+
+A grade do algoritmo simples vira um conjunto de dicas
+(turma, disciplina, professor, dia, horário). O GradeHorariaORTools não
+expõe o modelo nem as variáveis, então as dicas são casadas pelo nome das
+BoolVars no momento do Solve (ver geracao.partida_cp_sat): uma variável
+cujo nome traz turma, disciplina, dia e horário de uma aula da grade
+recebe dica 1; as demais com turma, disciplina e dia no nome recebem 0.
+O cronômetro de soluções mede quanto a dica adianta a primeira solução
+viável e a solução final.
+"""
+import re
+import time
+from collections import defaultdict
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # OR-Tools é opcional: sem ele só o algoritmo simples roda
+    cp_model = None
+
+
+def dicas_da_grade(aulas):
+    """Conjunto de atribuições (turma, disciplina, professor, dia, horário) da grade"""
+    return {(a.turma, a.disciplina, a.professor, a.dia, a.horario) for a in aulas}
+
+
+def _normalizar(texto):
+    """`texto` em minúsculas, com `_` entre as palavras e nas pontas ("6º Ano A" -> "_6º_ano_a_")"""
+    return "_" + "_".join(re.findall(r"\w+", str(texto).lower())) + "_"
+
+
+def valores_das_dicas(nomes, dicas):
+    """{índice da variável: 0 ou 1} para os `nomes` de variáveis que parecem de alocação
+
+    Uma variável é de alocação quando o nome traz uma turma, uma disciplina
+    e um dia das dicas; vale 1 se também trouxer o horário de uma aula da
+    grade nesse (turma, disciplina, dia) e, quando citar um professor, o da
+    aula. Nomes vazios ou de outras variáveis ficam de fora.
+    """
+    por_turma = defaultdict(list)
+    for turma, disciplina, professor, dia, horario in dicas:
+        por_turma[_normalizar(turma)].append(
+            (_normalizar(disciplina), _normalizar(professor), _normalizar(dia), _normalizar(horario))
+        )
+    disciplinas = {d for aulas in por_turma.values() for d, _, _, _ in aulas}
+    professores = {p for aulas in por_turma.values() for _, p, _, _ in aulas}
+    dias = {dia for aulas in por_turma.values() for _, _, dia, _ in aulas}
+
+    valores = {}
+    for indice, nome in enumerate(nomes):
+        if not nome:
+            continue
+        nome = _normalizar(nome)
+        turmas = [t for t in por_turma if t in nome]
+        if (not turmas or not any(d in nome for d in disciplinas)
+                or not any(dia in nome for dia in dias)):
+            continue
+        cita_professor = any(p in nome for p in professores)
+        valores[indice] = int(any(
+            disciplina in nome and dia in nome and horario in nome and (not cita_professor or professor in nome)
+            for turma in turmas for disciplina, professor, dia, horario in por_turma[turma]
+        ))
+    return valores
+
+
+def aplicar_dicas(modelo, dicas):
+    """Troca as dicas do `modelo` pelas da grade; retorna (variáveis com dica 1, com dica)"""
+    nomes = [variavel.name for variavel in modelo.Proto().variables]
+    valores = valores_das_dicas(nomes, dicas)
+    modelo.ClearHints()
+    for indice, valor in valores.items():
+        modelo.AddHint(modelo.GetBoolVarFromProtoIndex(indice), valor)
+    return sum(valores.values()), len(valores)
+
+
+if cp_model is not None:
+    class CronometroSolucoes(cp_model.CpSolverSolutionCallback):
+        """Registra o instante de cada solução encontrada pelo CP-SAT"""
+
+        def __init__(self):
+            super().__init__()
+            self.inicio = time.time()
+            self.solucoes = []  # (segundos desde o início, objetivo)
+
+        def on_solution_callback(self):
+            self.solucoes.append((time.time() - self.inicio, self.ObjectiveValue()))
+
+        @property
+        def tempo_primeira_solucao(self):
+            return self.solucoes[0][0] if self.solucoes else None
+else:
+    CronometroSolucoes = None
+
+
+def _segundos(valor):
+    return "-" if valor is None else f"{valor:.1f}s"
+
+
+def _linha(icone, rotulo, tempos):
+    return (f"{icone} {rotulo}: primeira solução em {_segundos(tempos.get('primeira'))}, "
+            f"final em {_segundos(tempos.get('final'))} ({tempos.get('status', '?')})")
+
+
+def relatorio_partida(tempo_simples, tempos_com_dica, tempos_sem_dica=None):
+    """Texto com o tempo do simples e a primeira solução / solução final com e sem dica
+
+    Os `tempos` são os preenchidos por geracao.partida_cp_sat.
+    """
+    linhas = [f"🚀 Algoritmo simples (dica): {tempo_simples:.1f}s"]
+    if "final" not in tempos_com_dica:
+        linhas.append("⚠️ O agendador não chamou CpSolver.Solve; sem dica nem medição.")
+        return "\n".join(linhas)
+    if not tempos_com_dica.get("dicas"):
+        linhas.append("⚠️ Nenhuma variável do modelo tem turma, disciplina, dia e horário no nome; "
+                      "resolvido sem dica.")
+    else:
+        linhas.append(f"💡 Dica 1 em {tempos_com_dica['dicas']} de {tempos_com_dica['variaveis']} "
+                      f"variáveis de alocação")
+    linhas.append(_linha("🔥", "Com dica", tempos_com_dica))
+    if tempos_sem_dica:
+        linhas.append(_linha("🧊", "Sem dica", tempos_sem_dica))
+        for chave, rotulo in (("primeira", "primeira solução"), ("final", "solução final")):
+            com, sem = tempos_com_dica.get(chave), tempos_sem_dica.get(chave)
+            if com is not None and sem is not None:
+                linhas.append(f"⏱️ Ganho na {rotulo}: {sem - com:+.1f}s")
+    return "\n".join(linhas)
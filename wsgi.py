@@ -6,7 +6,7 @@ path = os.path.dirname(os.path.abspath(__file__))
 if path not in sys.path:
     sys.path.append(path)
 
-from app import app as application
+from api import app as application
 
 # Inicializar banco de dados
 with application.app_context():